@@ -1,28 +1,23 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Dict, Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from motor.motor_asyncio import AsyncIOMotorDatabase
 import os
+from auth.passwords import verify_password_async
+from auth.principal_cache import (
+    token_issued_at, get_cached_principal, cache_principal
+)
+from models.user import USER_PROJECTION, USER_LOGIN_PROJECTION
 
 # Security configuration
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-here-change-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
-
-def get_password_hash(password: str) -> str:
-    """Generate password hash"""
-    return pwd_context.hash(password)
-
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create JWT access token"""
     to_encode = data.copy()
@@ -31,21 +26,21 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     else:
         expire = datetime.utcnow() + timedelta(minutes=15)
     
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "iat": datetime.utcnow()})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_user_by_email(db: AsyncIOMotorDatabase, email: str):
-    """Get user by email from database"""
-    user = await db.users.find_one({"email": email})
+async def get_user_by_email(db: AsyncIOMotorDatabase, email: str, projection: Dict[str, Any] = USER_PROJECTION):
+    """Get user by email from database (without the password hash unless asked for)"""
+    user = await db.users.find_one({"email": email}, projection)
     return user
 
 async def authenticate_user(db: AsyncIOMotorDatabase, email: str, password: str):
     """Authenticate user with email and password"""
-    user = await get_user_by_email(db, email)
+    user = await get_user_by_email(db, email, USER_LOGIN_PROJECTION)
     if not user:
         return False
-    if not verify_password(password, user["hashed_password"]):
+    if not await verify_password_async(password, user["hashed_password"]):
         return False
     return user
 
@@ -67,6 +62,12 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
     
+    # Reuse the user this token resolved to on a recent request
+    issued_at = token_issued_at(payload)
+    user = get_cached_principal("user", email, issued_at)
+    if user is not None:
+        return user
+    
     # Get database
     from database import get_database
     db = await get_database()
@@ -74,6 +75,7 @@ async def get_current_user(
     if user is None:
         raise credentials_exception
     
+    cache_principal("user", email, issued_at, user)
     return user
 
 async def get_current_active_user(current_user: dict = Depends(get_current_user)):
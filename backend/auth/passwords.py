@@ -0,0 +1,86 @@
+"""
+Password hashing for store users and customers
+
+bcrypt deliberately burns 100-300 ms of CPU per call, so async handlers must
+use hash_password_async/verify_password_async, which run on a bounded worker
+pool instead of the event loop. Requests beyond PASSWORD_HASH_MAX_QUEUE are
+shed with a 503 rather than piling up behind a login storm.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+from typing import Any, Callable, Dict
+import asyncio
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_MAX_QUEUE = int(os.environ.get("PASSWORD_HASH_MAX_QUEUE", "64"))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# The bcrypt extension releases the GIL, so threads hash in parallel
+_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+_slots = asyncio.Semaphore(PASSWORD_HASH_WORKERS)
+_stats = {
+    "queued": 0,
+    "in_flight": 0,
+    "completed": 0,
+    "rejected": 0,
+    "max_queued": 0
+}
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against its hash (blocking)"""
+    return pwd_context.verify(plain_password, hashed_password)
+
+def get_password_hash(password: str) -> str:
+    """Generate password hash (blocking)"""
+    return pwd_context.hash(password)
+
+async def _run_in_pool(func: Callable[..., Any], *args: Any) -> Any:
+    """Run a password operation on the worker pool, shedding load when the queue is full"""
+    if _stats["queued"] >= PASSWORD_HASH_MAX_QUEUE:
+        _stats["rejected"] += 1
+        logger.warning("Password hashing queue is full; rejecting request")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-in requests, please try again shortly",
+            headers={"Retry-After": "1"},
+        )
+
+    _stats["queued"] += 1
+    _stats["max_queued"] = max(_stats["max_queued"], _stats["queued"])
+    waiting = True
+    try:
+        async with _slots:
+            _stats["queued"] -= 1
+            waiting = False
+            _stats["in_flight"] += 1
+            try:
+                return await asyncio.get_running_loop().run_in_executor(_executor, func, *args)
+            finally:
+                _stats["in_flight"] -= 1
+                _stats["completed"] += 1
+    finally:
+        if waiting:
+            # Cancelled while still waiting for a slot
+            _stats["queued"] -= 1
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against its hash without blocking the event loop"""
+    return await _run_in_pool(pwd_context.verify, plain_password, hashed_password)
+
+async def hash_password_async(password: str) -> str:
+    """Generate password hash without blocking the event loop"""
+    return await _run_in_pool(pwd_context.hash, password)
+
+def password_pool_stats() -> Dict[str, int]:
+    """Get queue depth and throughput counters for the password worker pool"""
+    return {
+        "workers": PASSWORD_HASH_WORKERS,
+        "max_queue": PASSWORD_HASH_MAX_QUEUE,
+        **_stats
+    }
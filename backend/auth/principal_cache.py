@@ -0,0 +1,36 @@
+"""
+Short-lived cache of authenticated principals (store users and customers)
+
+Entries are keyed by (kind, subject, issued-at) so each token maps to one
+entry, and are dropped explicitly whenever the API changes the underlying
+account: customers (keyed by id) on profile and stats updates, store users
+(keyed by email) on registration. No route updates or deactivates a store
+user; scripts such as update_subdomain.py do, from another process, so a
+changed or deactivated store user stays cached for up to
+PRINCIPAL_CACHE_TTL_SECONDS.
+"""
+from typing import Any, Dict, Optional
+import os
+from services.cache import TTLCache
+
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.environ.get("PRINCIPAL_CACHE_TTL_SECONDS", "30"))
+PRINCIPAL_CACHE_MAX_ENTRIES = int(os.environ.get("PRINCIPAL_CACHE_MAX_ENTRIES", "10000"))
+
+_principals = TTLCache(PRINCIPAL_CACHE_TTL_SECONDS, PRINCIPAL_CACHE_MAX_ENTRIES)
+
+def token_issued_at(payload: Dict[str, Any]) -> Any:
+    """Get the claim that identifies a token; older tokens have no iat"""
+    return payload.get("iat", payload.get("exp"))
+
+def get_cached_principal(kind: str, subject: str, issued_at: Any) -> Optional[Dict[str, Any]]:
+    """Get a copy of a cached principal, so callers cannot mutate the cache"""
+    principal = _principals.get((kind, subject, issued_at))
+    return dict(principal) if principal is not None else None
+
+def cache_principal(kind: str, subject: str, issued_at: Any, principal: Dict[str, Any]):
+    """Remember the principal a token resolved to"""
+    _principals.set((kind, subject, issued_at), dict(principal))
+
+def invalidate_principal(kind: str, subject: str):
+    """Forget every cached token of an account after it is updated or deactivated"""
+    _principals.invalidate_where(lambda key: key[0] == kind and key[1] == subject)
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Rebuild the customer_directory collection from customer_auth and customers
+
+The server runs this once at startup when the directory is first deployed
+(services/backfills.py); run it by hand whenever it needs repairing:
+
+    python backfill_customer_directory.py                # every store
+    python backfill_customer_directory.py --user-id ID   # a single store
+"""
+import argparse
+import asyncio
+import sys
+import logging
+from database import get_database
+from services.customer_directory import rebuild_customer_directory
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+async def backfill_customer_directory(user_id=None):
+    """Recompute the customer directory for one store or all stores"""
+    try:
+        db = await get_database()
+        scope = f"store {user_id}" if user_id else "all stores"
+        logger.info(f"Rebuilding customer directory for {scope}...")
+
+        entry_count = await rebuild_customer_directory(db, user_id)
+
+        logger.info(f"✓ Wrote {entry_count} directory entries for {scope}")
+
+    except Exception as e:
+        logger.error(f"Error rebuilding customer directory: {str(e)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the customer directory from both customer collections")
+    parser.add_argument("--user-id", help="Only rebuild the directory for this store owner")
+    args = parser.parse_args()
+    asyncio.run(backfill_customer_directory(args.user_id))
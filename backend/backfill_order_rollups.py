@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Rebuild the order_daily_rollups collection from the raw orders
+
+The server runs this once at startup when the rollups are first deployed
+(services/backfills.py); run it by hand whenever they need repairing:
+
+    python backfill_order_rollups.py                # every store
+    python backfill_order_rollups.py --user-id ID   # a single store
+"""
+import argparse
+import asyncio
+import sys
+import logging
+from database import get_database
+from services.order_rollups import rebuild_rollups
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+async def backfill_order_rollups(user_id=None):
+    """Recompute the daily order rollups for one store or all stores"""
+    try:
+        db = await get_database()
+        scope = f"store {user_id}" if user_id else "all stores"
+        logger.info(f"Rebuilding order rollups for {scope}...")
+
+        rollup_count = await rebuild_rollups(db, user_id)
+
+        logger.info(f"✓ Wrote {rollup_count} daily rollups for {scope}")
+
+    except Exception as e:
+        logger.error(f"Error rebuilding order rollups: {str(e)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild daily order rollups from the orders collection")
+    parser.add_argument("--user-id", help="Only rebuild rollups for this store owner")
+    args = parser.parse_args()
+    asyncio.run(backfill_order_rollups(args.user_id))
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Recompute the public storefront view stored on every product
+
+Storefront reads only return products that have their `public` sub-document.
+The server builds it once at startup when it is first deployed
+(services/backfills.py); run this by hand whenever its shape changes:
+
+    python backfill_public_products.py                # every store
+    python backfill_public_products.py --user-id ID   # a single store
+"""
+import argparse
+import asyncio
+import sys
+import logging
+from database import get_database
+from services.public_products import rebuild_public_products
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+async def backfill_public_products(user_id=None):
+    """Rebuild the public product view for one store or all stores"""
+    try:
+        db = await get_database()
+        scope = f"store {user_id}" if user_id else "all stores"
+        logger.info(f"Rebuilding public product views for {scope}...")
+
+        modified_count = await rebuild_public_products(db, user_id)
+
+        logger.info(f"✓ Updated {modified_count} products for {scope}")
+
+    except Exception as e:
+        logger.error(f"Error rebuilding public product views: {str(e)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recompute the public storefront view of every product")
+    parser.add_argument("--user-id", help="Only rebuild products of this store owner")
+    args = parser.parse_args()
+    asyncio.run(backfill_public_products(args.user_id))
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark customer stat updates under bursts of concurrent orders
+
+Fires --orders order placements for one throwaway customer, --concurrency at
+a time, first through the old read-modify-write update and then through the
+atomic pipeline update, and reports throughput and lost updates for each:
+
+    python benchmark_customer_stats.py --orders 500 --concurrency 50
+    python benchmark_customer_stats.py --mock   # run against the in-memory mock database
+"""
+import argparse
+import asyncio
+import time
+import uuid
+import logging
+from datetime import datetime
+import database
+from database import get_database
+from services.customer_stats import apply_order_to_customer
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+ORDER_TOTAL = 12.5
+
+async def read_modify_write(db, user_id, email, order_total):
+    """The update_customer_stats implementation this benchmark replaces"""
+    customer = await db.customers.find_one({"email": email, "user_id": user_id})
+    if customer:
+        new_total_orders = customer["total_orders"] + 1
+        new_total_spent = customer["total_spent"] + order_total
+        await db.customers.update_one(
+            {"email": email, "user_id": user_id},
+            {"$set": {
+                "total_orders": new_total_orders,
+                "total_spent": new_total_spent,
+                "average_order_value": new_total_spent / new_total_orders,
+                "last_order_date": datetime.utcnow()
+            }}
+        )
+
+async def atomic(db, user_id, email, order_total):
+    await apply_order_to_customer(db, user_id, email, order_total)
+
+async def run(db, name, update, orders, concurrency):
+    """Place every order for a fresh customer and check the final totals"""
+    user_id = f"benchmark-{uuid.uuid4()}"
+    email = f"{uuid.uuid4()}@benchmark.invalid"
+    await db.customers.insert_one({
+        "id": str(uuid.uuid4()), "user_id": user_id, "email": email, "name": "Benchmark",
+        "phone": "", "total_orders": 0, "total_spent": 0.0, "created_at": datetime.utcnow()
+    })
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def place_order():
+        async with semaphore:
+            await update(db, user_id, email, ORDER_TOTAL)
+
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(*(place_order() for _ in range(orders)))
+        elapsed = time.perf_counter() - started
+
+        customer = await db.customers.find_one({"user_id": user_id, "email": email})
+        lost = orders - customer["total_orders"]
+        logger.info(
+            f"{name:>17}: {orders} orders in {elapsed:.2f}s "
+            f"({orders / elapsed:.0f} orders/s), {lost} lost updates, tier={customer.get('loyalty_tier', '-')}"
+        )
+    finally:
+        await db.customers.delete_many({"user_id": user_id})
+
+async def main(orders, concurrency, use_mock):
+    if use_mock:
+        database.USE_MOCK_DB = True
+    db = await get_database()
+    logger.info(f"Running against {'the mock database' if use_mock else 'MongoDB'}")
+    await run(db, "read-modify-write", read_modify_write, orders, concurrency)
+    await run(db, "atomic pipeline", atomic, orders, concurrency)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark customer stat updates under concurrent orders")
+    parser.add_argument("--orders", type=int, default=500, help="Orders to place for one customer")
+    parser.add_argument("--concurrency", type=int, default=50, help="Orders in flight at once")
+    parser.add_argument("--mock", action="store_true", help="Use the in-memory mock database")
+    args = parser.parse_args()
+    asyncio.run(main(args.orders, args.concurrency, args.mock))
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark how long list endpoints take to turn order rows into a JSON body
+
+Serializes --rows order documents shaped like a projected MongoDB read three
+ways and reports the per-row cost of each (best of --repeat runs):
+
+- response_model: build Order models, let FastAPI validate them again against
+  List[Order], and render with the stdlib-json JSONResponse (the old default)
+- response_model + orjson: the same, rendered with ORJSONResponse
+- validate once: what page_response() does with FAST_LIST_RESPONSES on
+
+    python benchmark_serialization.py --rows 10000
+"""
+import argparse
+import asyncio
+import random
+import time
+import uuid
+import logging
+from datetime import datetime, timedelta
+from typing import List
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from models.order import Order
+from services.serialization import render_models
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def make_rows(count):
+    """Build order documents as ORDER_PROJECTION returns them"""
+    now = datetime.utcnow()
+    rows = []
+    for index in range(count):
+        items = [
+            {"product_id": str(uuid.uuid4()), "product_name": f"Product {n}", "quantity": 2, "price": 12.5, "total": 25.0}
+            for n in range(random.randint(1, 4))
+        ]
+        subtotal = sum(item["total"] for item in items)
+        created_at = now - timedelta(minutes=index)
+        rows.append({
+            "id": str(uuid.uuid4()),
+            "customer_name": f"Customer {index}",
+            "customer_email": f"customer{index}@example.com",
+            "customer_phone": "(555) 123-4567",
+            "delivery_address": "123 Main Street, Los Angeles, CA 90210",
+            "items": items,
+            "subtotal": subtotal,
+            "tax": round(subtotal * 0.1, 2),
+            "delivery_fee": 5.0,
+            "total": round(subtotal * 1.1 + 5.0, 2),
+            "status": "delivered",
+            "driver_id": None,
+            "driver_name": None,
+            "payment_status": "paid",
+            "payment_id": None,
+            "user_id": "benchmark",
+            "created_at": created_at,
+            "updated_at": created_at
+        })
+    return rows
+
+async def response_model_path(rows, response_class):
+    """What a route returning List[Order] with response_model=List[Order] costs"""
+    field = create_response_field("Response_get_orders", List[Order])
+    content = await serialize_response(field=field, response_content=[Order(**row) for row in rows])
+    return response_class(content).body
+
+async def validate_once_path(rows):
+    return render_models(Order, rows)
+
+async def measure(name, serialize, rows, repeat):
+    """Report the best of several runs, per row"""
+    best = None
+    body = b""
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = await serialize(rows)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    logger.info(
+        f"{name:>24}: {best * 1000:8.1f} ms for {len(rows)} rows, "
+        f"{best / len(rows) * 1e6:6.2f} µs/row, {len(body) / 1024:.0f} KiB"
+    )
+    return best
+
+async def main(row_count, repeat):
+    rows = make_rows(row_count)
+    baseline = await measure("response_model", lambda rows: response_model_path(rows, JSONResponse), rows, repeat)
+    orjson_best = await measure("response_model + orjson", lambda rows: response_model_path(rows, ORJSONResponse), rows, repeat)
+    fast = await measure("validate once", validate_once_path, rows, repeat)
+    logger.info(f"✓ orjson rendering: {baseline / orjson_best:.1f}x, validate once: {baseline / fast:.1f}x faster than response_model")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark JSON serialization of order list responses")
+    parser.add_argument("--rows", type=int, default=10000, help="Orders in the list")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per method; the best is reported")
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.repeat))
@@ -6,6 +6,7 @@ import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from database import get_database
+from services.tenant_resolver import normalize_subdomain
 from passlib.context import CryptContext
 import uuid
 from datetime import datetime
@@ -56,11 +57,13 @@ async def create_isolated_test_data():
             {
                 "$set": {
                     "password_hash": hashed_password,
-                    "business_name": account["business_name"]
+                    "business_name": account["business_name"],
+                    "subdomain": account["subdomain"],
+                    "subdomain_lower": normalize_subdomain(account["subdomain"])
                 }
             }
         )
-        print(f"   ✓ Updated {account['email']} with correct password and business info")
+        print(f"   ✓ Updated {account['email']} with correct password, subdomain and business info")
     
     # Create isolated customers for each storefront
     print("\n2. Creating isolated customers for each storefront:")
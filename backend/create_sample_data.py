@@ -13,7 +13,7 @@ backend_dir = Path(__file__).parent
 sys.path.insert(0, str(backend_dir))
 
 from motor.motor_asyncio import AsyncIOMotorClient
-from auth.auth import get_password_hash
+from auth.passwords import get_password_hash
 from models.user import User
 from models.product import Product
 from models.order import Order, OrderItem
@@ -21,6 +21,8 @@ from models.customer import Customer
 from models.driver import Driver
 from models.payment import Payment
 from models.support import SupportTicket, KnowledgeBase
+from services.public_products import with_public_product
+from services.tenant_resolver import normalize_subdomain
 from datetime import datetime, timedelta
 import uuid
 from dotenv import load_dotenv
@@ -50,6 +52,7 @@ async def create_sample_data():
         "address": "123 Main Street, Los Angeles, CA 90210",
         "license_number": "C11-0000123-LIC",
         "subdomain": "green-valley",
+        "subdomain_lower": normalize_subdomain("green-valley"),
         "is_active": True,
         "role": "admin",
         "created_at": datetime.utcnow(),
@@ -162,7 +165,7 @@ async def create_sample_data():
     
     for product_data in products_data:
         product = Product(**product_data)
-        await db.products.insert_one(product.dict())
+        await db.products.insert_one(with_public_product(product.dict()))
     print(f"✅ Created {len(products_data)} products")
     
     # Create sample customers
@@ -7,6 +7,7 @@ from pymongo import MongoClient
 from passlib.context import CryptContext
 import uuid
 from datetime import datetime
+from services.tenant_resolver import normalize_subdomain
 
 # Password hashing setup
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -32,6 +33,7 @@ def create_test_user():
         "address": "123 Test Street, Test City, TC 12345",
         "license_number": "TC-12345-LIC",
         "subdomain": "test-admin",
+        "subdomain_lower": normalize_subdomain("test-admin"),
         "is_active": True,
         "role": "admin",
         "created_at": datetime.utcnow(),
@@ -7,6 +7,8 @@ from pymongo import MongoClient
 from passlib.context import CryptContext
 import uuid
 from datetime import datetime
+from services.public_products import with_public_product
+from services.tenant_resolver import normalize_subdomain
 
 # Password hashing setup
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -32,6 +34,7 @@ def create_valley_dispensary():
         "address": "456 Valley Road, Valley City, VC 54321",
         "license_number": "VC-54321-LIC",
         "subdomain": "valley-dispensary",
+        "subdomain_lower": normalize_subdomain("valley-dispensary"),
         "is_active": True,
         "role": "admin",
         "created_at": datetime.utcnow(),
@@ -170,7 +173,7 @@ def create_valley_dispensary():
         print(f"Products for valley-dispensary already exist ({existing_products} products)")
     else:
         # Insert sample products
-        result = db.products.insert_many(sample_products)
+        result = db.products.insert_many([with_public_product(product) for product in sample_products])
         print(f"Created {len(sample_products)} sample products for valley-dispensary")
     
     print("\n✓ Valley dispensary setup complete!")
@@ -2,9 +2,12 @@
 Database connection module for Kush Door API
 """
 from motor.motor_asyncio import AsyncIOMotorClient
+from db_telemetry import pool_telemetry, command_telemetry
 import os
 from dotenv import load_dotenv
 from pathlib import Path
+from datetime import datetime
+import asyncio
 import logging
 
 # Load environment variables
@@ -17,6 +20,28 @@ logger = logging.getLogger(__name__)
 mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
 db_name = os.environ.get('DB_NAME', 'kush_door')
 
+def _pool_options():
+    """Connection pool options from the environment (unset ones keep the driver defaults)"""
+    options = {}
+    for env_name, option, cast in (
+        ('MONGO_MAX_POOL_SIZE', 'maxPoolSize', int),
+        ('MONGO_MIN_POOL_SIZE', 'minPoolSize', int),
+        ('MONGO_MAX_IDLE_TIME_MS', 'maxIdleTimeMS', int),
+        ('MONGO_WAIT_QUEUE_TIMEOUT_MS', 'waitQueueTimeoutMS', int),
+        ('MONGO_COMPRESSORS', 'compressors', str),
+        ('MONGO_READ_PREFERENCE', 'readPreference', str),
+    ):
+        value = os.environ.get(env_name)
+        if value:
+            options[option] = cast(value)
+    return options
+
+pool_options = _pool_options()
+client_options = {
+    **pool_options,
+    'event_listeners': [pool_telemetry, command_telemetry]
+}
+
 # Initialize MongoDB client with explicit SSL config
 # Add additional TLS/SSL configuration for Atlas
 try:
@@ -28,36 +53,114 @@ try:
         ssl=True,
         ssl_cert_reqs=ssl.CERT_NONE,  # Bypass certificate validation for now
         tls=True,
-        tlsInsecure=True
+        tlsInsecure=True,
+        **client_options
     )
     logger.info("MongoDB client initialized with SSL/TLS configuration")
 except Exception as e:
     logger.error(f"Error initializing MongoDB client: {e}")
     # Fallback initialization
-    client = AsyncIOMotorClient(mongo_url, serverSelectionTimeoutMS=5000)
+    client = AsyncIOMotorClient(mongo_url, serverSelectionTimeoutMS=5000, **client_options)
     logger.info("MongoDB client initialized with default configuration")
 
 database = client[db_name]
-USE_MOCK_DB = None  # Will be determined at runtime
+USE_MOCK_DB = None  # Decided by the health prober at startup
 
-async def get_database():
-    """Get database instance"""
-    global USE_MOCK_DB
-    if USE_MOCK_DB is True:
-        from mock_database import get_mock_database
-        return await get_mock_database()
-    elif USE_MOCK_DB is None:
-        # First time check - test the connection
+HEALTH_PROBE_INTERVAL_SECONDS = float(os.environ.get('HEALTH_PROBE_INTERVAL_SECONDS', '5'))
+HEALTH_PROBE_TIMEOUT_SECONDS = float(os.environ.get('HEALTH_PROBE_TIMEOUT_SECONDS', '3'))
+HEALTH_PROBE_FAILURE_THRESHOLD = int(os.environ.get('HEALTH_PROBE_FAILURE_THRESHOLD', '3'))
+HEALTH_PROBE_SUCCESS_THRESHOLD = int(os.environ.get('HEALTH_PROBE_SUCCESS_THRESHOLD', '2'))
+
+class DatabaseHealthProber:
+    """Background task that pings MongoDB and switches between it and the mock database
+
+    The first probe decides immediately. After that the process only fails
+    over after HEALTH_PROBE_FAILURE_THRESHOLD consecutive failed pings, and
+    only fails back after HEALTH_PROBE_SUCCESS_THRESHOLD consecutive good
+    ones, so a single blip does not flap between backends.
+    """
+    
+    def __init__(self):
+        self.consecutive_failures = 0
+        self.consecutive_successes = 0
+        self.last_error = None
+        self.last_probe_at = None
+        self.switches = 0
+        self._task = None
+    
+    async def probe_once(self) -> bool:
+        """Ping the primary once"""
+        self.last_probe_at = datetime.utcnow()
         try:
-            await database.command('ping')
-            USE_MOCK_DB = False
-            logger.info("MongoDB connection successful")
-            return database
+            await asyncio.wait_for(database.command('ping'), HEALTH_PROBE_TIMEOUT_SECONDS)
+            self.last_error = None
+            return True
         except Exception as e:
-            logger.warning(f"MongoDB connection failed: {e}. Using mock database.")
-            USE_MOCK_DB = True
-            from mock_database import get_mock_database
-            return await get_mock_database()
+            self.last_error = str(e) or type(e).__name__
+            return False
+    
+    def record(self, healthy: bool):
+        """Apply one probe result, switching backends once a threshold is reached"""
+        global USE_MOCK_DB
+        if healthy:
+            self.consecutive_successes += 1
+            self.consecutive_failures = 0
+            if USE_MOCK_DB is None or (USE_MOCK_DB and self.consecutive_successes >= HEALTH_PROBE_SUCCESS_THRESHOLD):
+                if USE_MOCK_DB:
+                    self.switches += 1
+                    logger.warning("MongoDB is reachable again; switching back from the mock database. "
+                                   "Writes made while on the mock database are not copied over.")
+                else:
+                    logger.info("MongoDB connection successful")
+                USE_MOCK_DB = False
+        else:
+            self.consecutive_failures += 1
+            self.consecutive_successes = 0
+            if USE_MOCK_DB is None or (USE_MOCK_DB is False and self.consecutive_failures >= HEALTH_PROBE_FAILURE_THRESHOLD):
+                if USE_MOCK_DB is False:
+                    self.switches += 1
+                logger.warning(f"MongoDB connection failed: {self.last_error}. Using mock database.")
+                USE_MOCK_DB = True
+    
+    async def _run(self):
+        while True:
+            await asyncio.sleep(HEALTH_PROBE_INTERVAL_SECONDS)
+            self.record(await self.probe_once())
+    
+    async def start(self):
+        """Decide on a backend now and keep probing in the background"""
+        self.record(await self.probe_once())
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Stop background probing"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    def status(self) -> dict:
+        """Current prober state for the health endpoints"""
+        return {
+            "backend": "mock" if USE_MOCK_DB else "mongodb",
+            "consecutive_failures": self.consecutive_failures,
+            "consecutive_successes": self.consecutive_successes,
+            "switches": self.switches,
+            "last_error": self.last_error,
+            "last_probe_at": self.last_probe_at.isoformat() if self.last_probe_at else None
+        }
+
+health_prober = DatabaseHealthProber()
+
+async def get_database():
+    """Get database instance (a plain read of the prober's decision; no I/O)"""
+    if USE_MOCK_DB:
+        from mock_database import mock_db
+        return mock_db
     return database
 
 def get_database_sync():
@@ -0,0 +1,159 @@
+"""
+MongoDB connection pool and command telemetry for Kush Door API
+
+pymongo calls these listeners from its own threads, so every counter is
+guarded by a lock. The snapshot is served by /api/health/db.
+"""
+from pymongo import monitoring
+from typing import Any, Dict, List
+import bisect
+import threading
+
+# Upper bounds (ms) of the command latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS_MS: List[float] = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500]
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram"""
+    
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.count = 0
+    
+    def observe(self, duration_ms: float):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS_MS, duration_ms)] += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        self.count += 1
+    
+    def to_dict(self) -> Dict[str, Any]:
+        labels = [f"le_{bound}ms" for bound in LATENCY_BUCKETS_MS] + ["gt_{}ms".format(LATENCY_BUCKETS_MS[-1])]
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0,
+            "max_ms": round(self.max_ms, 3),
+            "buckets": dict(zip(labels, self.counts))
+        }
+
+class PoolTelemetry(monitoring.ConnectionPoolListener):
+    """Tracks checked-out connections and the wait queue of every server pool"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pools: Dict[str, Dict[str, int]] = {}
+    
+    def _pool(self, address) -> Dict[str, int]:
+        key = "%s:%s" % address
+        if key not in self._pools:
+            self._pools[key] = {
+                "open_connections": 0,
+                "checked_out": 0,
+                "waiting": 0,
+                "max_waiting": 0,
+                "checkouts": 0,
+                "checkout_failures": 0,
+                "cleared": 0
+            }
+        return self._pools[key]
+    
+    def pool_created(self, event):
+        with self._lock:
+            self._pool(event.address)
+    
+    def pool_ready(self, event):
+        pass
+    
+    def pool_cleared(self, event):
+        with self._lock:
+            self._pool(event.address)["cleared"] += 1
+    
+    def pool_closed(self, event):
+        with self._lock:
+            self._pools.pop("%s:%s" % event.address, None)
+    
+    def connection_created(self, event):
+        with self._lock:
+            self._pool(event.address)["open_connections"] += 1
+    
+    def connection_ready(self, event):
+        pass
+    
+    def connection_closed(self, event):
+        with self._lock:
+            pool = self._pool(event.address)
+            pool["open_connections"] = max(0, pool["open_connections"] - 1)
+    
+    def connection_check_out_started(self, event):
+        with self._lock:
+            pool = self._pool(event.address)
+            pool["waiting"] += 1
+            pool["max_waiting"] = max(pool["max_waiting"], pool["waiting"])
+    
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            pool = self._pool(event.address)
+            pool["waiting"] = max(0, pool["waiting"] - 1)
+            pool["checkout_failures"] += 1
+    
+    def connection_checked_out(self, event):
+        with self._lock:
+            pool = self._pool(event.address)
+            pool["waiting"] = max(0, pool["waiting"] - 1)
+            pool["checked_out"] += 1
+            pool["checkouts"] += 1
+    
+    def connection_checked_in(self, event):
+        with self._lock:
+            pool = self._pool(event.address)
+            pool["checked_out"] = max(0, pool["checked_out"] - 1)
+    
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {address: dict(pool) for address, pool in self._pools.items()}
+
+class CommandTelemetry(monitoring.CommandListener):
+    """Records a latency histogram per command name"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._commands: Dict[str, LatencyHistogram] = {}
+        self._failures: Dict[str, int] = {}
+    
+    def started(self, event):
+        pass
+    
+    def _observe(self, event):
+        with self._lock:
+            histogram = self._commands.setdefault(event.command_name, LatencyHistogram())
+            histogram.observe(event.duration_micros / 1000)
+    
+    def succeeded(self, event):
+        self._observe(event)
+    
+    def failed(self, event):
+        self._observe(event)
+        with self._lock:
+            self._failures[event.command_name] = self._failures.get(event.command_name, 0) + 1
+    
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            overall = LatencyHistogram()
+            commands = {}
+            for name, histogram in self._commands.items():
+                commands[name] = {**histogram.to_dict(), "failures": self._failures.get(name, 0)}
+                overall.counts = [a + b for a, b in zip(overall.counts, histogram.counts)]
+                overall.total_ms += histogram.total_ms
+                overall.max_ms = max(overall.max_ms, histogram.max_ms)
+                overall.count += histogram.count
+            return {"all": overall.to_dict(), "by_command": commands}
+
+pool_telemetry = PoolTelemetry()
+command_telemetry = CommandTelemetry()
+
+def db_telemetry_snapshot() -> Dict[str, Any]:
+    """Get the current pool and command telemetry"""
+    return {
+        "pools": pool_telemetry.snapshot(),
+        "commands": command_telemetry.snapshot()
+    }
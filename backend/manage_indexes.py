@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Create or audit the MongoDB indexes declared in services/indexes.py
+
+    python manage_indexes.py ensure    # create any missing manifest indexes
+    python manage_indexes.py report    # list missing, unknown and unused indexes
+"""
+import argparse
+import asyncio
+import sys
+import logging
+import database
+from services.indexes import ensure_indexes, report_indexes
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+async def get_mongo_database():
+    """Get the MongoDB database, refusing to run against the mock fallback"""
+    if not await database.health_prober.probe_once():
+        logger.error("MongoDB is unreachable; indexes can only be managed on a live database")
+        sys.exit(1)
+    return database.database
+
+async def ensure():
+    """Create every manifest index that does not exist yet"""
+    db = await get_mongo_database()
+    failures = await ensure_indexes(db)
+    if failures:
+        for collection, names in failures.items():
+            logger.error(f"✗ {collection}: could not create {', '.join(names)}")
+        sys.exit(1)
+    logger.info("✓ All manifest indexes are in place")
+
+async def report():
+    """Print how the live indexes differ from the manifest"""
+    db = await get_mongo_database()
+    results = await report_indexes(db)
+    for collection, result in results.items():
+        print(f"{collection}:")
+        print(f"  missing: {', '.join(result['missing']) or '-'}")
+        print(f"  unknown: {', '.join(result['unknown']) or '-'}")
+        unused = result["unused"]
+        print(f"  unused:  {'n/a' if unused is None else ', '.join(unused) or '-'}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the MongoDB index manifest")
+    parser.add_argument("command", choices=["ensure", "report"])
+    args = parser.parse_args()
+    asyncio.run(ensure() if args.command == "ensure" else report())
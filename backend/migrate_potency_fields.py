@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+One-time migration to populate the numeric potency fields of every product
+
+Parses thc_percentage/cbd_percentage into thc_min/thc_max/cbd_min/cbd_max so
+potency range filters and sorts can run in the database, then creates the
+product indexes that serve them.
+"""
+import asyncio
+import sys
+import logging
+from pymongo import UpdateOne
+from database import get_database
+from services.indexes import ensure_collection_indexes
+from services.potency import potency_fields
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+
+async def migrate_potency_fields():
+    """Backfill thc_min/thc_max/cbd_min/cbd_max for every product"""
+    try:
+        db = await get_database()
+
+        projection = {"_id": 0, "id": 1, "user_id": 1, "thc_percentage": 1, "cbd_percentage": 1,
+                      "thc_min": 1, "thc_max": 1, "cbd_min": 1, "cbd_max": 1}
+        requests = []
+        scanned = 0
+        updated_count = 0
+        unparsed_count = 0
+        async for product in db.products.find({}, projection):
+            scanned += 1
+            fields = potency_fields(product)
+            if fields.get("thc_min") is None and product.get("thc_percentage"):
+                unparsed_count += 1
+            if any(product.get(field) != value for field, value in fields.items()):
+                requests.append(UpdateOne({"id": product["id"], "user_id": product["user_id"]}, {"$set": fields}))
+            if len(requests) >= BATCH_SIZE:
+                updated_count += (await db.products.bulk_write(requests, ordered=False)).modified_count
+                requests = []
+        if requests:
+            updated_count += (await db.products.bulk_write(requests, ordered=False)).modified_count
+
+        logger.info(f"✓ Updated potency fields for {updated_count} of {scanned} products")
+        if unparsed_count:
+            logger.warning(f"- {unparsed_count} products have a THC value that is not a percentage")
+
+        failed = await ensure_collection_indexes(db, "products")
+        if failed:
+            logger.error(f"Could not create product indexes: {', '.join(failed)}")
+            sys.exit(1)
+        logger.info("✓ Product indexes are in place")
+
+    except Exception as e:
+        logger.error(f"Error migrating potency fields: {str(e)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    asyncio.run(migrate_potency_fields())
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+One-time migration to populate users.subdomain_lower and index it
+
+Storefront and customer-auth lookups resolve slugs through the normalized
+subdomain_lower field. The server fills it in once at startup
+(services/backfills.py); run this by hand to report slugs that collide
+once normalized and to build the unique index.
+"""
+import asyncio
+import sys
+import logging
+from database import get_database
+from services.indexes import ensure_collection_indexes
+from services.tenant_resolver import fill_subdomain_lower, normalize_subdomain
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+async def migrate_subdomain_lower():
+    """Backfill subdomain_lower for every user and create its unique index"""
+    try:
+        db = await get_database()
+
+        users = await db.users.find(
+            {"subdomain": {"$exists": True}},
+            {"_id": 0, "email": 1, "subdomain": 1}
+        ).to_list(None)
+        logger.info(f"Found {len(users)} users with a subdomain")
+
+        owners = {}
+        for user in users:
+            subdomain_lower = normalize_subdomain(user["subdomain"])
+            if subdomain_lower in owners:
+                logger.warning(
+                    f"- Subdomain '{subdomain_lower}' is used by both {owners[subdomain_lower]} "
+                    f"and {user.get('email')}; rename one before the index can be created"
+                )
+            owners.setdefault(subdomain_lower, user.get("email"))
+
+        updated_count = await fill_subdomain_lower(db)
+        logger.info(f"✓ Updated subdomain_lower for {updated_count} users")
+
+        failed = await ensure_collection_indexes(db, "users")
+        if "subdomain_lower_unique" in failed:
+            logger.error("Could not create the unique index on users.subdomain_lower")
+            sys.exit(1)
+        logger.info("✓ Unique index on users.subdomain_lower is in place")
+
+    except Exception as e:
+        logger.error(f"Error migrating subdomains: {str(e)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    asyncio.run(migrate_subdomain_lower())
@@ -1,10 +1,33 @@
 """
 Mock database implementation for testing without MongoDB
+
+An embedded, in-memory engine with MongoDB semantics: hash indexes on
+declared fields, the common query and update operators (including upserts)
+and an aggregation pipeline evaluator, so routes and load tests behave the
+same against it as against a real server.
+
+Data lives in process memory unless MOCK_DB_PATH names a directory, in which
+case writes are persisted there (see mock_storage.py) and survive restarts.
 """
 from passlib.context import CryptContext
-from datetime import datetime
+from bson import ObjectId
+from pymongo.errors import OperationFailure
+from datetime import datetime, timedelta
+import copy
+import functools
+import heapq
+import itertools
+import logging
+import os
+import re
 import uuid
 
+logger = logging.getLogger(__name__)
+
+MOCK_DB_PATH = os.environ.get("MOCK_DB_PATH")
+MOCK_DB_SNAPSHOT_EVERY = int(os.environ.get("MOCK_DB_SNAPSHOT_EVERY", "10000"))
+MOCK_DB_FSYNC = os.environ.get("MOCK_DB_FSYNC", "false").lower() == "true"
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 # Mock in-memory data
@@ -19,6 +42,7 @@ mock_users = [
         "address": "123 Main Street, Los Angeles, CA 90210",
         "license_number": "C11-0000123-LIC",
         "subdomain": "green-valley",
+        "subdomain_lower": "green-valley",
         "is_active": True,
         "role": "admin",
         "created_at": datetime.utcnow(),
@@ -149,15 +173,152 @@ mock_customer_auth = [
     }
 ]
 
+# Fields every collection keeps a hash index on, plus per-collection extras.
+# Equality lookups on these fields touch only the matching documents.
+DEFAULT_INDEXED_FIELDS = ("id", "user_id")
+INDEXED_FIELDS = {
+    "users": ("email", "subdomain_lower"),
+    "customers": ("email",),
+    "customer_auth": ("store_id", "email"),
+    "customer_directory": ("email",),
+    "ticket_responses": ("ticket_id",),
+    "chat_messages": ("session_id",),
+}
+
+# Fields searched by $text queries until a text index is created
+TEXT_INDEXED_FIELDS = {
+    "products": ("name", "description"),
+}
+
+# Where aggregations over a $text match keep each document's score
+TEXT_SCORE_FIELD = "$textScore"
+
+_MISSING = object()
+
+class MockInsertOneResult:
+    def __init__(self, inserted_id):
+        self.inserted_id = inserted_id
+        self.acknowledged = True
+
+class MockInsertManyResult:
+    def __init__(self, inserted_ids):
+        self.inserted_ids = inserted_ids
+        self.acknowledged = True
+
+class MockUpdateResult:
+    def __init__(self, matched_count, modified_count, upserted_id=None):
+        self.matched_count = matched_count
+        self.modified_count = modified_count
+        self.upserted_id = upserted_id
+        self.acknowledged = True
+
+class MockDeleteResult:
+    def __init__(self, deleted_count):
+        self.deleted_count = deleted_count
+        self.acknowledged = True
+
+class MockBulkWriteResult:
+    def __init__(self):
+        self.inserted_count = 0
+        self.matched_count = 0
+        self.modified_count = 0
+        self.deleted_count = 0
+        self.upserted_ids = {}
+        self.acknowledged = True
+    
+    @property
+    def upserted_count(self):
+        return len(self.upserted_ids)
+
 class MockDatabase:
     """Mock database class that mimics MongoDB operations"""
     
-    def __init__(self):
-        self.users = MockCollection(mock_users)
-        self.products = MockCollection(mock_products)
-        self.orders = MockCollection(mock_orders)
-        self.customers = MockCollection(mock_customers)
-        self.customer_auth = MockCollection(mock_customer_auth)
+    def __init__(self, path=None):
+        self._collections = {}
+        self._store = None
+        self._loading = True
+        if path:
+            from mock_storage import MockStore
+            try:
+                self._store = MockStore(path, MOCK_DB_SNAPSHOT_EVERY, MOCK_DB_FSYNC)
+            except OSError as e:
+                logger.warning(f"Mock database directory {path} is unavailable ({e}); keeping data in memory only")
+        if self._store is not None and self._store.exists():
+            for name, key, document in self._store.load():
+                self[name]._put(key, document)
+            logger.info(f"Loaded mock database from {path}")
+        else:
+            self._seed("users", mock_users)
+            self._seed_products()
+            self._seed("orders", mock_orders)
+            self._seed("customers", mock_customers)
+            self._seed("customer_auth", mock_customer_auth)
+            self._seed_customer_directory()
+            if self._store is not None:
+                self.snapshot()
+        self._loading = False
+    
+    def _seed(self, name, documents):
+        collection = self[name]
+        for document in documents:
+            collection._insert(copy.deepcopy(document))
+    
+    def _seed_products(self):
+        """Seed the products with their storefront view, as the product routes write them"""
+        from services.potency import potency_fields
+        from services.public_products import with_public_product
+        self._seed("products", [
+            with_public_product({**product, **potency_fields(product)}) for product in mock_products
+        ])
+    
+    def _seed_customer_directory(self):
+        """Derive the customer directory from the seeded customers (storefront wins)"""
+        from services.customer_directory import directory_entry
+        entries = {}
+        for customer in mock_customers:
+            entries[(customer["user_id"], customer["email"])] = directory_entry(customer, customer["user_id"], "admin")
+        for customer in mock_customer_auth:
+            entries[(customer["store_id"], customer["email"])] = directory_entry(customer, customer["store_id"], "storefront")
+        self._seed("customer_directory", list(entries.values()))
+    
+    def _persist(self, name, key, document):
+        """Log a write when persistence is on, compacting the log when it grows"""
+        if self._store is None or self._loading:
+            return
+        if self._store.append(name, key, document):
+            self.snapshot()
+    
+    def snapshot(self):
+        """Write a compacted snapshot of every collection"""
+        if self._store is None:
+            return
+        self._store.write_snapshot(
+            (name, key, document)
+            for name, collection in self._collections.items()
+            for key, document in collection._documents.items()
+        )
+    
+    def close(self):
+        """Snapshot and release the data directory"""
+        if self._store is not None:
+            self.snapshot()
+            self._store.close()
+            self._store = None
+    
+    def __getitem__(self, name):
+        """Get a collection, creating it on first use like MongoDB does"""
+        if name not in self._collections:
+            self._collections[name] = MockCollection(name, self)
+        return self._collections[name]
+    
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+    
+    async def list_collection_names(self):
+        """List the collections created so far"""
+        return list(self._collections)
     
     async def command(self, cmd):
         """Mock database command for health checks"""
@@ -166,113 +327,1126 @@ class MockDatabase:
         return {"ok": 0}
 
 class MockCursor:
-    """Mock cursor class that mimics MongoDB cursor operations"""
+    """Mock cursor class that mimics MongoDB cursor operations
+
+    Nothing runs until the cursor is iterated: the plan streams matching
+    documents through sort, skip and limit and hands out a snapshot of each
+    result, so callers can never mutate the stored documents.
+    """
     
-    def __init__(self, data):
-        self.data = data
+    def __init__(self, source, projection=None):
+        # source is a callable returning an iterator over stored documents
+        self._source = source if callable(source) else (lambda: iter(source))
+        self.projection = projection
+        self._sort = None
+        self._skip = 0
+        self._limit = 0
+    
+    def sort(self, key, direction=1):
+        """Sort results by a key, or by a list of (key, direction) pairs"""
+        self._sort = [(key, direction)] if isinstance(key, str) else list(key)
+        return self
+    
+    def skip(self, count):
+        """Skip the first results"""
+        self._skip = count
+        return self
+    
+    def limit(self, count):
+        """Limit the number of results (0 means no limit)"""
+        self._limit = count
+        return self
+    
+    def batch_size(self, size):
+        """Accepted for compatibility; results are already in memory"""
+        return self
+    
+    def _plan(self):
+        """Compose filter -> sort -> skip -> limit lazily over the source"""
+        documents = self._source()
+        if self._sort:
+            key = _sort_key(self._sort)
+            if self._limit:
+                # Only the first skip + limit documents are ever needed
+                documents = iter(heapq.nsmallest(self._skip + self._limit, documents, key=key))
+            else:
+                documents = iter(sorted(documents, key=key))
+        stop = self._skip + self._limit if self._limit else None
+        for document in itertools.islice(documents, self._skip, stop):
+            yield _snapshot(document, self.projection)
     
     async def to_list(self, length=None):
         """Convert cursor to list"""
-        if length is None:
-            return self.data
-        return self.data[:length]
+        return list(itertools.islice(self._plan(), length))
     
-    def sort(self, key, direction=1):
-        """Sort results"""
-        if direction == 1:  # Ascending
-            self.data.sort(key=lambda x: x.get(key, ""))
-        else:  # Descending
-            self.data.sort(key=lambda x: x.get(key, ""), reverse=True)
-        return self
+    def __aiter__(self):
+        return self._iterate()
+    
+    async def _iterate(self):
+        for document in self._plan():
+            yield document
 
 class MockCollection:
     """Mock collection class that mimics MongoDB collection operations"""
     
-    def __init__(self, data):
-        self.data = data.copy()
+    def __init__(self, name, database):
+        self.name = name
+        self.database = database
+        self._documents = {}
+        self._next_key = 0
+        self._indexes = {}
+        self._unindexed = {}
+        self._index_specs = []
+        self._text_fields = TEXT_INDEXED_FIELDS.get(name, ())
+        for field in DEFAULT_INDEXED_FIELDS + INDEXED_FIELDS.get(name, ()):
+            self._add_index(field)
     
-    async def find_one(self, query):
-        """Find one document matching the query"""
-        for item in self.data:
-            if self._matches_query(item, query):
-                return item
-        return None
+    @property
+    def data(self):
+        """All documents in insertion order"""
+        return list(self._documents.values())
     
-    def find(self, query=None):
-        """Find all documents matching the query"""
-        if query is None:
-            results = self.data.copy()
+    # Indexes
+    
+    def _add_index(self, field):
+        if field in self._indexes:
+            return
+        self._indexes[field] = {}
+        self._unindexed[field] = set()
+        for key, document in self._documents.items():
+            self._index_value(field, key, document)
+    
+    def _index_value(self, field, key, document):
+        values = _resolve(document, field)
+        for value in values:
+            value = None if value is _MISSING else value
+            try:
+                self._indexes[field].setdefault(value, set()).add(key)
+            except TypeError:
+                self._unindexed[field].add(key)
+    
+    def _index(self, key, document):
+        for field in self._indexes:
+            self._index_value(field, key, document)
+    
+    def _unindex(self, key, document):
+        for field in self._indexes:
+            self._unindexed[field].discard(key)
+            for value in _resolve(document, field):
+                value = None if value is _MISSING else value
+                try:
+                    keys = self._indexes[field].get(value)
+                except TypeError:
+                    continue
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._indexes[field][value]
+    
+    def _candidates(self, query):
+        """Use the narrowest hash index the query allows, else scan everything"""
+        best = None
+        for field, condition in _equality_conditions(query):
+            if field not in self._indexes:
+                continue
+            if isinstance(condition, dict) and "$in" in condition:
+                values = condition["$in"]
+            elif isinstance(condition, dict) and "$eq" in condition:
+                values = [condition["$eq"]]
+            elif isinstance(condition, (dict, list, re.Pattern)):
+                continue
+            else:
+                values = [condition]
+            keys = set(self._unindexed[field])
+            try:
+                for value in values:
+                    keys |= self._indexes[field].get(value, set())
+            except TypeError:
+                continue
+            if best is None or len(keys) < len(best):
+                best = keys
+        if best is None:
+            # Keys only grow, so walking the key range is a copy-free scan that
+            # tolerates writes between yields and skips later inserts
+            keys = range(self._next_key)
         else:
-            results = []
-            for item in self.data:
-                if self._matches_query(item, query):
-                    results.append(item)
-        return MockCursor(results)
+            keys = sorted(best)
+        for key in keys:
+            document = self._documents.get(key)
+            if document is not None:
+                yield key, document
+    
+    def _iter_matching(self, query):
+        query = query or {}
+        terms = None
+        if "$text" in query:
+            terms = self._text_terms(query["$text"])
+            query = {key: value for key, value in query.items() if key != "$text"}
+        for key, document in self._candidates(query):
+            if _matches(document, query) and (terms is None or _text_score(document, self._text_fields, terms)):
+                yield key, document
+    
+    def _text_terms(self, text_query):
+        if not self._text_fields:
+            raise OperationFailure("text index required for $text query")
+        return re.findall(r"\w+", text_query["$search"].lower())
+    
+    def _matching(self, query):
+        return list(self._iter_matching(query))
+    
+    async def create_index(self, keys, **kwargs):
+        """Create a hash index on the leading field of an index spec"""
+        if isinstance(keys, str):
+            keys = [(keys, 1)]
+        text_fields = tuple(key for key, direction in keys if direction == "text")
+        if text_fields:
+            self._text_fields = text_fields
+        field = list(keys)[0][0]
+        self._add_index(field)
+        name = kwargs.get("name") or "_".join(f"{key}_{direction}" for key, direction in keys)
+        self._index_specs.append({"name": name, "key": dict(keys)})
+        return name
+    
+    async def create_indexes(self, indexes):
+        """Create several indexes from pymongo IndexModel objects"""
+        names = []
+        for index in indexes:
+            document = index.document
+            names.append(await self.create_index(list(document["key"].items()), name=document["name"]))
+        return names
+    
+    def list_indexes(self):
+        """List the indexes of the collection"""
+        return MockCursor([{"name": "_id_", "key": {"_id": 1}}] + self._index_specs)
+    
+    # Writes
+    
+    def _put(self, key, document):
+        """Store a document under a key (None deletes it), keeping indexes current"""
+        current = self._documents.pop(key, None)
+        if current is not None:
+            self._unindex(key, current)
+        if document is not None:
+            self._documents[key] = document
+            self._index(key, document)
+        self._next_key = max(self._next_key, key + 1)
+    
+    def _remove(self, key, document):
+        self._unindex(key, document)
+        del self._documents[key]
+        self.database._persist(self.name, key, None)
+    
+    def _insert(self, document):
+        if "_id" not in document:
+            document["_id"] = ObjectId()
+        key = self._next_key
+        self._put(key, document)
+        self.database._persist(self.name, key, document)
+        return document["_id"]
+    
+    def _apply(self, key, document, update, is_insert=False):
+        """Apply an update to a stored document, keeping indexes current"""
+        self._unindex(key, document)
+        updated = _apply_update(document, update, is_insert)
+        self._documents[key] = updated
+        self._index(key, updated)
+        self.database._persist(self.name, key, updated)
+        return updated
+    
+    def _upsert(self, query, update):
+        document = _upsert_seed(query)
+        if isinstance(update, dict) and update and not any(op.startswith("$") for op in update):
+            document = {**copy.deepcopy(update), **({"_id": document["_id"]} if "_id" in document else {})}
+        else:
+            document = _apply_update(document, update, is_insert=True)
+        return self._insert(document)
     
     async def insert_one(self, document):
         """Insert a new document"""
-        if "id" not in document:
-            document["id"] = str(uuid.uuid4())
-        document["created_at"] = datetime.utcnow()
-        document["updated_at"] = datetime.utcnow()
-        self.data.append(document)
-        return document
+        if "_id" not in document:
+            document["_id"] = ObjectId()
+        inserted_id = self._insert(copy.deepcopy(document))
+        return MockInsertOneResult(inserted_id)
     
-    async def update_one(self, query, update):
+    async def insert_many(self, documents, ordered=True):
+        """Insert several documents"""
+        inserted_ids = []
+        for document in documents:
+            inserted_ids.append((await self.insert_one(document)).inserted_id)
+        return MockInsertManyResult(inserted_ids)
+    
+    async def update_one(self, query, update, upsert=False):
         """Update one document"""
-        for i, item in enumerate(self.data):
-            if self._matches_query(item, query):
-                if "$set" in update:
-                    self.data[i].update(update["$set"])
-                self.data[i]["updated_at"] = datetime.utcnow()
-                return self.data[i]
-        return None
+        for key, document in self._iter_matching(query):
+            before = copy.deepcopy(document)
+            updated = self._apply(key, document, update)
+            return MockUpdateResult(1, int(updated != before))
+        if upsert:
+            return MockUpdateResult(0, 0, self._upsert(query, update))
+        return MockUpdateResult(0, 0)
+    
+    async def update_many(self, query, update, upsert=False):
+        """Update every matching document"""
+        matched = modified = 0
+        for key, document in self._matching(query):
+            before = copy.deepcopy(document)
+            updated = self._apply(key, document, update)
+            matched += 1
+            modified += int(updated != before)
+        if not matched and upsert:
+            return MockUpdateResult(0, 0, self._upsert(query, update))
+        return MockUpdateResult(matched, modified)
+    
+    async def bulk_write(self, requests, ordered=True):
+        """Apply pymongo InsertOne/UpdateOne/UpdateMany/ReplaceOne/DeleteOne/DeleteMany requests"""
+        result = MockBulkWriteResult()
+        for index, request in enumerate(requests):
+            kind = type(request).__name__
+            if kind == "InsertOne":
+                await self.insert_one(request._doc)
+                result.inserted_count += 1
+            elif kind in ("UpdateOne", "UpdateMany", "ReplaceOne"):
+                method = self.update_many if kind == "UpdateMany" else self.update_one
+                outcome = await method(request._filter, request._doc, upsert=request._upsert)
+                result.matched_count += outcome.matched_count
+                result.modified_count += outcome.modified_count
+                if outcome.upserted_id is not None:
+                    result.upserted_ids[index] = outcome.upserted_id
+            elif kind in ("DeleteOne", "DeleteMany"):
+                method = self.delete_many if kind == "DeleteMany" else self.delete_one
+                result.deleted_count += (await method(request._filter)).deleted_count
+            else:
+                raise OperationFailure(f"Unsupported bulk write request: {kind}")
+        return result
+    
+    async def replace_one(self, query, replacement, upsert=False):
+        """Replace one document"""
+        return await self.update_one(query, replacement, upsert=upsert)
     
     async def delete_one(self, query):
         """Delete one document"""
-        for i, item in enumerate(self.data):
-            if self._matches_query(item, query):
-                deleted = self.data.pop(i)
-                return {"deleted_count": 1}
-        return {"deleted_count": 0}
+        for key, document in self._iter_matching(query):
+            self._remove(key, document)
+            return MockDeleteResult(1)
+        return MockDeleteResult(0)
+    
+    async def delete_many(self, query):
+        """Delete every matching document"""
+        matching = self._matching(query)
+        for key, document in matching:
+            self._remove(key, document)
+        return MockDeleteResult(len(matching))
     
-    async def count_documents(self, query):
+    async def find_one_and_delete(self, query, projection=None, sort=None):
+        """Delete one document and return it"""
+        matching = self._matching(query)
+        if sort:
+            matching = _sort_pairs(matching, sort)
+        for key, document in matching[:1]:
+            self._remove(key, document)
+            return _snapshot(document, projection)
+        return None
+    
+    async def find_one_and_update(self, query, update, projection=None, sort=None, upsert=False, return_document=False):
+        """Update one document and return it (before the update unless return_document is true)"""
+        matching = self._matching(query)
+        if sort:
+            matching = _sort_pairs(matching, sort)
+        for key, document in matching[:1]:
+            before = copy.deepcopy(document)
+            updated = self._apply(key, document, update)
+            return _snapshot(updated if return_document else before, projection)
+        if upsert:
+            upserted_id = self._upsert(query, update)
+            if return_document:
+                return await self.find_one({"_id": upserted_id}, projection)
+        return None
+    
+    # Reads
+    
+    async def find_one(self, query=None, projection=None):
+        """Find one document matching the query"""
+        for key, document in self._iter_matching(query):
+            return _snapshot(document, projection)
+        return None
+    
+    def find(self, query=None, projection=None):
+        """Find all documents matching the query"""
+        score_fields = [
+            field for field, value in (projection or {}).items()
+            if isinstance(value, dict) and value.get("$meta") == "textScore"
+        ]
+        if not score_fields:
+            return MockCursor(lambda: (document for _, document in self._iter_matching(query)), projection)
+        
+        # Add {"$meta": "textScore"} fields to each match before sorting and projecting
+        terms = self._text_terms(query["$text"])
+        projection = {field: value for field, value in projection.items() if field not in score_fields}
+        if any(value for field, value in projection.items() if field != "_id"):
+            projection.update({field: 1 for field in score_fields})
+        
+        def scored():
+            for _, document in self._iter_matching(query):
+                score = _text_score(document, self._text_fields, terms)
+                yield {**document, **{field: score for field in score_fields}}
+        return MockCursor(scored, projection or None)
+    
+    async def count_documents(self, query=None):
         """Count documents matching the query"""
-        count = 0
-        for item in self.data:
-            if self._matches_query(item, query):
-                count += 1
-        return count
+        return sum(1 for _ in self._iter_matching(query))
+    
+    async def estimated_document_count(self):
+        """Count every document"""
+        return len(self._documents)
+    
+    async def distinct(self, key, query=None):
+        """Get the distinct values of a field among matching documents"""
+        values = []
+        for _, document in self._iter_matching(query):
+            for value in _resolve(document, key):
+                if value is not _MISSING and not isinstance(value, list) and value not in values:
+                    values.append(value)
+        return values
     
     def aggregate(self, pipeline):
-        """Aggregate documents (simplified implementation)"""
-        # For now, just implement basic aggregation for our stats
-        return MockCursor([])
-    
-    def _matches_query(self, item, query):
-        """Check if an item matches the given query"""
-        for key, value in query.items():
-            if key not in item:
+        """Run an aggregation pipeline"""
+        query = {}
+        if pipeline and "$match" in pipeline[0]:
+            query, pipeline = pipeline[0]["$match"], pipeline[1:]
+        
+        def matched():
+            if "$text" not in query:
+                return (document for _, document in self._iter_matching(query))
+            # Carry the text score along for {"$meta": "textScore"} sorts and expressions
+            terms = self._text_terms(query["$text"])
+            return (
+                {**document, TEXT_SCORE_FIELD: _text_score(document, self._text_fields, terms)}
+                for _, document in self._iter_matching(query)
+            )
+        return MockCursor(lambda: iter(_run_pipeline(matched(), pipeline, self.database)))
+
+# Query matching
+
+def _split_path(path):
+    return path.split(".")
+
+def _resolve(value, path):
+    """Get every value a dotted path reaches, expanding arrays like MongoDB"""
+    parts = _split_path(path) if isinstance(path, str) else path
+    if not parts:
+        if isinstance(value, list):
+            return [value] + value
+        return [value]
+    if isinstance(value, dict):
+        if parts[0] in value:
+            return _resolve(value[parts[0]], parts[1:])
+        return [_MISSING]
+    if isinstance(value, list):
+        if parts[0].isdigit():
+            index = int(parts[0])
+            return _resolve(value[index], parts[1:]) if index < len(value) else [_MISSING]
+        results = []
+        for element in value:
+            if isinstance(element, dict):
+                results.extend(v for v in _resolve(element, parts) if v is not _MISSING)
+        return results or [_MISSING]
+    return [_MISSING]
+
+def _get_path(document, path):
+    """Get the value at a dotted path without array expansion (None if missing)"""
+    value = document
+    for part in _split_path(path):
+        if isinstance(value, dict):
+            value = value.get(part, _MISSING)
+        elif isinstance(value, list):
+            if part.isdigit():
+                index = int(part)
+                value = value[index] if index < len(value) else _MISSING
+            else:
+                value = [_get_path(element, part) for element in value if isinstance(element, dict)]
+        else:
+            value = _MISSING
+        if value is _MISSING:
+            return None
+    return value
+
+def _set_path(document, path, value):
+    parts = _split_path(path)
+    target = document
+    for part in parts[:-1]:
+        if isinstance(target, list) and part.isdigit():
+            target = target[int(part)]
+            continue
+        if not isinstance(target.get(part), (dict, list)):
+            target[part] = {}
+        target = target[part]
+    if isinstance(target, list) and parts[-1].isdigit():
+        target[int(parts[-1])] = value
+    else:
+        target[parts[-1]] = value
+
+def _unset_path(document, path):
+    parts = _split_path(path)
+    target = document
+    for part in parts[:-1]:
+        target = target.get(part) if isinstance(target, dict) else None
+        if target is None:
+            return
+    if isinstance(target, dict):
+        target.pop(parts[-1], None)
+
+def _bson_rank(value):
+    """MongoDB's cross-type comparison order"""
+    if value is None or value is _MISSING:
+        return 1
+    if isinstance(value, bool):
+        return 8
+    if isinstance(value, (int, float)):
+        return 2
+    if isinstance(value, str):
+        return 3
+    if isinstance(value, dict):
+        return 4
+    if isinstance(value, (list, tuple)):
+        return 5
+    if isinstance(value, ObjectId):
+        return 7
+    if isinstance(value, datetime):
+        return 9
+    return 10
+
+def _sort_value(value):
+    rank = _bson_rank(value)
+    if rank == 1:
+        return (rank, 0)
+    if rank in (4, 5, 10):
+        return (rank, repr(value))
+    return (rank, value)
+
+def _values_equal(value, target):
+    if value is _MISSING:
+        return target is None
+    if isinstance(target, re.Pattern):
+        return isinstance(value, str) and target.search(value) is not None
+    if isinstance(value, bool) != isinstance(target, bool):
+        return False
+    return value == target
+
+def _compare(value, target, op):
+    if value is _MISSING or _bson_rank(value) != _bson_rank(target) or _bson_rank(value) in (4, 5):
+        return False
+    if op == "$gt":
+        return value > target
+    if op == "$gte":
+        return value >= target
+    if op == "$lt":
+        return value < target
+    return value <= target
+
+_TYPE_NAMES = {
+    "string": (str,), "double": (float,), "int": (int,), "long": (int,), "number": (int, float),
+    "bool": (bool,), "date": (datetime,), "object": (dict,), "array": (list,), "objectId": (ObjectId,)
+}
+
+def _regex(pattern, options=""):
+    if isinstance(pattern, re.Pattern):
+        return pattern
+    flags = 0
+    for option, flag in (("i", re.IGNORECASE), ("m", re.MULTILINE), ("s", re.DOTALL), ("x", re.VERBOSE)):
+        if option in (options or ""):
+            flags |= flag
+    return re.compile(pattern, flags)
+
+def _match_operators(values, condition):
+    for op, argument in condition.items():
+        if op == "$options":
+            continue
+        if op == "$eq":
+            matched = any(_values_equal(v, argument) for v in values)
+        elif op == "$ne":
+            matched = not any(_values_equal(v, argument) for v in values)
+        elif op in ("$gt", "$gte", "$lt", "$lte"):
+            matched = any(_compare(v, argument, op) for v in values)
+        elif op == "$in":
+            matched = any(_values_equal(v, a) for v in values for a in argument)
+        elif op == "$nin":
+            matched = not any(_values_equal(v, a) for v in values for a in argument)
+        elif op == "$exists":
+            matched = any(v is not _MISSING for v in values) == bool(argument)
+        elif op == "$regex":
+            pattern = _regex(argument, condition.get("$options", ""))
+            matched = any(isinstance(v, str) and pattern.search(v) for v in values)
+        elif op == "$not":
+            if isinstance(argument, dict):
+                matched = not _match_operators(values, argument)
+            else:
+                matched = not any(_values_equal(v, _regex(argument)) for v in values)
+        elif op == "$size":
+            matched = any(isinstance(v, list) and len(v) == argument for v in values)
+        elif op == "$all":
+            matched = all(any(_values_equal(v, a) for v in values) for a in argument)
+        elif op == "$elemMatch":
+            matched = any(
+                isinstance(v, list) and any(
+                    _matches(element, argument) if isinstance(element, dict)
+                    and not all(k.startswith("$") for k in argument)
+                    else _match_operators([element], argument)
+                    for element in v
+                )
+                for v in values
+            )
+        elif op == "$type":
+            names = argument if isinstance(argument, list) else [argument]
+            types = tuple(t for name in names for t in _TYPE_NAMES.get(name, ()))
+            matched = any(
+                v is not _MISSING and isinstance(v, types)
+                and not (isinstance(v, bool) and bool not in types)
+                for v in values
+            )
+        else:
+            raise OperationFailure(f"unknown operator: {op}")
+        if not matched:
+            return False
+    return True
+
+def _is_operator_document(condition):
+    return isinstance(condition, dict) and bool(condition) and all(key.startswith("$") for key in condition)
+
+def _matches(document, query):
+    """Check if a document matches a MongoDB query"""
+    for key, condition in query.items():
+        if key == "$and":
+            if not all(_matches(document, sub_query) for sub_query in condition):
+                return False
+        elif key == "$or":
+            if not any(_matches(document, sub_query) for sub_query in condition):
+                return False
+        elif key == "$nor":
+            if any(_matches(document, sub_query) for sub_query in condition):
                 return False
-            if isinstance(value, dict):
-                # Handle MongoDB operators like $gt
-                for op, op_value in value.items():
-                    if op == "$gt" and item[key] <= op_value:
-                        return False
-                    elif op == "$lt" and item[key] >= op_value:
-                        return False
-                    elif op == "$gte" and item[key] < op_value:
-                        return False
-                    elif op == "$lte" and item[key] > op_value:
-                        return False
-                    elif op == "$ne" and item[key] == op_value:
-                        return False
-            elif item[key] != value:
+        elif key == "$expr":
+            if not _evaluate(condition, document):
                 return False
-        return True
+        elif _is_operator_document(condition):
+            if not _match_operators(_resolve(document, key), condition):
+                return False
+        else:
+            if not any(_values_equal(v, condition) for v in _resolve(document, key)):
+                return False
+    return True
+
+def _equality_conditions(query):
+    """Yield the (field, condition) pairs every matching document must satisfy"""
+    for key, condition in query.items():
+        if key == "$and":
+            for sub_query in condition:
+                yield from _equality_conditions(sub_query)
+        elif not key.startswith("$"):
+            yield key, condition
+
+def _upsert_seed(query):
+    """Build the document an upsert starts from out of the query's equality fields"""
+    document = {}
+    for field, condition in _equality_conditions(query):
+        if isinstance(condition, dict) and "$eq" in condition:
+            _set_path(document, field, copy.deepcopy(condition["$eq"]))
+        elif not _is_operator_document(condition) and not isinstance(condition, re.Pattern):
+            _set_path(document, field, copy.deepcopy(condition))
+    return document
+
+# Updates
+
+def _apply_update(document, update, is_insert=False):
+    """Apply an update document or pipeline and return the updated document"""
+    if isinstance(update, list):
+        updated = _run_pipeline([document], update, None)[0]
+        if "_id" in document:
+            updated["_id"] = document["_id"]
+        return updated
+    if update and not any(key.startswith("$") for key in update):
+        replacement = copy.deepcopy(update)
+        if "_id" in document:
+            replacement["_id"] = document["_id"]
+        return replacement
+    for op, fields in update.items():
+        if op == "$setOnInsert" and not is_insert:
+            continue
+        for path, value in fields.items():
+            current = _get_path(document, path)
+            if op in ("$set", "$setOnInsert"):
+                _set_path(document, path, copy.deepcopy(value))
+            elif op == "$unset":
+                _unset_path(document, path)
+            elif op == "$inc":
+                _set_path(document, path, (current or 0) + value)
+            elif op == "$mul":
+                _set_path(document, path, (current or 0) * value)
+            elif op == "$min":
+                if current is None or _sort_value(value) < _sort_value(current):
+                    _set_path(document, path, value)
+            elif op == "$max":
+                if current is None or _sort_value(value) > _sort_value(current):
+                    _set_path(document, path, value)
+            elif op == "$currentDate":
+                _set_path(document, path, datetime.utcnow())
+            elif op in ("$push", "$addToSet"):
+                items = value["$each"] if isinstance(value, dict) and "$each" in value else [value]
+                array = list(current or [])
+                for item in items:
+                    if op == "$push" or item not in array:
+                        array.append(copy.deepcopy(item))
+                _set_path(document, path, array)
+            elif op == "$pull":
+                array = list(current or [])
+                if _is_operator_document(value):
+                    array = [item for item in array if not _match_operators([item], value)]
+                elif isinstance(value, dict):
+                    array = [item for item in array if not (isinstance(item, dict) and _matches(item, value))]
+                else:
+                    array = [item for item in array if item != value]
+                _set_path(document, path, array)
+            else:
+                raise OperationFailure(f"Unknown modifier: {op}")
+    return document
+
+# Sorting and projection
+
+def _text_score(document, fields, terms):
+    """Count how many words of the text fields start with a search term"""
+    score = 0
+    for field in fields:
+        value = document.get(field)
+        if isinstance(value, str):
+            for word in re.findall(r"\w+", value.lower()):
+                score += sum(1 for term in terms if word.startswith(term))
+    return score
+
+def _sort_key(sort):
+    """Build a key function for a list of (field, direction) pairs"""
+    def compare(left, right):
+        for field, direction in sort:
+            path = field
+            if isinstance(direction, dict):
+                # {"$meta": "textScore"} sorts best matches first; aggregations
+                # carry the score in TEXT_SCORE_FIELD rather than a named field
+                direction = -1
+                if TEXT_SCORE_FIELD in left:
+                    path = TEXT_SCORE_FIELD
+            left_value = _sort_value(_get_path(left, path))
+            right_value = _sort_value(_get_path(right, path))
+            if left_value != right_value:
+                return direction if left_value > right_value else -direction
+        return 0
+    return functools.cmp_to_key(compare)
+
+def _sort_documents(documents, sort):
+    return sorted(documents, key=_sort_key(sort))
+
+def _sort_pairs(pairs, sort):
+    if isinstance(sort, dict):
+        sort = list(sort.items())
+    key = _sort_key(sort)
+    return sorted(pairs, key=lambda pair: key(pair[1]))
+
+def _snapshot(document, projection=None):
+    """Copy a stored document (after projection) so callers cannot mutate it"""
+    return copy.deepcopy(_project(document, projection) if projection else document)
+
+def _project(document, projection):
+    """Apply a find() projection (inclusion or exclusion) to a document"""
+    if not projection:
+        return document
+    if isinstance(projection, (list, tuple)):
+        projection = {field: 1 for field in projection}
+    fields = {key: value for key, value in projection.items() if key != "_id"}
+    include_id = projection.get("_id", 1)
+    if all(not value for value in fields.values()):
+        result = copy.copy(document)
+        for field in fields:
+            _unset_path(result, field) if "." in field else result.pop(field, None)
+        if not include_id:
+            result.pop("_id", None)
+        return result
+    result = {}
+    if include_id and "_id" in document:
+        result["_id"] = document["_id"]
+    for field, value in fields.items():
+        if not value:
+            continue
+        found = _get_path(document, field)
+        if found is None and not _has_path(document, field):
+            continue
+        _set_path(result, field, found)
+    return result
+
+def _has_path(document, path):
+    value = document
+    for part in _split_path(path):
+        if not isinstance(value, dict) or part not in value:
+            return False
+        value = value[part]
+    return True
+
+# Aggregation expressions
+
+def _evaluate(expression, document, variables=None):
+    """Evaluate an aggregation expression against a document"""
+    if isinstance(expression, str) and expression.startswith("$$"):
+        name, _, path = expression[2:].partition(".")
+        if name in ("ROOT", "CURRENT"):
+            base = document
+        else:
+            base = (variables or {}).get(name)
+        return _get_path(base, path) if path else base
+    if isinstance(expression, str) and expression.startswith("$"):
+        return _get_path(document, expression[1:])
+    if isinstance(expression, list):
+        return [_evaluate(item, document, variables) for item in expression]
+    if isinstance(expression, dict):
+        if len(expression) == 1:
+            op, argument = next(iter(expression.items()))
+            if op.startswith("$"):
+                return _evaluate_operator(op, argument, document, variables)
+        return {key: _evaluate(value, document, variables) for key, value in expression.items()}
+    return expression
+
+def _numbers(values):
+    return [value for value in values if isinstance(value, (int, float)) and not isinstance(value, bool)]
+
+def _truthy(value):
+    return value not in (None, False, 0) and value is not _MISSING
+
+# $dateTrunc counts bins of binSize units from this reference; weeks start on Sunday
+_DATE_TRUNC_REFERENCE = datetime(2000, 1, 1)
+_DATE_TRUNC_WEEK_REFERENCE = datetime(2000, 1, 2)
+_DATE_TRUNC_SPANS = {
+    "day": timedelta(days=1),
+    "hour": timedelta(hours=1),
+    "minute": timedelta(minutes=1),
+    "second": timedelta(seconds=1),
+}
+
+def _date_trunc(date, unit, bin_size=1):
+    if isinstance(bin_size, bool) or not isinstance(bin_size, int) or bin_size < 1:
+        raise OperationFailure(f"$dateTrunc requires 'binSize' to be a positive integer, got: {bin_size}")
+    if not isinstance(date, datetime):
+        return None
+    if unit in ("year", "quarter", "month"):
+        months_per_bin = bin_size * {"year": 12, "quarter": 3, "month": 1}[unit]
+        months = (date.year - _DATE_TRUNC_REFERENCE.year) * 12 + date.month - 1
+        months -= months % months_per_bin
+        return datetime(_DATE_TRUNC_REFERENCE.year + months // 12, months % 12 + 1, 1)
+    if unit == "week":
+        reference, span = _DATE_TRUNC_WEEK_REFERENCE, timedelta(weeks=bin_size)
+    elif unit in _DATE_TRUNC_SPANS:
+        reference, span = _DATE_TRUNC_REFERENCE, _DATE_TRUNC_SPANS[unit] * bin_size
+    else:
+        raise OperationFailure(f"$dateTrunc parameter 'unit' value cannot be recognized as a time unit: {unit}")
+    return reference + (date - reference) // span * span
+
+def _evaluate_operator(op, argument, document, variables):
+    def arg(value):
+        return _evaluate(value, document, variables)
+    
+    if op == "$literal":
+        return argument
+    if op in ("$sum", "$avg", "$min", "$max") and not isinstance(argument, list):
+        value = arg(argument)
+        values = value if isinstance(value, list) else [value]
+    elif op in ("$sum", "$avg", "$min", "$max"):
+        values = [arg(item) for item in argument]
+    if op == "$sum":
+        return sum(_numbers(values))
+    if op == "$avg":
+        numbers = _numbers(values)
+        return sum(numbers) / len(numbers) if numbers else None
+    if op in ("$min", "$max"):
+        present = [value for value in values if value is not None]
+        if not present:
+            return None
+        return (min if op == "$min" else max)(present, key=_sort_value)
+    if op == "$add":
+        values = [arg(item) for item in argument]
+        if any(value is None for value in values):
+            return None
+        dates = [value for value in values if isinstance(value, datetime)]
+        total = sum(_numbers(values))
+        return dates[0] + timedelta(milliseconds=total) if dates else total
+    if op in ("$subtract", "$multiply", "$divide", "$mod"):
+        values = [arg(item) for item in argument]
+        if any(value is None for value in values):
+            return None
+        if op == "$subtract":
+            left, right = values
+            if isinstance(left, datetime) and isinstance(right, datetime):
+                return (left - right).total_seconds() * 1000
+            if isinstance(left, datetime):
+                return left - timedelta(milliseconds=right)
+            return left - right
+        if op == "$multiply":
+            result = 1
+            for value in values:
+                result *= value
+            return result
+        if op == "$divide":
+            if values[1] == 0:
+                raise OperationFailure("can't $divide by zero")
+            return values[0] / values[1]
+        return values[0] % values[1]
+    if op in ("$eq", "$ne", "$gt", "$gte", "$lt", "$lte"):
+        left, right = [_sort_value(arg(item)) for item in argument]
+        return {
+            "$eq": left == right, "$ne": left != right, "$gt": left > right,
+            "$gte": left >= right, "$lt": left < right, "$lte": left <= right
+        }[op]
+    if op == "$and":
+        return all(_truthy(arg(item)) for item in argument)
+    if op == "$or":
+        return any(_truthy(arg(item)) for item in argument)
+    if op == "$not":
+        return not _truthy(arg(argument[0] if isinstance(argument, list) else argument))
+    if op == "$in":
+        value, array = arg(argument[0]), arg(argument[1])
+        return value in (array or [])
+    if op == "$cond":
+        if isinstance(argument, dict):
+            condition, then, otherwise = argument["if"], argument["then"], argument["else"]
+        else:
+            condition, then, otherwise = argument
+        return arg(then) if _truthy(arg(condition)) else arg(otherwise)
+    if op == "$switch":
+        for branch in argument["branches"]:
+            if _truthy(arg(branch["case"])):
+                return arg(branch["then"])
+        if "default" not in argument:
+            raise OperationFailure("$switch could not find a matching branch for an input, and no default was specified.")
+        return arg(argument["default"])
+    if op == "$ifNull":
+        for item in argument:
+            value = arg(item)
+            if value is not None:
+                return value
+        return None
+    if op == "$isNumber":
+        value = arg(argument[0] if isinstance(argument, list) else argument)
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+    if op == "$size":
+        value = arg(argument[0] if isinstance(argument, list) else argument)
+        if not isinstance(value, list):
+            raise OperationFailure("The argument to $size must be an array")
+        return len(value)
+    if op == "$concat":
+        values = [arg(item) for item in argument]
+        return None if any(value is None for value in values) else "".join(values)
+    if op == "$toString":
+        value = arg(argument[0] if isinstance(argument, list) else argument)
+        if value is None or value is _MISSING:
+            return None
+        if isinstance(value, bool):
+            return "true" if value else "false"
+        return value.isoformat() if isinstance(value, datetime) else str(value)
+    if op == "$meta":
+        if argument != "textScore":
+            raise OperationFailure(f"Unsupported $meta type: {argument}")
+        return document.get(TEXT_SCORE_FIELD)
+    if op in ("$toLower", "$toUpper"):
+        value = arg(argument[0] if isinstance(argument, list) else argument)
+        value = "" if value is None else str(value)
+        return value.lower() if op == "$toLower" else value.upper()
+    if op == "$trim":
+        value = arg(argument["input"])
+        if value is None or value is _MISSING:
+            return None
+        chars = argument.get("chars")
+        return value.strip(arg(chars) if chars is not None else None)
+    if op == "$objectToArray":
+        value = arg(argument)
+        return [{"k": key, "v": item} for key, item in value.items()] if isinstance(value, dict) else None
+    if op == "$arrayToObject":
+        value = arg(argument[0] if isinstance(argument, list) and len(argument) == 1 else argument)
+        result = {}
+        for item in value or []:
+            key, item_value = (item["k"], item["v"]) if isinstance(item, dict) else item
+            result[key] = item_value
+        return result
+    if op == "$mergeObjects":
+        result = {}
+        for item in argument if isinstance(argument, list) else [argument]:
+            result.update(arg(item) or {})
+        return result
+    if op == "$dateTrunc":
+        return _date_trunc(arg(argument["date"]), argument["unit"], argument.get("binSize", 1))
+    if op in ("$round", "$trunc"):
+        values = argument if isinstance(argument, list) else [argument]
+        value = arg(values[0])
+        places = arg(values[1]) if len(values) > 1 else 0
+        if value is None:
+            return None
+        return round(value, places) if op == "$round" else float(int(value * 10 ** places)) / 10 ** places
+    raise OperationFailure(f"Unrecognized expression '{op}'")
+
+# Aggregation pipeline
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return tuple((key, _freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+def _group(documents, spec):
+    groups = {}
+    id_expression = spec["_id"]
+    accumulators = {field: next(iter(op.items())) for field, op in spec.items() if field != "_id"}
+    for document in documents:
+        group_id = _evaluate(id_expression, document)
+        state = groups.setdefault(_freeze(group_id), {"_id": group_id, "values": {field: [] for field in accumulators}})
+        for field, (op, expression) in accumulators.items():
+            state["values"][field].append(1 if op == "$count" else _evaluate(expression, document))
+    results = []
+    for state in groups.values():
+        result = {"_id": state["_id"]}
+        for field, (op, _) in accumulators.items():
+            values = state["values"][field]
+            if op in ("$sum", "$count"):
+                result[field] = sum(_numbers(values))
+            elif op == "$avg":
+                numbers = _numbers(values)
+                result[field] = sum(numbers) / len(numbers) if numbers else None
+            elif op in ("$min", "$max"):
+                present = [value for value in values if value is not None]
+                result[field] = (min if op == "$min" else max)(present, key=_sort_value) if present else None
+            elif op == "$first":
+                result[field] = values[0] if values else None
+            elif op == "$last":
+                result[field] = values[-1] if values else None
+            elif op == "$push":
+                result[field] = values
+            elif op == "$addToSet":
+                unique = []
+                for value in values:
+                    if value not in unique:
+                        unique.append(value)
+                result[field] = unique
+            else:
+                raise OperationFailure(f"unknown group operator '{op}'")
+        results.append(result)
+    return results
+
+def _unwind(documents, spec):
+    if isinstance(spec, str):
+        spec = {"path": spec}
+    path = spec["path"][1:]
+    preserve = spec.get("preserveNullAndEmptyArrays", False)
+    index_field = spec.get("includeArrayIndex")
+    results = []
+    for document in documents:
+        value = _get_path(document, path)
+        if isinstance(value, list) and value:
+            for index, item in enumerate(value):
+                unwound = copy.copy(document)
+                _set_path(unwound, path, item)
+                if index_field:
+                    unwound[index_field] = index
+                results.append(unwound)
+        elif value is not None and not isinstance(value, list):
+            results.append(document)
+        elif preserve:
+            unwound = copy.copy(document)
+            if isinstance(value, list):
+                _unset_path(unwound, path)
+            if index_field:
+                unwound[index_field] = None
+            results.append(unwound)
+    return results
+
+def _project_stage(documents, spec):
+    include_id = spec.get("_id", 1) not in (0, False)
+    fields = {key: value for key, value in spec.items() if key != "_id"}
+    if all(value in (0, False) for value in fields.values()):
+        return [_project(document, spec) for document in documents]
+    results = []
+    for document in documents:
+        result = {}
+        if include_id and "_id" in document:
+            result["_id"] = document["_id"] if spec.get("_id", 1) in (1, True) else _evaluate(spec["_id"], document)
+        for field, value in fields.items():
+            if value in (1, True):
+                if _has_path(document, field):
+                    _set_path(result, field, _get_path(document, field))
+            else:
+                _set_path(result, field, _evaluate(value, document))
+        results.append(result)
+    return results
+
+def _run_pipeline(documents, pipeline, database):
+    """Evaluate aggregation stages over an iterable of documents"""
+    documents = list(documents)
+    for stage in pipeline:
+        name, spec = next(iter(stage.items()))
+        if name == "$match":
+            documents = [document for document in documents if _matches(document, spec)]
+        elif name == "$group":
+            documents = _group(documents, spec)
+        elif name == "$unwind":
+            documents = _unwind(documents, spec)
+        elif name == "$sort":
+            documents = _sort_documents(documents, list(spec.items()))
+        elif name == "$skip":
+            documents = documents[spec:]
+        elif name == "$limit":
+            documents = documents[:spec]
+        elif name == "$project":
+            documents = _project_stage(documents, spec)
+        elif name in ("$addFields", "$set"):
+            results = []
+            for document in documents:
+                result = copy.copy(document)
+                for field, expression in spec.items():
+                    _set_path(result, field, _evaluate(expression, document))
+                results.append(result)
+            documents = results
+        elif name == "$unset":
+            fields = spec if isinstance(spec, list) else [spec]
+            documents = [_project(document, {field: 0 for field in fields}) for document in documents]
+        elif name in ("$replaceRoot", "$replaceWith"):
+            expression = spec["newRoot"] if name == "$replaceRoot" else spec
+            results = []
+            for document in documents:
+                root = _evaluate(expression, document)
+                if not isinstance(root, dict):
+                    raise OperationFailure(f"'newRoot' expression must evaluate to an object, but resulting value was: {root}")
+                results.append(root)
+            documents = results
+        elif name == "$count":
+            documents = [{spec: len(documents)}] if documents else []
+        elif name == "$facet":
+            documents = [{
+                facet: _run_pipeline(list(documents), sub_pipeline, database)
+                for facet, sub_pipeline in spec.items()
+            }]
+        elif name == "$lookup":
+            foreign = database[spec["from"]]
+            results = []
+            for document in documents:
+                local = _get_path(document, spec["localField"])
+                condition = {"$in": local} if isinstance(local, list) else local
+                joined = copy.copy(document)
+                joined[spec["as"]] = [matched for _, matched in foreign._matching({spec["foreignField"]: condition})]
+                results.append(joined)
+            documents = results
+        elif name == "$unionWith":
+            if isinstance(spec, str):
+                spec = {"coll": spec}
+            foreign = database[spec["coll"]]
+            unioned = [copy.deepcopy(document) for _, document in foreign._matching({})]
+            documents = documents + _run_pipeline(unioned, spec.get("pipeline", []), database)
+        else:
+            raise OperationFailure(f"Unrecognized pipeline stage name: '{name}'")
+    return documents
 
 # Global mock database instance
-mock_db = MockDatabase()
+mock_db = MockDatabase(MOCK_DB_PATH)
 
 async def get_mock_database():
     """Get the mock database instance"""
@@ -0,0 +1,109 @@
+"""
+On-disk persistence for the mock database
+
+When MOCK_DB_PATH is set, every write to the mock engine is appended to a
+write-ahead log (wal.bson) and the whole dataset is periodically compacted
+into snapshot.bson. Both files are sequences of BSON records of the form
+{"c": collection, "k": key, "d": document}, where a null document marks a
+delete. Files are memory-mapped on load, so restarting with a large dataset
+does not read it into a second buffer first.
+
+Only one process may own a data directory; others fall back to memory only.
+"""
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+import bson
+import fcntl
+import logging
+import mmap
+import os
+import struct
+
+logger = logging.getLogger(__name__)
+
+Record = Tuple[str, int, Optional[Dict[str, Any]]]
+
+class MockStore:
+    """Append-only log plus compacted snapshot for one mock database"""
+    
+    def __init__(self, path: str, snapshot_every: int, fsync: bool = False):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+        self.snapshot_path = os.path.join(path, "snapshot.bson")
+        self.wal_path = os.path.join(path, "wal.bson")
+        self._lock = open(os.path.join(path, "LOCK"), "w")
+        try:
+            fcntl.flock(self._lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            self._lock.close()
+            raise
+        self._wal = None
+        self._pending = 0
+    
+    def exists(self) -> bool:
+        """Check whether the directory already holds data"""
+        return any(
+            os.path.exists(path) and os.path.getsize(path) > 0
+            for path in (self.snapshot_path, self.wal_path)
+        )
+    
+    def load(self) -> Iterator[Record]:
+        """Replay the snapshot and then the log, in write order"""
+        yield from self._read(self.snapshot_path)
+        yield from self._read(self.wal_path, truncate_torn_tail=True)
+    
+    def _read(self, path: str, truncate_torn_tail: bool = False) -> Iterator[Record]:
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return
+        valid_size = 0
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            size = len(data)
+            while valid_size + 4 <= size:
+                (length,) = struct.unpack_from("<i", data, valid_size)
+                if length < 5 or valid_size + length > size:
+                    break
+                record = bson.decode(data[valid_size:valid_size + length])
+                valid_size += length
+                if truncate_torn_tail:
+                    self._pending += 1
+                yield record["c"], record["k"], record["d"]
+        if valid_size < size:
+            # A crash mid-append leaves a partial record at the end
+            logger.warning(f"Ignoring {size - valid_size} bytes of incomplete data at the end of {path}")
+            if truncate_torn_tail:
+                os.truncate(path, valid_size)
+    
+    def append(self, collection: str, key: int, document: Optional[Dict[str, Any]]) -> bool:
+        """Log one write; returns True once the log is due for compaction"""
+        if self._wal is None:
+            self._wal = open(self.wal_path, "ab")
+        self._wal.write(bson.encode({"c": collection, "k": key, "d": document}))
+        self._wal.flush()
+        if self.fsync:
+            os.fsync(self._wal.fileno())
+        self._pending += 1
+        return self.snapshot_every > 0 and self._pending >= self.snapshot_every
+    
+    def write_snapshot(self, records: Iterable[Record]):
+        """Replace the snapshot with the current dataset and empty the log"""
+        temporary_path = self.snapshot_path + ".tmp"
+        with open(temporary_path, "wb") as f:
+            for collection, key, document in records:
+                f.write(bson.encode({"c": collection, "k": key, "d": document}))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary_path, self.snapshot_path)
+        if self._wal is not None:
+            self._wal.truncate(0)
+        elif os.path.exists(self.wal_path):
+            os.truncate(self.wal_path, 0)
+        self._pending = 0
+    
+    def close(self):
+        """Close the log and release the directory lock"""
+        if self._wal is not None:
+            self._wal.close()
+            self._wal = None
+        fcntl.flock(self._lock, fcntl.LOCK_UN)
+        self._lock.close()
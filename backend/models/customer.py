@@ -2,6 +2,7 @@ from pydantic import BaseModel, Field
 from typing import Optional
 from datetime import datetime
 import uuid
+from models.projection import model_projection
 
 class Customer(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -32,4 +33,8 @@ class CustomerUpdate(BaseModel):
     phone: Optional[str] = None
     address: Optional[str] = None
     loyalty_tier: Optional[str] = None
-    status: Optional[str] = None
\ No newline at end of file
+    status: Optional[str] = None
+
+CUSTOMER_PROJECTION = model_projection(Customer)
+# Enough to refresh the customer directory entry of a changed customer
+CUSTOMER_EMAIL_PROJECTION = {"_id": 0, "email": 1}
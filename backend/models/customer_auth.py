@@ -2,6 +2,7 @@ from pydantic import BaseModel, Field, EmailStr
 from typing import Optional
 from datetime import datetime
 import uuid
+from models.projection import model_projection
 
 class CustomerAuth(BaseModel):
     """Customer model with authentication fields for public storefront"""
@@ -67,3 +68,8 @@ class CustomerAuthResponse(BaseModel):
     message: str
     customer: Optional[CustomerProfile] = None
     token: Optional[str] = None
+
+# Authenticated customer reads; the password hash is only loaded to log in
+CUSTOMER_AUTH_PROJECTION = model_projection(CustomerAuth, exclude=("password_hash",))
+CUSTOMER_LOGIN_PROJECTION = model_projection(CustomerProfile, extra=("password_hash",))
+CUSTOMER_PROFILE_PROJECTION = model_projection(CustomerProfile, extra=("store_id",))
@@ -2,6 +2,7 @@ from pydantic import BaseModel, Field
 from typing import Optional
 from datetime import datetime
 import uuid
+from models.projection import model_projection
 
 class Driver(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -36,4 +37,6 @@ class DriverUpdate(BaseModel):
     license_number: Optional[str] = None
     service_area: Optional[str] = None
     status: Optional[str] = None
-    rating: Optional[float] = None
\ No newline at end of file
+    rating: Optional[float] = None
+
+DRIVER_PROJECTION = model_projection(Driver)
@@ -1,7 +1,8 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 import uuid
+from models.projection import model_projection
 
 class OrderItem(BaseModel):
     product_id: str
@@ -46,4 +47,23 @@ class OrderUpdate(BaseModel):
     driver_id: Optional[str] = None
     driver_name: Optional[str] = None
     payment_status: Optional[str] = None
-    payment_id: Optional[str] = None
\ No newline at end of file
+    payment_id: Optional[str] = None
+
+ORDER_PROJECTION = model_projection(Order)
+
+MAX_BULK_ORDERS = 5000
+
+class OrderBulkCreate(BaseModel):
+    # Items are validated one by one so a bad order does not reject the batch
+    orders: List[Dict[str, Any]] = Field(..., min_length=1, max_length=MAX_BULK_ORDERS)
+
+class OrderBulkItemResult(BaseModel):
+    index: int
+    status: str  # created, invalid, failed
+    id: Optional[str] = None
+    error: Optional[str] = None
+
+class OrderBulkResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[OrderBulkItemResult]
@@ -2,6 +2,7 @@ from pydantic import BaseModel, Field
 from typing import Optional
 from datetime import datetime
 import uuid
+from models.projection import model_projection
 
 class Payment(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -40,4 +41,7 @@ class Payout(BaseModel):
     bank_account: str
     user_id: str  # Store owner
     created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
\ No newline at end of file
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+PAYMENT_PROJECTION = model_projection(Payment)
+PAYOUT_PROJECTION = model_projection(Payout)
@@ -1,15 +1,22 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 import uuid
+from models.projection import model_projection
 
 class Product(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    sku: Optional[str] = None  # Distributor/catalog identifier, unique per store
     name: str
     category: str  # Flower, Edibles, Pre-Rolls, Concentrates, Accessories
     strain: str  # Indica, Sativa, Hybrid, N/A
     thc_percentage: str
     cbd_percentage: str
+    # Parsed from the percentage strings (services/potency.py)
+    thc_min: Optional[float] = None
+    thc_max: Optional[float] = None
+    cbd_min: Optional[float] = None
+    cbd_max: Optional[float] = None
     price: float
     stock: int
     description: Optional[str] = None
@@ -20,6 +27,7 @@ class Product(BaseModel):
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
 class ProductCreate(BaseModel):
+    sku: Optional[str] = None
     name: str
     category: str
     strain: str
@@ -32,6 +40,7 @@ class ProductCreate(BaseModel):
     status: str = "active"
 
 class ProductUpdate(BaseModel):
+    sku: Optional[str] = None
     name: Optional[str] = None
     category: Optional[str] = None
     strain: Optional[str] = None
@@ -41,4 +50,21 @@ class ProductUpdate(BaseModel):
     stock: Optional[int] = None
     description: Optional[str] = None
     image_emoji: Optional[str] = None
-    status: Optional[str] = None
\ No newline at end of file
+    status: Optional[str] = None
+
+PRODUCT_PROJECTION = model_projection(Product)
+
+MAX_BULK_PRODUCTS = 5000
+
+class ProductBulkItemResult(BaseModel):
+    index: int
+    status: str  # created, updated, unchanged, invalid
+    id: Optional[str] = None
+    error: Optional[str] = None
+
+class ProductBulkResponse(BaseModel):
+    created: int
+    updated: int
+    unchanged: int
+    invalid: int
+    results: List[ProductBulkItemResult]
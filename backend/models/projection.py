@@ -0,0 +1,23 @@
+"""
+MongoDB projections derived from the response models
+
+Each model module declares the projection its endpoints read with, next to
+the model itself, so a document only brings back the fields the response
+serializes. Projections are built from the model fields, so adding a field
+to a model also adds it to the reads.
+"""
+from pydantic import BaseModel
+from typing import Dict, Iterable, Type
+
+# For reads that only check whether a document exists
+EXISTS_PROJECTION: Dict[str, int] = {"_id": 1}
+
+def model_projection(
+    model: Type[BaseModel],
+    exclude: Iterable[str] = (),
+    extra: Iterable[str] = ()
+) -> Dict[str, int]:
+    """Build an inclusion projection for a model's fields (never including _id)"""
+    excluded = set(exclude)
+    fields = [field for field in model.model_fields if field not in excluded]
+    return {"_id": 0, **{field: 1 for field in [*fields, *extra]}}
@@ -3,6 +3,7 @@ from typing import Optional, List
 from datetime import datetime
 from enum import Enum
 import uuid
+from models.projection import model_projection
 
 class TicketStatus(str, Enum):
     open = "open"
@@ -154,3 +155,8 @@ class KnowledgeBaseUpdate(BaseModel):
     title: Optional[str] = None
     content: Optional[str] = None
     category: Optional[str] = None
+
+SUPPORT_TICKET_PROJECTION = model_projection(SupportTicket)
+TICKET_RESPONSE_PROJECTION = model_projection(SupportTicketResponse)
+CHAT_SESSION_PROJECTION = model_projection(ChatSession)
+CHAT_MESSAGE_PROJECTION = model_projection(ChatMessage)
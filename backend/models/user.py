@@ -2,6 +2,7 @@ from pydantic import BaseModel, Field
 from typing import Optional
 from datetime import datetime
 import uuid
+from models.projection import model_projection
 
 class User(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -13,6 +14,7 @@ class User(BaseModel):
     address: str
     license_number: str
     subdomain: str
+    subdomain_lower: Optional[str] = None  # Normalized subdomain used for slug lookups
     is_active: bool = True
     role: str = "admin"  # admin, manager, support, viewer
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -48,4 +50,8 @@ class Token(BaseModel):
     token_type: str
 
 class TokenData(BaseModel):
-    email: Optional[str] = None
\ No newline at end of file
+    email: Optional[str] = None
+
+# Authenticated principal reads; the password hash is only loaded to log in
+USER_PROJECTION = model_projection(User, exclude=("hashed_password",))
+USER_LOGIN_PROJECTION = {"_id": 0, "email": 1, "hashed_password": 1}
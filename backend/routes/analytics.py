@@ -4,6 +4,8 @@ from datetime import datetime, timedelta
 from typing import List, Dict, Any
 from auth.auth import get_current_active_user
 from database import get_database
+from services.order_metrics import get_order_metrics, sum_buckets, format_change
+from services.order_rollups import get_rollup_totals, get_rollup_buckets, get_rollup_top_products
 
 router = APIRouter(prefix="/analytics", tags=["Analytics"])
 
@@ -13,36 +15,17 @@ async def get_analytics_overview(
 ):
     """Get comprehensive analytics overview"""
     db = await get_database()
-    # Sales metrics
-    total_orders = await db.orders.count_documents({"user_id": current_user["id"]})
-    
-    revenue_pipeline = [
-        {"$match": {"user_id": current_user["id"]}},
-        {"$group": {"_id": None, "total_revenue": {"$sum": "$total"}}}
-    ]
-    revenue_result = await db.orders.aggregate(revenue_pipeline).to_list(1)
-    total_revenue = revenue_result[0]["total_revenue"] if revenue_result else 0
-    
-    avg_order_pipeline = [
-        {"$match": {"user_id": current_user["id"]}},
-        {"$group": {"_id": None, "avg_order": {"$avg": "$total"}}}
-    ]
-    avg_result = await db.orders.aggregate(avg_order_pipeline).to_list(1)
-    avg_order_value = avg_result[0]["avg_order"] if avg_result else 0
+    metrics = await get_rollup_totals(db, current_user["id"])
+    total_orders = metrics["total_orders"]
+    total_revenue = metrics["total_revenue"]
+    avg_order_value = metrics["avg_order_value"]
+    delivered_orders = metrics["status_counts"].get("delivered", 0)
     
     # Customer satisfaction (dummy calculation based on delivered orders)
-    delivered_orders = await db.orders.count_documents({
-        "user_id": current_user["id"],
-        "status": "delivered"
-    })
     customer_satisfaction = min(4.8, 4.2 + (delivered_orders / total_orders * 0.6)) if total_orders > 0 else 4.5
     
     # Delivery performance
-    on_time_deliveries = await db.orders.count_documents({
-        "user_id": current_user["id"],
-        "status": "delivered"
-    })
-    delivery_performance = (on_time_deliveries / total_orders * 100) if total_orders > 0 else 0
+    delivery_performance = (delivered_orders / total_orders * 100) if total_orders > 0 else 0
     
     return {
         "monthly_revenue": total_revenue,
@@ -60,58 +43,48 @@ async def get_sales_performance(
     db = await get_database()
     now = datetime.utcnow()
     today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    tomorrow = today + timedelta(days=1)
     yesterday = today - timedelta(days=1)
-    week_start = today - timedelta(days=7)
+    # The week is the last seven days including today
+    week_start = tomorrow - timedelta(days=7)
     last_week_start = week_start - timedelta(days=7)
     month_start = today.replace(day=1)
     last_month = (month_start - timedelta(days=1)).replace(day=1)
+    # The month so far is compared against the same days of last month, up to its end
+    last_month_to_date = min(last_month + (tomorrow - month_start), month_start)
     
+    # Each period is compared against the period of equal length right before it
     periods = [
-        {"name": "Today", "start": today, "end": now},
-        {"name": "Yesterday", "start": yesterday, "end": today},
-        {"name": "This Week", "start": week_start, "end": now},
-        {"name": "Last Week", "start": last_week_start, "end": week_start},
-        {"name": "This Month", "start": month_start, "end": now},
-        {"name": "Last Month", "start": last_month, "end": month_start},
+        {"name": "Today", "start": today, "end": tomorrow,
+         "previous": (yesterday, today)},
+        {"name": "Yesterday", "start": yesterday, "end": today,
+         "previous": (yesterday - timedelta(days=1), yesterday)},
+        {"name": "This Week", "start": week_start, "end": tomorrow,
+         "previous": (last_week_start, week_start)},
+        {"name": "Last Week", "start": last_week_start, "end": week_start,
+         "previous": (last_week_start - timedelta(days=7), last_week_start)},
+        {"name": "This Month", "start": month_start, "end": tomorrow,
+         "previous": (last_month, last_month_to_date)},
+        {"name": "Last Month", "start": last_month, "end": month_start,
+         "previous": ((last_month - timedelta(days=1)).replace(day=1), last_month)},
     ]
     
+    # The daily rollups for the oldest window cover every period above
+    window_start = min(period["previous"][0] for period in periods)
+    buckets = await get_rollup_buckets(db, current_user["id"], window_start)
+    
     results = []
     for period in periods:
-        pipeline = [
-            {
-                "$match": {
-                    "user_id": current_user["id"],
-                    "created_at": {"$gte": period["start"], "$lt": period["end"]}
-                }
-            },
-            {
-                "$group": {
-                    "_id": None,
-                    "revenue": {"$sum": "$total"},
-                    "orders": {"$sum": 1},
-                    "avg_order": {"$avg": "$total"}
-                }
-            }
-        ]
-        
-        result = await db.orders.aggregate(pipeline).to_list(1)
-        if result:
-            data = result[0]
-            results.append({
-                "period": period["name"],
-                "revenue": f"${data['revenue']:.2f}",
-                "orders": data["orders"],
-                "avg_order": f"${data['avg_order']:.2f}",
-                "change": "+12.5%"  # Placeholder
-            })
-        else:
-            results.append({
-                "period": period["name"],
-                "revenue": "$0.00",
-                "orders": 0,
-                "avg_order": "$0.00",
-                "change": "0%"
-            })
+        data = sum_buckets(buckets, period["start"], period["end"])
+        previous = sum_buckets(buckets, *period["previous"])
+        avg_order = data["revenue"] / data["orders"] if data["orders"] > 0 else 0
+        results.append({
+            "period": period["name"],
+            "revenue": f"${data['revenue']:.2f}",
+            "orders": data["orders"],
+            "avg_order": f"${avg_order:.2f}",
+            "change": format_change(data["revenue"], previous["revenue"])
+        })
     
     return results
 
@@ -121,37 +94,14 @@ async def get_order_stats(
 ):
     """Get order statistics"""
     db = await get_database()
+    metrics = await get_order_metrics(db, current_user["id"])
+    status_counts = metrics["status_counts"]
     
-    # Get total orders
-    total_orders = await db.orders.count_documents({"user_id": current_user["id"]})
-    
-    # Get pending orders
-    pending_orders = await db.orders.count_documents({
-        "user_id": current_user["id"],
-        "status": "pending"
-    })
-    
-    # Get in-transit orders
-    in_transit_orders = await db.orders.count_documents({
-        "user_id": current_user["id"],
-        "status": {"$in": ["en-route", "preparing"]}
-    })
-    
-    # Get delivered orders today
-    today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-    delivered_today = await db.orders.count_documents({
-        "user_id": current_user["id"],
-        "status": "delivered",
-        "updated_at": {"$gte": today_start}
-    })
-    
-    # Get total revenue
-    revenue_pipeline = [
-        {"$match": {"user_id": current_user["id"]}},
-        {"$group": {"_id": None, "total_revenue": {"$sum": "$total"}}}
-    ]
-    revenue_result = await db.orders.aggregate(revenue_pipeline).to_list(1)
-    total_revenue = revenue_result[0]["total_revenue"] if revenue_result else 0
+    total_orders = metrics["total_orders"]
+    pending_orders = status_counts.get("pending", 0)
+    in_transit_orders = status_counts.get("en-route", 0) + status_counts.get("preparing", 0)
+    delivered_today = metrics["delivered_today"]
+    total_revenue = metrics["total_revenue"]
     
     return {
         "total_orders": total_orders,
@@ -167,27 +117,13 @@ async def get_top_products(
 ):
     """Get top performing products"""
     db = await get_database()
-    pipeline = [
-        {"$match": {"user_id": current_user["id"]}},
-        {"$unwind": "$items"},
-        {
-            "$group": {
-                "_id": "$items.product_name",
-                "sales": {"$sum": "$items.quantity"},
-                "revenue": {"$sum": "$items.total"}
-            }
-        },
-        {"$sort": {"revenue": -1}},
-        {"$limit": 5}
-    ]
-    
-    results = await db.orders.aggregate(pipeline).to_list(5)
+    results = await get_rollup_top_products(db, current_user["id"], 5)
     
     total_revenue = sum(item["revenue"] for item in results)
     
     return [
         {
-            "name": item["_id"],
+            "name": item["name"],
             "sales": item["sales"],
             "revenue": f"${item['revenue']:.2f}",
             "percentage": f"{(item['revenue'] / total_revenue * 100):.1f}%" if total_revenue > 0 else "0%"
@@ -201,11 +137,9 @@ async def get_delivery_metrics(
 ):
     """Get delivery performance metrics"""
     db = await get_database()
-    total_orders = await db.orders.count_documents({"user_id": current_user["id"]})
-    delivered_orders = await db.orders.count_documents({
-        "user_id": current_user["id"],
-        "status": "delivered"
-    })
+    metrics = await get_rollup_totals(db, current_user["id"])
+    total_orders = metrics["total_orders"]
+    delivered_orders = metrics["status_counts"].get("delivered", 0)
     
     # Calculate metrics (using placeholder calculations)
     metrics = [
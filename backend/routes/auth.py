@@ -2,15 +2,18 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import HTTPBearer
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from datetime import timedelta
+from models.projection import EXISTS_PROJECTION
 from models.user import User, UserCreate, UserLogin, Token
 from database import get_database
+from services.tenant_resolver import normalize_subdomain
 from auth.auth import (
     authenticate_user, 
     create_access_token, 
-    get_password_hash,
     get_current_active_user,
     ACCESS_TOKEN_EXPIRE_MINUTES
 )
+from auth.passwords import hash_password_async
+from auth.principal_cache import invalidate_principal
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
@@ -19,15 +22,16 @@ async def register(user_data: UserCreate):
     """Register a new user and create their storefront"""
     db = await get_database()
     # Check if user already exists
-    existing_user = await db.users.find_one({"email": user_data.email})
+    existing_user = await db.users.find_one({"email": user_data.email}, EXISTS_PROJECTION)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
-    # Check if subdomain is taken
-    existing_subdomain = await db.users.find_one({"subdomain": user_data.subdomain})
+    # Check if subdomain is taken (subdomains are case-insensitive)
+    subdomain_lower = normalize_subdomain(user_data.subdomain)
+    existing_subdomain = await db.users.find_one({"subdomain_lower": subdomain_lower}, EXISTS_PROJECTION)
     if existing_subdomain:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -35,13 +39,16 @@ async def register(user_data: UserCreate):
         )
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await hash_password_async(user_data.password)
     user_dict = user_data.dict()
     del user_dict["password"]
     user_dict["hashed_password"] = hashed_password
+    user_dict["subdomain_lower"] = subdomain_lower
     
     new_user = User(**user_dict)
     await db.users.insert_one(new_user.dict())
+    # Store users are cached by email; drop anything left from a removed account
+    invalidate_principal("user", new_user.email)
     
     # Automatically create a default storefront for the new user
     default_storefront = {
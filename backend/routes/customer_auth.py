@@ -1,6 +1,5 @@
 from fastapi import APIRouter, HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from passlib.context import CryptContext
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
 from typing import Optional
@@ -8,15 +7,23 @@ import logging
 
 from models.customer_auth import (
     CustomerAuth, CustomerSignup, CustomerLogin, CustomerProfile, 
-    CustomerUpdateProfile, CustomerAuthResponse
+    CustomerUpdateProfile, CustomerAuthResponse,
+    CUSTOMER_AUTH_PROJECTION, CUSTOMER_LOGIN_PROJECTION, CUSTOMER_PROFILE_PROJECTION
 )
+from models.order import ORDER_PROJECTION
+from models.projection import EXISTS_PROJECTION
 from database import get_database
+from auth.passwords import hash_password_async, verify_password_async
+from auth.principal_cache import (
+    token_issued_at, get_cached_principal, cache_principal, invalidate_principal
+)
+from services.customer_directory import sync_customer_directory
+from services.tenant_resolver import resolve_store_id
 
 router = APIRouter(prefix="/customer", tags=["Customer Authentication"])
 logger = logging.getLogger(__name__)
 
 # Security setup
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
 
 # JWT settings
@@ -24,14 +31,6 @@ SECRET_KEY = "your-secret-key-here"  # In production, use a real secret key from
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-def verify_password(plain_password, hashed_password):
-    """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
-
-def get_password_hash(password):
-    """Hash a password"""
-    return pwd_context.hash(password)
-
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create a JWT access token"""
     to_encode = data.copy()
@@ -39,7 +38,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=15)
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "iat": datetime.utcnow()})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
@@ -59,10 +58,18 @@ async def get_current_customer(credentials: HTTPAuthorizationCredentials = Depen
     except JWTError:
         raise credentials_exception
     
+    # Reuse the customer this token resolved to on a recent request
+    issued_at = token_issued_at(payload)
+    customer = get_cached_principal("customer", customer_id, issued_at)
+    if customer is not None:
+        return customer
+    
     db = await get_database()
-    customer = await db.customer_auth.find_one({"id": customer_id})
+    customer = await db.customer_auth.find_one({"id": customer_id}, CUSTOMER_AUTH_PROJECTION)
     if customer is None:
         raise credentials_exception
+    
+    cache_principal("customer", customer_id, issued_at, customer)
     return customer
 
 @router.post("/signup", response_model=CustomerAuthResponse)
@@ -72,20 +79,18 @@ async def customer_signup(signup_data: CustomerSignup):
         db = await get_database()
         
         # Get store information from slug
-        store_user = await db.users.find_one({"subdomain": signup_data.store_slug})
-        if not store_user:
+        store_id = await resolve_store_id(db, signup_data.store_slug)
+        if not store_id:
             raise HTTPException(
                 status_code=404,
                 detail="Store not found"
             )
         
-        store_id = store_user["id"]
-        
         # Check if customer already exists for this store
         existing_customer = await db.customer_auth.find_one({
             "email": signup_data.email,
             "store_id": store_id
-        })
+        }, EXISTS_PROJECTION)
         
         if existing_customer:
             raise HTTPException(
@@ -94,7 +99,7 @@ async def customer_signup(signup_data: CustomerSignup):
             )
         
         # Hash password
-        password_hash = get_password_hash(signup_data.password)
+        password_hash = await hash_password_async(signup_data.password)
         
         # Create new customer
         new_customer = CustomerAuth(
@@ -109,6 +114,7 @@ async def customer_signup(signup_data: CustomerSignup):
         
         # Insert into database
         await db.customer_auth.insert_one(new_customer.dict())
+        await sync_customer_directory(db, store_id, new_customer.email)
         
         # Create access token
         access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -154,20 +160,18 @@ async def customer_login(login_data: CustomerLogin):
         db = await get_database()
         
         # Get store information from slug
-        store_user = await db.users.find_one({"subdomain": login_data.store_slug})
-        if not store_user:
+        store_id = await resolve_store_id(db, login_data.store_slug)
+        if not store_id:
             raise HTTPException(
                 status_code=404,
                 detail="Store not found"
             )
         
-        store_id = store_user["id"]
-        
         # Find customer
         customer = await db.customer_auth.find_one({
             "email": login_data.email,
             "store_id": store_id
-        })
+        }, CUSTOMER_LOGIN_PROJECTION)
         
         if not customer:
             raise HTTPException(
@@ -176,7 +180,7 @@ async def customer_login(login_data: CustomerLogin):
             )
         
         # Verify password
-        if not verify_password(login_data.password, customer["password_hash"]):
+        if not await verify_password_async(login_data.password, customer["password_hash"]):
             raise HTTPException(
                 status_code=401,
                 detail="Invalid email or password"
@@ -261,9 +265,11 @@ async def update_customer_profile(
             {"id": current_customer["id"]},
             {"$set": update_data}
         )
+        invalidate_principal("customer", current_customer["id"])
         
         # Get updated customer
-        updated_customer = await db.customer_auth.find_one({"id": current_customer["id"]})
+        updated_customer = await db.customer_auth.find_one({"id": current_customer["id"]}, CUSTOMER_PROFILE_PROJECTION)
+        await sync_customer_directory(db, updated_customer["store_id"], updated_customer["email"])
         
         return CustomerProfile(
             id=updated_customer["id"],
@@ -297,10 +303,11 @@ async def get_customer_orders(current_customer: dict = Depends(get_current_custo
     try:
         db = await get_database()
         
-        # Get customer's orders
+        # Orders record the customer by email within the store, not by account id
         orders = await db.orders.find({
-            "customer_id": current_customer["id"]
-        }).sort("created_at", -1).to_list(100)
+            "user_id": current_customer["store_id"],
+            "customer_email": current_customer["email"]
+        }, ORDER_PROJECTION).sort("created_at", -1).to_list(100)
         
         return {
             "success": True,
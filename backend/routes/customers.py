@@ -1,60 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from typing import List
-from models.customer import Customer, CustomerCreate, CustomerUpdate
+from typing import List, Optional
+from models.customer import (
+    Customer, CustomerCreate, CustomerUpdate, CUSTOMER_PROJECTION, CUSTOMER_EMAIL_PROJECTION
+)
+from models.projection import EXISTS_PROJECTION
 from auth.auth import get_current_active_user
 from database import get_database
+from services.query_batch import group_totals
+from services.customer_directory import sync_customer_directory
+from services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, fetch_page
+from services.serialization import page_response
 
 router = APIRouter(prefix="/customers", tags=["Customers"])
 
 @router.get("/", response_model=List[Customer])
 async def get_customers(
+    response: Response,
+    after: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    include_total: bool = False,
     current_user: dict = Depends(get_current_active_user)
 ):
-    """Get all customers for the current user's store"""
+    """Get all customers for the current user's store, newest first, one page at a time"""
     db = await get_database()
     
-    # Get customers from BOTH collections to ensure we show all customers
-    
-    # 1. Get customers from the storefront customer_auth collection
-    storefront_customers = await db.customer_auth.find({"store_id": current_user["id"]}).to_list(1000)
-    
-    # 2. Get customers from the regular customers collection
-    regular_customers = await db.customers.find({"user_id": current_user["id"]}).to_list(1000)
-    
-    # Convert storefront customers to the Customer model format
-    all_customers = []
-    
-    # Add storefront customers (convert format)
-    for customer in storefront_customers:
-        # Convert customer_auth format to customer format
-        customer_data = {
-            "id": customer.get("id"),
-            "name": customer.get("name"),
-            "email": customer.get("email"),
-            "phone": customer.get("phone"),
-            "address": customer.get("address", ""),
-            "total_orders": customer.get("total_orders", 0),
-            "total_spent": customer.get("total_spent", 0.0),
-            "average_order_value": customer.get("total_spent", 0.0) / max(customer.get("total_orders", 1), 1),
-            "loyalty_tier": customer.get("loyalty_tier", "bronze"),
-            "status": customer.get("status", "active"),
-            "created_at": customer.get("created_at"),
-            "last_order_date": customer.get("last_order_date"),
-            "user_id": current_user["id"],
-            "source": "storefront"  # Add a field to identify the source
-        }
-        
-        all_customers.append(Customer(**customer_data))
-    
-    # Add regular customers (they're already in the right format)
-    for customer in regular_customers:
-        # Skip if we already have this customer from storefront
-        existing_emails = [c.email for c in all_customers]
-        if customer.get("email") not in existing_emails:
-            all_customers.append(Customer(**customer))
-    
-    return all_customers
+    # customer_directory already merges storefront and admin customers, one entry per email
+    page = await fetch_page(db.customer_directory, {"user_id": current_user["id"]}, after, limit, include_total, CUSTOMER_PROJECTION)
+    return page_response(Customer, page, response)
 
 @router.post("/", response_model=Customer)
 async def create_customer(
@@ -67,7 +40,7 @@ async def create_customer(
     existing_customer = await db.customers.find_one({
         "email": customer_data.email,
         "user_id": current_user["id"]
-    })
+    }, EXISTS_PROJECTION)
     
     if existing_customer:
         raise HTTPException(
@@ -80,6 +53,7 @@ async def create_customer(
     
     new_customer = Customer(**customer_dict)
     await db.customers.insert_one(new_customer.dict())
+    await sync_customer_directory(db, current_user["id"], new_customer.email)
     
     return new_customer
 
@@ -88,12 +62,13 @@ async def get_customer(
     customer_id: str,
     current_user: dict = Depends(get_current_active_user)
 ):
-    """Get a specific customer"""
+    """Get a specific customer, storefront sign-ups included"""
     db = await get_database()
-    customer = await db.customers.find_one({
+    # Read the directory, like the list, so every listed customer can be opened
+    customer = await db.customer_directory.find_one({
         "id": customer_id,
         "user_id": current_user["id"]
-    })
+    }, CUSTOMER_PROJECTION)
     
     if not customer:
         raise HTTPException(
@@ -115,7 +90,7 @@ async def update_customer(
     existing_customer = await db.customers.find_one({
         "id": customer_id,
         "user_id": current_user["id"]
-    })
+    }, CUSTOMER_EMAIL_PROJECTION)
     
     if not existing_customer:
         raise HTTPException(
@@ -135,7 +110,12 @@ async def update_customer(
     updated_customer = await db.customers.find_one({
         "id": customer_id,
         "user_id": current_user["id"]
-    })
+    }, CUSTOMER_PROJECTION)
+    
+    # Refresh the directory under the old email and, if it changed, the new one
+    await sync_customer_directory(db, current_user["id"], existing_customer.get("email"))
+    if updated_customer.get("email") != existing_customer.get("email"):
+        await sync_customer_directory(db, current_user["id"], updated_customer.get("email"))
     
     return Customer(**updated_customer)
 
@@ -146,17 +126,19 @@ async def delete_customer(
 ):
     """Delete a customer"""
     db = await get_database()
-    result = await db.customers.delete_one({
+    deleted_customer = await db.customers.find_one_and_delete({
         "id": customer_id,
         "user_id": current_user["id"]
-    })
+    }, CUSTOMER_EMAIL_PROJECTION)
     
-    if result.deleted_count == 0:
+    if not deleted_customer:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Customer not found"
         )
     
+    await sync_customer_directory(db, current_user["id"], deleted_customer.get("email"))
+    
     return {"message": "Customer deleted successfully"}
 
 @router.get("/stats/overview")
@@ -166,46 +148,26 @@ async def get_customer_stats(
     """Get customer statistics overview"""
     db = await get_database()
     
-    # Get customers from both collections
-    storefront_customers_count = await db.customer_auth.count_documents({"store_id": current_user["id"]})
-    regular_customers_count = await db.customers.count_documents({"user_id": current_user["id"]})
-    
-    # Get unique customers (avoid double counting)
-    storefront_customers = await db.customer_auth.find({"store_id": current_user["id"]}).to_list(1000)
-    regular_customers = await db.customers.find({"user_id": current_user["id"]}).to_list(1000)
-    
-    # Create a set of unique emails to avoid double counting
-    unique_emails = set()
-    total_spent = 0
-    total_orders = 0
-    active_count = 0
-    repeat_customers_count = 0
-    
-    # Process storefront customers
-    for customer in storefront_customers:
-        email = customer.get("email")
-        if email not in unique_emails:
-            unique_emails.add(email)
-            total_spent += customer.get("total_spent", 0.0)
-            total_orders += customer.get("total_orders", 0)
-            if customer.get("status") == "active":
-                active_count += 1
-            if customer.get("total_orders", 0) > 1:
-                repeat_customers_count += 1
-    
-    # Process regular customers (only if not already counted)
-    for customer in regular_customers:
-        email = customer.get("email")
-        if email not in unique_emails:
-            unique_emails.add(email)
-            total_spent += customer.get("total_spent", 0.0)
-            total_orders += customer.get("total_orders", 0)
-            if customer.get("status") == "active":
-                active_count += 1
-            if customer.get("total_orders", 0) > 1:
-                repeat_customers_count += 1
-    
-    total_customers = len(unique_emails)
+    # One pass over the directory, which counts each email once
+    pipeline = [
+        {"$match": {"user_id": current_user["id"]}},
+        {"$group": {
+            "_id": None,
+            "total_customers": {"$sum": 1},
+            "active_count": {"$sum": {"$cond": [{"$eq": ["$status", "active"]}, 1, 0]}},
+            "repeat_customers_count": {"$sum": {"$cond": [{"$gt": ["$total_orders", 1]}, 1, 0]}},
+            "total_spent": {"$sum": "$total_spent"},
+            "total_orders": {"$sum": "$total_orders"}
+        }}
+    ]
+    result = await db.customer_directory.aggregate(pipeline).to_list(1)
+    totals = result[0] if result else {}
+    total_spent = totals.get("total_spent", 0)
+    total_orders = totals.get("total_orders", 0)
+    active_count = totals.get("active_count", 0)
+    repeat_customers_count = totals.get("repeat_customers_count", 0)
+    
+    total_customers = totals.get("total_customers", 0)
     avg_order_value = (total_spent / total_orders) if total_orders > 0 else 0
     repeat_percentage = (repeat_customers_count / total_customers * 100) if total_customers > 0 else 0
     
@@ -225,22 +187,11 @@ async def get_loyalty_tiers(
     db = await get_database()
     
     # For shop admins, only count storefront customers
-    bronze_count = await db.customer_auth.count_documents({
-        "store_id": current_user["id"],
-        "loyalty_tier": "bronze"
-    })
-    silver_count = await db.customer_auth.count_documents({
-        "store_id": current_user["id"],
-        "loyalty_tier": "silver"
-    })
-    gold_count = await db.customer_auth.count_documents({
-        "store_id": current_user["id"],
-        "loyalty_tier": "gold"
-    })
-    platinum_count = await db.customer_auth.count_documents({
-        "store_id": current_user["id"],
-        "loyalty_tier": "platinum"
-    })
+    by_tier = await group_totals(db.customer_auth, {"store_id": current_user["id"]}, ["loyalty_tier"])
+    bronze_count = by_tier.get(("bronze",), {}).get("count", 0)
+    silver_count = by_tier.get(("silver",), {}).get("count", 0)
+    gold_count = by_tier.get(("gold",), {}).get("count", 0)
+    platinum_count = by_tier.get(("platinum",), {}).get("count", 0)
     
     return {
         "bronze": {"count": bronze_count, "min_spent": 0, "discount": "5%"},
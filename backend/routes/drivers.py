@@ -1,20 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from typing import List
-from models.driver import Driver, DriverCreate, DriverUpdate
+from typing import List, Optional
+from models.driver import Driver, DriverCreate, DriverUpdate, DRIVER_PROJECTION
+from models.projection import EXISTS_PROJECTION
 from auth.auth import get_current_active_user
 from database import get_database
+from services.query_batch import gather_queries, group_totals
+from services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, fetch_page
+from services.serialization import page_response
 
 router = APIRouter(prefix="/drivers", tags=["Drivers"])
 
 @router.get("/", response_model=List[Driver])
 async def get_drivers(
+    response: Response,
+    after: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    include_total: bool = False,
     current_user: dict = Depends(get_current_active_user)
 ):
-    """Get all drivers for the current user's store"""
+    """Get all drivers for the current user's store, newest first, one page at a time"""
     db = await get_database()
-    drivers = await db.drivers.find({"user_id": current_user["id"]}).to_list(1000)
-    return [Driver(**driver) for driver in drivers]
+    page = await fetch_page(db.drivers, {"user_id": current_user["id"]}, after, limit, include_total, DRIVER_PROJECTION)
+    return page_response(Driver, page, response)
 
 @router.post("/", response_model=Driver)
 async def create_driver(
@@ -27,7 +35,7 @@ async def create_driver(
     existing_driver = await db.drivers.find_one({
         "email": driver_data.email,
         "user_id": current_user["id"]
-    })
+    }, EXISTS_PROJECTION)
     
     if existing_driver:
         raise HTTPException(
@@ -53,7 +61,7 @@ async def get_driver(
     driver = await db.drivers.find_one({
         "id": driver_id,
         "user_id": current_user["id"]
-    })
+    }, DRIVER_PROJECTION)
     
     if not driver:
         raise HTTPException(
@@ -75,7 +83,7 @@ async def update_driver(
     existing_driver = await db.drivers.find_one({
         "id": driver_id,
         "user_id": current_user["id"]
-    })
+    }, EXISTS_PROJECTION)
     
     if not existing_driver:
         raise HTTPException(
@@ -95,7 +103,7 @@ async def update_driver(
     updated_driver = await db.drivers.find_one({
         "id": driver_id,
         "user_id": current_user["id"]
-    })
+    }, DRIVER_PROJECTION)
     
     return Driver(**updated_driver)
 
@@ -125,23 +133,20 @@ async def get_driver_stats(
 ):
     """Get driver statistics overview"""
     db = await get_database()
-    total_drivers = await db.drivers.count_documents({"user_id": current_user["id"]})
-    active_drivers = await db.drivers.count_documents({
-        "user_id": current_user["id"],
-        "status": "active"
-    })
-    on_delivery = await db.drivers.count_documents({
-        "user_id": current_user["id"],
-        "status": "on-delivery"
-    })
     
-    # Calculate average rating
+    # Counts per status and the average rating, fetched concurrently
     pipeline = [
         {"$match": {"user_id": current_user["id"]}},
         {"$group": {"_id": None, "avg_rating": {"$avg": "$rating"}}}
     ]
-    rating_result = await db.drivers.aggregate(pipeline).to_list(1)
-    avg_rating = rating_result[0]["avg_rating"] if rating_result else 0
+    by_status, rating_result = await gather_queries(
+        group_totals(db.drivers, {"user_id": current_user["id"]}, ["status"]),
+        db.drivers.aggregate(pipeline).to_list(1)
+    )
+    total_drivers = sum(totals["count"] for totals in by_status.values())
+    active_drivers = by_status.get(("active",), {}).get("count", 0)
+    on_delivery = by_status.get(("on-delivery",), {}).get("count", 0)
+    avg_rating = (rating_result[0]["avg_rating"] if rating_result else 0) or 0
     
     return {
         "total_drivers": total_drivers,
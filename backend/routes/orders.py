@@ -1,21 +1,54 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from typing import List
+from typing import List, Optional
 from datetime import datetime
-from models.order import Order, OrderCreate, OrderUpdate
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError
+from models.order import (
+    Order, OrderCreate, OrderUpdate, OrderBulkCreate, OrderBulkItemResult, OrderBulkResponse, ORDER_PROJECTION
+)
 from auth.auth import get_current_active_user
 from database import get_database
+from services.customer_directory import sync_customer_directory, sync_customer_directories
+from services.customer_stats import apply_order_to_customer, apply_orders_to_customers
+from services.exporter import DEFAULT_EXPORT_BATCH_SIZE, MAX_EXPORT_BATCH_SIZE, export_query, export_response
+from services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, fetch_page
+from services.serialization import page_response
+from services.order_metrics import get_order_metrics
+from services.order_rollups import (
+    apply_order_created, apply_orders_created, apply_order_status_change, apply_order_deleted
+)
 
 router = APIRouter(prefix="/orders", tags=["Orders"])
 
 @router.get("/", response_model=List[Order])
 async def get_orders(
+    response: Response,
+    after: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    include_total: bool = False,
     current_user: dict = Depends(get_current_active_user)
 ):
-    """Get all orders for the current user's store"""
+    """Get all orders for the current user's store, newest first, one page at a time"""
     db = await get_database()
-    orders = await db.orders.find({"user_id": current_user["id"]}).to_list(1000)
-    return [Order(**order) for order in orders]
+    page = await fetch_page(db.orders, {"user_id": current_user["id"]}, after, limit, include_total, ORDER_PROJECTION)
+    return page_response(Order, page, response)
+
+@router.get("/export")
+async def export_orders(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    batch_size: int = Query(DEFAULT_EXPORT_BATCH_SIZE, ge=1, le=MAX_EXPORT_BATCH_SIZE),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Stream the store's orders created in [start, end) as NDJSON or CSV"""
+    db = await get_database()
+    cursor = db.orders.find(
+        export_query(current_user["id"], start, end),
+        ORDER_PROJECTION
+    ).sort("created_at", 1).batch_size(batch_size)
+    return export_response(cursor, export_format, list(Order.model_fields), "orders", batch_size)
 
 @router.post("/", response_model=Order)
 async def create_order(
@@ -28,13 +61,68 @@ async def create_order(
     order_dict["user_id"] = current_user["id"]
     
     new_order = Order(**order_dict)
-    await db.orders.insert_one(new_order.dict())
+    order_doc = new_order.dict()
+    await db.orders.insert_one(order_doc)
+    await apply_order_created(db, order_doc)
     
     # Update customer data if exists
-    await update_customer_stats(db, order_data.customer_email, order_data.total, current_user["id"])
+    await apply_order_to_customer(
+        db, current_user["id"], order_data.customer_email, order_data.total, new_order.created_at
+    )
+    await sync_customer_directory(db, current_user["id"], order_data.customer_email)
     
     return new_order
 
+@router.post("/bulk", response_model=OrderBulkResponse)
+async def create_orders_bulk(
+    bulk: OrderBulkCreate,
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Create many orders in one request, reporting a result for each one"""
+    db = await get_database()
+    
+    # Validate every order up front; invalid ones are reported, not written
+    results = []
+    order_docs = []
+    positions = []
+    for index, raw_order in enumerate(bulk.orders):
+        try:
+            order_data = OrderCreate(**raw_order)
+        except ValidationError as e:
+            error = "; ".join(
+                f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in e.errors()
+            )
+            results.append(OrderBulkItemResult(index=index, status="invalid", error=error))
+            continue
+        order_doc = Order(**order_data.dict(), user_id=current_user["id"]).dict()
+        order_docs.append(order_doc)
+        positions.append(index)
+        results.append(OrderBulkItemResult(index=index, status="created", id=order_doc["id"]))
+    
+    # Unordered, so one failed write does not stop the rest
+    write_errors = {}
+    if order_docs:
+        try:
+            await db.orders.insert_many(order_docs, ordered=False)
+        except BulkWriteError as e:
+            write_errors = {error["index"]: error.get("errmsg", "Write failed") for error in e.details.get("writeErrors", [])}
+    for doc_index, error in write_errors.items():
+        result = results[positions[doc_index]]
+        result.status = "failed"
+        result.error = error
+    
+    inserted = [order_doc for doc_index, order_doc in enumerate(order_docs) if doc_index not in write_errors]
+    if inserted:
+        await apply_orders_created(db, inserted)
+        await apply_orders_to_customers(db, current_user["id"], inserted)
+        await sync_customer_directories(db, current_user["id"], (order_doc["customer_email"] for order_doc in inserted))
+    
+    return OrderBulkResponse(
+        created=len(inserted),
+        failed=len(bulk.orders) - len(inserted),
+        results=results
+    )
+
 @router.get("/{order_id}", response_model=Order)
 async def get_order(
     order_id: str,
@@ -45,7 +133,7 @@ async def get_order(
     order = await db.orders.find_one({
         "id": order_id,
         "user_id": current_user["id"]
-    })
+    }, ORDER_PROJECTION)
     
     if not order:
         raise HTTPException(
@@ -67,7 +155,7 @@ async def update_order(
     existing_order = await db.orders.find_one({
         "id": order_id,
         "user_id": current_user["id"]
-    })
+    }, ORDER_PROJECTION)
     
     if not existing_order:
         raise HTTPException(
@@ -82,12 +170,16 @@ async def update_order(
             {"id": order_id, "user_id": current_user["id"]},
             {"$set": update_data}
         )
+        if update_data.get("status"):
+            await apply_order_status_change(
+                db, existing_order, existing_order.get("status", "pending"), update_data["status"]
+            )
     
     # Return updated order
     updated_order = await db.orders.find_one({
         "id": order_id,
         "user_id": current_user["id"]
-    })
+    }, ORDER_PROJECTION)
     
     return Order(**updated_order)
 
@@ -98,17 +190,19 @@ async def delete_order(
 ):
     """Delete an order"""
     db = await get_database()
-    result = await db.orders.delete_one({
+    deleted_order = await db.orders.find_one_and_delete({
         "id": order_id,
         "user_id": current_user["id"]
-    })
+    }, ORDER_PROJECTION)
     
-    if result.deleted_count == 0:
+    if not deleted_order:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Order not found"
         )
     
+    await apply_order_deleted(db, deleted_order)
+    
     return {"message": "Order deleted successfully"}
 
 @router.get("/stats/overview")
@@ -117,27 +211,14 @@ async def get_order_stats(
 ):
     """Get order statistics overview"""
     db = await get_database()
-    total_orders = await db.orders.count_documents({"user_id": current_user["id"]})
-    pending_orders = await db.orders.count_documents({
-        "user_id": current_user["id"],
-        "status": "pending"
-    })
-    in_transit = await db.orders.count_documents({
-        "user_id": current_user["id"],
-        "status": "en-route"
-    })
-    delivered_today = await db.orders.count_documents({
-        "user_id": current_user["id"],
-        "status": "delivered"
-    })
-    
-    # Calculate total revenue
-    pipeline = [
-        {"$match": {"user_id": current_user["id"]}},
-        {"$group": {"_id": None, "total_revenue": {"$sum": "$total"}}}
-    ]
-    revenue_result = await db.orders.aggregate(pipeline).to_list(1)
-    total_revenue = revenue_result[0]["total_revenue"] if revenue_result else 0
+    metrics = await get_order_metrics(db, current_user["id"])
+    status_counts = metrics["status_counts"]
+    
+    total_orders = metrics["total_orders"]
+    pending_orders = status_counts.get("pending", 0)
+    in_transit = status_counts.get("en-route", 0)
+    delivered_today = status_counts.get("delivered", 0)
+    total_revenue = metrics["total_revenue"]
     
     return {
         "total_orders": total_orders,
@@ -146,27 +227,3 @@ async def get_order_stats(
         "delivered_today": delivered_today,
         "total_revenue": total_revenue
     }
-
-async def update_customer_stats(db: AsyncIOMotorDatabase, customer_email: str, order_total: float, user_id: str):
-    """Update customer statistics when new order is placed"""
-    customer = await db.customers.find_one({
-        "email": customer_email,
-        "user_id": user_id
-    })
-    
-    if customer:
-        new_total_orders = customer["total_orders"] + 1
-        new_total_spent = customer["total_spent"] + order_total
-        new_avg_order = new_total_spent / new_total_orders
-        
-        await db.customers.update_one(
-            {"email": customer_email, "user_id": user_id},
-            {
-                "$set": {
-                    "total_orders": new_total_orders,
-                    "total_spent": new_total_spent,
-                    "average_order_value": new_avg_order,
-                    "last_order_date": datetime.utcnow()
-                }
-            }
-        )
\ No newline at end of file
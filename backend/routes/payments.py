@@ -1,20 +1,46 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from typing import List
-from models.payment import Payment, PaymentCreate, PaymentUpdate, Payout
+from typing import List, Optional
+from datetime import datetime
+from models.payment import Payment, PaymentCreate, PaymentUpdate, Payout, PAYMENT_PROJECTION, PAYOUT_PROJECTION
+from models.projection import EXISTS_PROJECTION
 from auth.auth import get_current_active_user
 from database import get_database
+from services.exporter import DEFAULT_EXPORT_BATCH_SIZE, MAX_EXPORT_BATCH_SIZE, export_query, export_response
+from services.query_batch import group_totals
+from services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, fetch_page
+from services.serialization import page_response
 
 router = APIRouter(prefix="/payments", tags=["Payments"])
 
 @router.get("/", response_model=List[Payment])
 async def get_payments(
+    response: Response,
+    after: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    include_total: bool = False,
     current_user: dict = Depends(get_current_active_user)
 ):
-    """Get all payments for the current user's store"""
+    """Get all payments for the current user's store, newest first, one page at a time"""
     db = await get_database()
-    payments = await db.payments.find({"user_id": current_user["id"]}).to_list(1000)
-    return [Payment(**payment) for payment in payments]
+    page = await fetch_page(db.payments, {"user_id": current_user["id"]}, after, limit, include_total, PAYMENT_PROJECTION)
+    return page_response(Payment, page, response)
+
+@router.get("/export")
+async def export_payments(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    batch_size: int = Query(DEFAULT_EXPORT_BATCH_SIZE, ge=1, le=MAX_EXPORT_BATCH_SIZE),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Stream the store's payments created in [start, end) as NDJSON or CSV"""
+    db = await get_database()
+    cursor = db.payments.find(
+        export_query(current_user["id"], start, end),
+        PAYMENT_PROJECTION
+    ).sort("created_at", 1).batch_size(batch_size)
+    return export_response(cursor, export_format, list(Payment.model_fields), "payments", batch_size)
 
 @router.post("/", response_model=Payment)
 async def create_payment(
@@ -41,7 +67,7 @@ async def get_payment(
     payment = await db.payments.find_one({
         "id": payment_id,
         "user_id": current_user["id"]
-    })
+    }, PAYMENT_PROJECTION)
     
     if not payment:
         raise HTTPException(
@@ -63,7 +89,7 @@ async def update_payment(
     existing_payment = await db.payments.find_one({
         "id": payment_id,
         "user_id": current_user["id"]
-    })
+    }, EXISTS_PROJECTION)
     
     if not existing_payment:
         raise HTTPException(
@@ -83,7 +109,7 @@ async def update_payment(
     updated_payment = await db.payments.find_one({
         "id": payment_id,
         "user_id": current_user["id"]
-    })
+    }, PAYMENT_PROJECTION)
     
     return Payment(**updated_payment)
 
@@ -93,37 +119,18 @@ async def get_payment_stats(
 ):
     """Get payment statistics overview"""
     db = await get_database()
-    # Total revenue
-    revenue_pipeline = [
-        {"$match": {"user_id": current_user["id"], "status": "completed"}},
-        {"$group": {"_id": None, "total_revenue": {"$sum": "$amount"}}}
-    ]
-    revenue_result = await db.payments.aggregate(revenue_pipeline).to_list(1)
-    total_revenue = revenue_result[0]["total_revenue"] if revenue_result else 0
-    
-    # Total fees
-    fees_pipeline = [
-        {"$match": {"user_id": current_user["id"], "status": "completed"}},
-        {"$group": {"_id": None, "total_fees": {"$sum": "$fee"}}}
-    ]
-    fees_result = await db.payments.aggregate(fees_pipeline).to_list(1)
-    total_fees = fees_result[0]["total_fees"] if fees_result else 0
-    
-    # Pending payouts
-    pending_payouts_pipeline = [
-        {"$match": {"user_id": current_user["id"], "status": "pending"}},
-        {"$group": {"_id": None, "pending_amount": {"$sum": "$net_amount"}}}
-    ]
-    pending_result = await db.payments.aggregate(pending_payouts_pipeline).to_list(1)
-    pending_payouts = pending_result[0]["pending_amount"] if pending_result else 0
-    
-    # Refunds
-    refunds_pipeline = [
-        {"$match": {"user_id": current_user["id"], "status": "refunded"}},
-        {"$group": {"_id": None, "total_refunds": {"$sum": "$amount"}}}
-    ]
-    refunds_result = await db.payments.aggregate(refunds_pipeline).to_list(1)
-    total_refunds = refunds_result[0]["total_refunds"] if refunds_result else 0
+    # Revenue, fees, pending payouts and refunds from one $group by status
+    by_status = await group_totals(
+        db.payments,
+        {"user_id": current_user["id"], "status": {"$in": ["completed", "pending", "refunded"]}},
+        ["status"],
+        sums={"amount": "amount", "fee": "fee", "net_amount": "net_amount"}
+    )
+    completed = by_status.get(("completed",), {})
+    total_revenue = completed.get("amount", 0)
+    total_fees = completed.get("fee", 0)
+    pending_payouts = by_status.get(("pending",), {}).get("net_amount", 0)
+    total_refunds = by_status.get(("refunded",), {}).get("amount", 0)
     
     return {
         "total_revenue": total_revenue,
@@ -134,12 +141,16 @@ async def get_payment_stats(
 
 @router.get("/payouts/", response_model=List[Payout])
 async def get_payouts(
+    response: Response,
+    after: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    include_total: bool = False,
     current_user: dict = Depends(get_current_active_user)
 ):
-    """Get all payouts for the current user's store"""
+    """Get all payouts for the current user's store, newest first, one page at a time"""
     db = await get_database()
-    payouts = await db.payouts.find({"user_id": current_user["id"]}).to_list(1000)
-    return [Payout(**payout) for payout in payouts]
+    page = await fetch_page(db.payouts, {"user_id": current_user["id"]}, after, limit, include_total, PAYOUT_PROJECTION)
+    return page_response(Payout, page, response)
 
 @router.post("/refund/{payment_id}")
 async def refund_payment(
@@ -152,7 +163,7 @@ async def refund_payment(
         "id": payment_id,
         "user_id": current_user["id"],
         "status": "completed"
-    })
+    }, EXISTS_PROJECTION)
     
     if not payment:
         raise HTTPException(
@@ -1,20 +1,38 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from typing import List
-from models.product import Product, ProductCreate, ProductUpdate
+from typing import List, Optional
+from models.product import (
+    Product, ProductCreate, ProductUpdate, ProductBulkResponse, MAX_BULK_PRODUCTS, PRODUCT_PROJECTION
+)
+from models.projection import EXISTS_PROJECTION
 from auth.auth import get_current_active_user
 from database import get_database
+from services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, fetch_page
+from services.serialization import page_response
+from services.potency import potency_fields, potency_query
+from services.product_import import import_products, parse_product_csv
+from services.public_products import public_product_update, with_public_product
+from services.storefront_cache import invalidate_storefront
 
 router = APIRouter(prefix="/products", tags=["Products"])
 
 @router.get("/", response_model=List[Product])
 async def get_products(
+    response: Response,
+    after: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    include_total: bool = False,
+    thc_min: Optional[float] = Query(None, ge=0),
+    thc_max: Optional[float] = Query(None, ge=0),
+    cbd_min: Optional[float] = Query(None, ge=0),
+    cbd_max: Optional[float] = Query(None, ge=0),
     current_user: dict = Depends(get_current_active_user)
 ):
-    """Get all products for the current user's store"""
+    """Get all products for the current user's store, newest first, one page at a time"""
     db = await get_database()
-    products = await db.products.find({"user_id": current_user["id"]}).to_list(1000)
-    return [Product(**product) for product in products]
+    query = {"user_id": current_user["id"], **potency_query(thc_min, thc_max, cbd_min, cbd_max)}
+    page = await fetch_page(db.products, query, after, limit, include_total, PRODUCT_PROJECTION)
+    return page_response(Product, page, response)
 
 @router.post("/", response_model=Product)
 async def create_product(
@@ -25,12 +43,58 @@ async def create_product(
     db = await get_database()
     product_dict = product_data.dict()
     product_dict["user_id"] = current_user["id"]
+    product_dict.update(potency_fields(product_dict))
     
     new_product = Product(**product_dict)
-    await db.products.insert_one(new_product.dict())
+    await db.products.insert_one(with_public_product(new_product.dict()))
+    invalidate_storefront(current_user["id"])
     
     return new_product
 
+@router.post("/bulk", response_model=ProductBulkResponse)
+async def import_products_bulk(
+    request: Request,
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Create or update many products from a JSON body ({"products": [...]}) or a CSV upload (form field "file")"""
+    db = await get_database()
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Upload the catalog as a CSV file in the \"file\" form field"
+            )
+        rows = parse_product_csv(await upload.read())
+    elif content_type.startswith("text/csv"):
+        rows = parse_product_csv(await request.body())
+    else:
+        try:
+            body = await request.json()
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid JSON body")
+        rows = body.get("products") if isinstance(body, dict) else body
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Expected a list of product objects"
+            )
+    
+    if not rows:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No products to import")
+    if len(rows) > MAX_BULK_PRODUCTS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {MAX_BULK_PRODUCTS} products can be imported at once"
+        )
+    
+    result = await import_products(db, current_user["id"], rows)
+    if result.created or result.updated:
+        invalidate_storefront(current_user["id"])
+    return result
+
 @router.get("/{product_id}", response_model=Product)
 async def get_product(
     product_id: str,
@@ -41,7 +105,7 @@ async def get_product(
     product = await db.products.find_one({
         "id": product_id, 
         "user_id": current_user["id"]
-    })
+    }, PRODUCT_PROJECTION)
     
     if not product:
         raise HTTPException(
@@ -63,7 +127,7 @@ async def update_product(
     existing_product = await db.products.find_one({
         "id": product_id,
         "user_id": current_user["id"]
-    })
+    }, EXISTS_PROJECTION)
     
     if not existing_product:
         raise HTTPException(
@@ -73,17 +137,19 @@ async def update_product(
     
     # Update only provided fields
     update_data = product_update.dict(exclude_unset=True)
+    update_data.update(potency_fields(update_data))
     if update_data:
         await db.products.update_one(
             {"id": product_id, "user_id": current_user["id"]},
-            {"$set": update_data}
+            public_product_update(update_data)
         )
+        invalidate_storefront(current_user["id"])
     
     # Return updated product
     updated_product = await db.products.find_one({
         "id": product_id,
         "user_id": current_user["id"]
-    })
+    }, PRODUCT_PROJECTION)
     
     return Product(**updated_product)
 
@@ -105,6 +171,8 @@ async def delete_product(
             detail="Product not found"
         )
     
+    invalidate_storefront(current_user["id"])
+    
     return {"message": "Product deleted successfully"}
 
 @router.get("/stats/overview")
@@ -113,24 +181,26 @@ async def get_product_stats(
 ):
     """Get product statistics overview"""
     db = await get_database()
-    total_products = await db.products.count_documents({"user_id": current_user["id"]})
-    active_products = await db.products.count_documents({
-        "user_id": current_user["id"],
-        "status": "active"
-    })
-    low_stock = await db.products.count_documents({
-        "user_id": current_user["id"],
-        "stock": {"$lt": 10, "$gt": 0}
-    })
-    out_of_stock = await db.products.count_documents({
-        "user_id": current_user["id"],
-        "stock": 0
-    })
+    # One pass over the store's products instead of one count per figure
+    pipeline = [
+        {"$match": {"user_id": current_user["id"]}},
+        {"$group": {
+            "_id": None,
+            "total_products": {"$sum": 1},
+            "active_products": {"$sum": {"$cond": [{"$eq": ["$status", "active"]}, 1, 0]}},
+            "low_stock": {"$sum": {"$cond": [
+                {"$and": [{"$gt": ["$stock", 0]}, {"$lt": ["$stock", 10]}]}, 1, 0
+            ]}},
+            "out_of_stock": {"$sum": {"$cond": [{"$eq": ["$stock", 0]}, 1, 0]}}
+        }}
+    ]
+    result = await db.products.aggregate(pipeline).to_list(1)
+    totals = result[0] if result else {}
     
     return {
-        "total_products": total_products,
-        "active_products": active_products,
-        "low_stock": low_stock,
-        "out_of_stock": out_of_stock
+        "total_products": totals.get("total_products", 0),
+        "active_products": totals.get("active_products", 0),
+        "low_stock": totals.get("low_stock", 0),
+        "out_of_stock": totals.get("out_of_stock", 0)
     }
 
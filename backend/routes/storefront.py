@@ -1,9 +1,17 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
 import logging
 from database import get_database
+from models.projection import EXISTS_PROJECTION, model_projection
 from auth.auth import get_current_user
+from services.potency import potency_query
+from services.public_products import HAS_PUBLIC_VIEW, REPLACE_WITH_PUBLIC
+from services.query_batch import gather_queries
+from services.tenant_resolver import resolve_store_id
+from services.storefront_cache import (
+    get_cached_storefront, cache_storefront, invalidate_storefront, storefront_response
+)
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -26,6 +34,11 @@ class StorefrontConfig(BaseModel):
     announcement_banner: Optional[str] = None
     is_active: bool = True
 
+# Storefront reads load the configuration fields and timestamps, never _id;
+# only the owner's own config read also returns user_id
+STOREFRONT_PROJECTION = model_projection(StorefrontConfig, extra=("created_at", "updated_at"))
+STOREFRONT_OWNER_PROJECTION = model_projection(StorefrontConfig, extra=("user_id", "created_at", "updated_at"))
+
 class StorefrontUpdate(BaseModel):
     dispensary_name: Optional[str] = None
     logo_url: Optional[str] = None
@@ -53,7 +66,7 @@ async def get_storefront_config(current_user: dict = Depends(get_current_user)):
         db = await get_database()
         
         # Get the dispensary's storefront config
-        config = await db.storefronts.find_one({"user_id": current_user["id"]})
+        config = await db.storefronts.find_one({"user_id": current_user["id"]}, STOREFRONT_OWNER_PROJECTION)
         
         if not config:
             # Return default config if none exists
@@ -88,8 +101,6 @@ async def get_storefront_config(current_user: dict = Depends(get_current_user)):
                 "is_active": True
             }
         
-        # Remove MongoDB ObjectId from response
-        config.pop('_id', None)
         return config
         
     except Exception as e:
@@ -121,10 +132,10 @@ async def update_storefront_config(
         if result.matched_count == 0 and result.upserted_id is None:
             raise HTTPException(status_code=500, detail="Failed to update storefront configuration")
         
+        invalidate_storefront(current_user["id"])
+        
         # Return updated config
-        updated_config = await db.storefronts.find_one({"user_id": current_user["id"]})
-        updated_config.pop('_id', None)
-        updated_config.pop('user_id', None)
+        updated_config = await db.storefronts.find_one({"user_id": current_user["id"]}, STOREFRONT_PROJECTION)
         
         return {
             "success": True,
@@ -136,51 +147,39 @@ async def update_storefront_config(
         logger.error(f"Error updating storefront config: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to update storefront configuration")
 
+async def _build_public_storefront(db, user_id: str) -> Dict[str, Any]:
+    """
+    Load and format the public storefront payload for a store owner
+    """
+    # Get storefront config
+    config = await db.storefronts.find_one({"user_id": user_id, "is_active": True}, STOREFRONT_PROJECTION)
+    
+    if not config:
+        raise HTTPException(status_code=404, detail="Storefront not found")
+    
+    # Get the public view of this user's active products
+    products = await db.products.aggregate([
+        {"$match": {"user_id": user_id, "status": "active", **HAS_PUBLIC_VIEW}},
+        REPLACE_WITH_PUBLIC
+    ]).to_list(None)
+    
+    return {
+        "storefront": config,
+        "products": products
+    }
+
 @router.get("/storefront/public/{user_id}")
-async def get_public_storefront(user_id: str):
+async def get_public_storefront(user_id: str, request: Request):
     """
     Get public storefront view for customers (no authentication required)
     """
     try:
-        db = await get_database()
-        
-        # Get storefront config
-        config = await db.storefronts.find_one({"user_id": user_id, "is_active": True})
-        
-        if not config:
-            raise HTTPException(status_code=404, detail="Storefront not found")
+        payload = get_cached_storefront(user_id)
+        if payload is None:
+            db = await get_database()
+            payload = cache_storefront(user_id, await _build_public_storefront(db, user_id))
         
-        # Get products for this user (show only active products)
-        products = await db.products.find({
-            "user_id": user_id, 
-            "status": "active"
-        }).to_list(None)
-        
-        # Remove sensitive data
-        config.pop('_id', None)
-        config.pop('user_id', None)
-        
-        # Format products for public view
-        public_products = []
-        for product in products:
-            public_products.append({
-                "id": str(product["_id"]),
-                "name": product["name"],
-                "category": product["category"],
-                "strain": product.get("strain"),
-                "thc_percentage": product.get("thc_percentage"),
-                "cbd_percentage": product.get("cbd_percentage"),
-                "price": product["price"],
-                "description": product.get("description"),
-                "image_emoji": product.get("image_emoji", "🌿"),
-                "stock": product["stock"],
-                "in_stock": product["stock"] > 0
-            })
-        
-        return {
-            "storefront": config,
-            "products": public_products
-        }
+        return storefront_response(request, payload)
         
     except HTTPException:
         raise
@@ -189,67 +188,122 @@ async def get_public_storefront(user_id: str):
         raise HTTPException(status_code=500, detail="Failed to retrieve storefront")
 
 @router.get("/storefront/slug/{slug}")
-async def get_storefront_by_slug(slug: str):
+async def get_storefront_by_slug(slug: str, request: Request):
     """
     Get public storefront view by slug/subdomain (no authentication required)
     """
     try:
         db = await get_database()
         
-        # First, find the user by subdomain (case-insensitive)
-        import re
-        user = await db.users.find_one({"subdomain": re.compile(f"^{re.escape(slug)}$", re.IGNORECASE)})
-        if not user:
+        # First, resolve the store owner from the subdomain (case-insensitive)
+        user_id = await resolve_store_id(db, slug)
+        if not user_id:
             # Log the lookup failure for debugging
             logger.info(f"Storefront slug not found: {slug}")
             raise HTTPException(status_code=404, detail="Store not found")
         
-        user_id = user["id"]
-        logger.info(f"Found storefront for slug: {slug}, user: {user.get('email')}")
+        payload = get_cached_storefront(user_id)
+        if payload is None:
+            logger.info(f"Found storefront for slug: {slug}, user: {user_id}")
+            payload = cache_storefront(user_id, await _build_public_storefront(db, user_id))
         
-        # Get storefront config
-        config = await db.storefronts.find_one({"user_id": user_id, "is_active": True})
+        return storefront_response(request, payload)
         
-        if not config:
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting storefront by slug: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to retrieve storefront")
+
+# Sort orders for catalog search; "relevance" needs a search term
+CATALOG_SORTS = {
+    "relevance": {"score": {"$meta": "textScore"}, "_id": 1},
+    "name": {"name": 1, "_id": 1},
+    "price_asc": {"price": 1, "_id": 1},
+    "price_desc": {"price": -1, "_id": 1},
+    "newest": {"created_at": -1, "_id": 1},
+    "thc_desc": {"thc_max": -1, "_id": 1},
+    "thc_asc": {"thc_min": 1, "_id": 1},
+    "cbd_desc": {"cbd_max": -1, "_id": 1}
+}
+MAX_CATALOG_PAGE_SIZE = 100
+
+@router.get("/storefront/slug/{slug}/products")
+async def search_storefront_products(
+    slug: str,
+    q: Optional[str] = Query(None, max_length=200, description="Text search over product name and description"),
+    category: Optional[str] = None,
+    strain: Optional[str] = None,
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    in_stock: bool = False,
+    thc_min: Optional[float] = Query(None, ge=0),
+    thc_max: Optional[float] = Query(None, ge=0),
+    cbd_min: Optional[float] = Query(None, ge=0),
+    cbd_max: Optional[float] = Query(None, ge=0),
+    sort: Optional[str] = Query(None, pattern="^(relevance|name|price_asc|price_desc|newest|thc_desc|thc_asc|cbd_desc)$"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(24, ge=1, le=MAX_CATALOG_PAGE_SIZE)
+):
+    """
+    Search and filter a storefront's active products (no authentication required)
+    """
+    try:
+        db = await get_database()
+        
+        user_id = await resolve_store_id(db, slug)
+        if not user_id:
+            raise HTTPException(status_code=404, detail="Store not found")
+        
+        # A deactivated storefront hides its catalog, as _build_public_storefront does
+        if not await db.storefronts.find_one({"user_id": user_id, "is_active": True}, EXISTS_PROJECTION):
             raise HTTPException(status_code=404, detail="Storefront not found")
         
-        # Get products for this user (show only active products)
-        products = await db.products.find({
-            "user_id": user_id, 
-            "status": "active"
-        }).to_list(None)
-        
-        # Remove sensitive data
-        config.pop('_id', None)
-        config.pop('user_id', None)
-        
-        # Format products for public view
-        public_products = []
-        for product in products:
-            public_products.append({
-                "id": str(product["_id"]),
-                "name": product["name"],
-                "category": product["category"],
-                "strain": product.get("strain"),
-                "thc_percentage": product.get("thc_percentage"),
-                "cbd_percentage": product.get("cbd_percentage"),
-                "price": product["price"],
-                "description": product.get("description"),
-                "image_emoji": product.get("image_emoji", "🌿"),
-                "stock": product["stock"],
-                "in_stock": product["stock"] > 0
-            })
+        query: Dict[str, Any] = {"user_id": user_id, "status": "active", **HAS_PUBLIC_VIEW}
+        if category:
+            query["category"] = category
+        if strain:
+            query["strain"] = strain
+        if min_price is not None or max_price is not None:
+            query["price"] = {}
+            if min_price is not None:
+                query["price"]["$gte"] = min_price
+            if max_price is not None:
+                query["price"]["$lte"] = max_price
+        if in_stock:
+            query["stock"] = {"$gt": 0}
+        query.update(potency_query(thc_min, thc_max, cbd_min, cbd_max))
+        
+        q = q.strip() if q else None
+        if q:
+            query["$text"] = {"$search": q}
+        sort = sort or ("relevance" if q else "name")
+        if sort == "relevance" and not q:
+            raise HTTPException(status_code=400, detail="Sorting by relevance requires a search term")
+        
+        products, total = await gather_queries(
+            db.products.aggregate([
+                {"$match": query},
+                {"$sort": CATALOG_SORTS[sort]},
+                {"$skip": skip},
+                {"$limit": limit},
+                REPLACE_WITH_PUBLIC
+            ]).to_list(limit),
+            db.products.count_documents(query)
+        )
         
         return {
-            "storefront": config,
-            "products": public_products
+            "products": products,
+            "total": total,
+            "skip": skip,
+            "limit": limit
         }
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error getting storefront by slug: {str(e)}")
-        raise HTTPException(status_code=500, detail="Failed to retrieve storefront")
+        logger.error(f"Error searching storefront products: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to search products")
 
 @router.get("/storefront/preview")
 async def get_storefront_preview(current_user: dict = Depends(get_current_user)):
@@ -260,7 +314,7 @@ async def get_storefront_preview(current_user: dict = Depends(get_current_user))
         db = await get_database()
         
         # Get storefront config
-        config = await db.storefronts.find_one({"user_id": current_user["id"]})
+        config = await db.storefronts.find_one({"user_id": current_user["id"]}, STOREFRONT_PROJECTION)
         
         if not config:
             config = {
@@ -270,24 +324,13 @@ async def get_storefront_preview(current_user: dict = Depends(get_current_user))
                 "is_active": True
             }
         
-        # Get featured products (first 6)
-        products = await db.products.find({"user_id": current_user["id"], "status": "active"}).limit(6).to_list(None)
-        
-        # Remove sensitive data
-        config.pop('_id', None)
-        config.pop('user_id', None)
-        
-        # Format products for preview
-        preview_products = []
-        for product in products:
-            preview_products.append({
-                "id": str(product["_id"]),
-                "name": product["name"],
-                "category": product["category"],
-                "price": product["price"],
-                "image_emoji": product.get("image_emoji", "🌿"),
-                "in_stock": product["stock"] > 0
-            })
+        # Get featured products (first 6), trimmed to the preview card fields
+        preview_products = await db.products.aggregate([
+            {"$match": {"user_id": current_user["id"], "status": "active", **HAS_PUBLIC_VIEW}},
+            {"$limit": 6},
+            REPLACE_WITH_PUBLIC,
+            {"$project": {"id": 1, "name": 1, "category": 1, "price": 1, "image_emoji": 1, "in_stock": 1}}
+        ]).to_list(6)
         
         return {
             "storefront": config,
@@ -335,40 +378,27 @@ async def get_product_by_id(slug: str, product_id: str):
         from bson import ObjectId
         db = await get_database()
         
-        # First, find the user by subdomain
-        user = await db.users.find_one({"subdomain": slug})
-        if not user:
+        # First, resolve the store owner from the subdomain
+        user_id = await resolve_store_id(db, slug)
+        if not user_id:
             raise HTTPException(status_code=404, detail="Store not found")
         
-        user_id = user["id"]
-        
-        # Get the specific product
+        # Get the public view of the specific product
         product = await db.products.find_one({
             "_id": ObjectId(product_id),
             "user_id": user_id, 
-            "status": "active"
-        })
+            "status": "active",
+            **HAS_PUBLIC_VIEW
+        }, {"_id": 0, "public": 1})
         
         if not product:
             raise HTTPException(status_code=404, detail="Product not found")
         
         # Get storefront config for dispensary info
-        config = await db.storefronts.find_one({"user_id": user_id, "is_active": True})
-        
-        # Format product for public view
-        public_product = {
-            "id": str(product["_id"]),
-            "name": product["name"],
-            "category": product["category"],
-            "strain": product.get("strain"),
-            "thc_percentage": product.get("thc_percentage"),
-            "cbd_percentage": product.get("cbd_percentage"),
-            "price": product["price"],
-            "description": product.get("description"),
-            "image_emoji": product.get("image_emoji", "🌿"),
-            "stock": product["stock"],
-            "in_stock": product["stock"] > 0
-        }
+        config = await db.storefronts.find_one(
+            {"user_id": user_id, "is_active": True},
+            {"_id": 0, "dispensary_name": 1, "theme_color": 1}
+        )
         
         # Format storefront info
         storefront_info = {
@@ -377,7 +407,7 @@ async def get_product_by_id(slug: str, product_id: str):
         }
         
         return {
-            "product": public_product,
+            "product": product["public"],
             "storefront": storefront_info
         }
         
@@ -396,20 +426,23 @@ async def debug_storefront(user_id: str):
         db = await get_database()
         
         # Get storefront config
-        config = await db.storefronts.find_one({"user_id": user_id})
-        
-        # Get all products for this user
-        all_products = await db.products.find({"user_id": user_id}).to_list(None)
+        config = await db.storefronts.find_one(
+            {"user_id": user_id},
+            {"_id": 0, "is_active": 1, "dispensary_name": 1}
+        )
         
-        # Get active products
-        active_products = await db.products.find({
-            "user_id": user_id, 
-            "status": {"$ne": "deleted"}
-        }).to_list(None)
+        # Get all products for this user, with just the fields reported below
+        all_products = await db.products.find(
+            {"user_id": user_id},
+            {"_id": 1, "name": 1, "status": 1, "stock": 1, "category": 1}
+        ).to_list(None)
         
         # Summary
+        visible_products = 0
         product_status_counts = {}
         for product in all_products:
+            if product.get('status') != 'deleted':
+                visible_products += 1
             status = product.get('status', 'missing')
             product_status_counts[status] = product_status_counts.get(status, 0) + 1
         
@@ -419,7 +452,7 @@ async def debug_storefront(user_id: str):
             "storefront_active": config.get('is_active', False) if config else False,
             "dispensary_name": config.get('dispensary_name', 'N/A') if config else 'N/A',
             "total_products": len(all_products),
-            "visible_products": len(active_products),
+            "visible_products": visible_products,
             "product_status_counts": product_status_counts,
             "products": [
                 {
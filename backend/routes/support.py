@@ -2,12 +2,15 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from typing import List, Optional
 from database import get_database
+from services.query_batch import group_totals
 from models.support import (
     SupportTicket, SupportTicketCreate, SupportTicketUpdate,
     SupportTicketResponse, SupportTicketResponseCreate,
     ChatSession, ChatSessionCreate, ChatMessage, ChatMessageCreate,
-    SupportStats, ChatStats, KnowledgeBase, KnowledgeBaseCreate, KnowledgeBaseUpdate
+    SupportStats, ChatStats, KnowledgeBase, KnowledgeBaseCreate, KnowledgeBaseUpdate,
+    SUPPORT_TICKET_PROJECTION, TICKET_RESPONSE_PROJECTION, CHAT_SESSION_PROJECTION, CHAT_MESSAGE_PROJECTION
 )
+from models.projection import EXISTS_PROJECTION
 from auth.auth import get_current_active_user
 from datetime import datetime
 import uuid
@@ -23,25 +26,20 @@ async def get_support_stats(
     db = await get_database()
     user_id = current_user["id"]
     
-    # Get ticket statistics
-    total_tickets = await db.support_tickets.count_documents({"user_id": user_id})
-    open_tickets = await db.support_tickets.count_documents({
-        "user_id": user_id,
-        "status": "open"
-    })
-    in_progress = await db.support_tickets.count_documents({
-        "user_id": user_id,
-        "status": "in-progress"
-    })
-    resolved_tickets = await db.support_tickets.count_documents({
-        "user_id": user_id,
-        "status": "resolved"
-    })
-    high_priority = await db.support_tickets.count_documents({
-        "user_id": user_id,
-        "priority": "high",
-        "status": {"$in": ["open", "in-progress"]}
-    })
+    # Get ticket statistics with one $group over (status, priority)
+    by_status_priority = await group_totals(
+        db.support_tickets, {"user_id": user_id}, ["status", "priority"]
+    )
+    counts = {}
+    high_priority = 0
+    for (ticket_status, priority), totals in by_status_priority.items():
+        counts[ticket_status] = counts.get(ticket_status, 0) + totals["count"]
+        if priority == "high" and ticket_status in ("open", "in-progress"):
+            high_priority += totals["count"]
+    total_tickets = sum(counts.values())
+    open_tickets = counts.get("open", 0)
+    in_progress = counts.get("in-progress", 0)
+    resolved_tickets = counts.get("resolved", 0)
     
     # Calculate average response time (in hours)
     avg_response_time = 2.5  # Mock value for now
@@ -69,7 +67,8 @@ async def get_support_tickets(
     """Get all support tickets for the current user"""
     db = await get_database()
     tickets_cursor = db.support_tickets.find(
-        {"user_id": current_user["id"]}
+        {"user_id": current_user["id"]},
+        SUPPORT_TICKET_PROJECTION
     ).skip(skip).limit(limit)
     tickets = await tickets_cursor.to_list(length=limit)
     return [SupportTicket(**ticket) for ticket in tickets]
@@ -101,7 +100,7 @@ async def get_support_ticket(
     ticket = await db.support_tickets.find_one({
         "id": ticket_id,
         "user_id": current_user["id"]
-    })
+    }, SUPPORT_TICKET_PROJECTION)
     
     if not ticket:
         raise HTTPException(
@@ -123,7 +122,7 @@ async def update_support_ticket(
     existing_ticket = await db.support_tickets.find_one({
         "id": ticket_id,
         "user_id": current_user["id"]
-    })
+    }, EXISTS_PROJECTION)
     
     if not existing_ticket:
         raise HTTPException(
@@ -145,7 +144,7 @@ async def update_support_ticket(
     updated_ticket = await db.support_tickets.find_one({
         "id": ticket_id,
         "user_id": current_user["id"]
-    })
+    }, SUPPORT_TICKET_PROJECTION)
     
     return SupportTicket(**updated_ticket)
 
@@ -181,7 +180,7 @@ async def get_ticket_responses(
     ticket = await db.support_tickets.find_one({
         "id": ticket_id,
         "user_id": current_user["id"]
-    })
+    }, EXISTS_PROJECTION)
     
     if not ticket:
         raise HTTPException(
@@ -190,7 +189,8 @@ async def get_ticket_responses(
         )
     
     responses_cursor = db.ticket_responses.find(
-        {"ticket_id": ticket_id}
+        {"ticket_id": ticket_id},
+        TICKET_RESPONSE_PROJECTION
     ).sort("created_at", 1)
     responses = await responses_cursor.to_list(length=None)
     
@@ -208,7 +208,7 @@ async def add_ticket_response(
     ticket = await db.support_tickets.find_one({
         "id": ticket_id,
         "user_id": current_user["id"]
-    })
+    }, EXISTS_PROJECTION)
     
     if not ticket:
         raise HTTPException(
@@ -242,7 +242,8 @@ async def get_chat_sessions(
     """Get all chat sessions for the current user"""
     db = await get_database()
     sessions_cursor = db.chat_sessions.find(
-        {"user_id": current_user["id"]}
+        {"user_id": current_user["id"]},
+        CHAT_SESSION_PROJECTION
     ).sort("created_at", -1).skip(skip).limit(limit)
     sessions = await sessions_cursor.to_list(length=limit)
     
@@ -275,7 +276,7 @@ async def get_chat_session(
     session = await db.chat_sessions.find_one({
         "id": session_id,
         "user_id": current_user["id"]
-    })
+    }, CHAT_SESSION_PROJECTION)
     
     if not session:
         raise HTTPException(
@@ -297,7 +298,7 @@ async def get_chat_messages(
     session = await db.chat_sessions.find_one({
         "id": session_id,
         "user_id": current_user["id"]
-    })
+    }, EXISTS_PROJECTION)
     
     if not session:
         raise HTTPException(
@@ -306,7 +307,8 @@ async def get_chat_messages(
         )
     
     messages_cursor = db.chat_messages.find(
-        {"session_id": session_id}
+        {"session_id": session_id},
+        CHAT_MESSAGE_PROJECTION
     ).sort("created_at", 1)
     messages = await messages_cursor.to_list(length=None)
     
@@ -324,7 +326,7 @@ async def add_chat_message(
     session = await db.chat_sessions.find_one({
         "id": session_id,
         "user_id": current_user["id"]
-    })
+    }, EXISTS_PROJECTION)
     
     if not session:
         raise HTTPException(
@@ -9,7 +9,12 @@ sys.path.insert(0, str(backend_dir))
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import logging
-from database import get_database, database
+from database import get_database, database, health_prober
+from services.indexes import ensure_indexes
+from services.backfills import run_pending_backfills
+from auth.passwords import password_pool_stats
+from db_telemetry import db_telemetry_snapshot
+from services.serialization import DefaultResponse
 
 # Import all route modules
 from routes.auth import router as auth_router
@@ -27,7 +32,8 @@ from routes.storefront import router as storefront_router
 app = FastAPI(
     title="Kush Door API",
     description="Cannabis Commerce SaaS Platform API",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=DefaultResponse
 )
 
 # CORS middleware
@@ -45,7 +51,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],
     allow_headers=["Content-Type", "Authorization", "X-Requested-With", "Accept"],
-    expose_headers=["Content-Length", "X-Total-Count"],
+    expose_headers=["Content-Length", "X-Total-Count", "X-Next-Cursor"],
     max_age=600,
 )
 
@@ -75,7 +81,8 @@ async def health_check():
         return {
             "status": "healthy",
             "database": "connected",
-            "message": "All systems operational"
+            "message": "All systems operational",
+            "password_pool": password_pool_stats()
         }
     except Exception as e:
         return {
@@ -84,6 +91,16 @@ async def health_check():
             "error": str(e)
         }
 
+@app.get("/api/health/db")
+async def database_health():
+    import database
+    return {
+        "database": "mock" if database.USE_MOCK_DB else "mongodb",
+        "prober": health_prober.status(),
+        "pool_options": database.pool_options,
+        **db_telemetry_snapshot()
+    }
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -94,21 +111,40 @@ logger = logging.getLogger(__name__)
 @app.on_event("startup")
 async def startup_event():
     logger.info("Starting Kush Door API server...")
+    
+    # Pick MongoDB or the mock database, then keep probing in the background
+    await health_prober.start()
+    logger.info("Database connection configured")
+    
+    import database
+    if not database.USE_MOCK_DB:
+        # Create any indexes from the manifest that are missing
+        try:
+            failures = await ensure_indexes(await get_database())
+            if failures:
+                logger.warning(f"Some indexes could not be created: {failures}")
+            else:
+                logger.info("Database indexes verified")
+        except Exception as e:
+            logger.error(f"Error creating database indexes: {e}")
+    
+    # Build derived collections from existing data the first time they deploy
     try:
-        # Test MongoDB connection
-        db = await get_database()
-        await db.command('ping')
-        logger.info("Successfully connected to MongoDB")
+        failures = await run_pending_backfills(await get_database())
+        if failures:
+            logger.warning(f"Some data backfills failed and will retry on the next start: {failures}")
     except Exception as e:
-        logger.warning(f"MongoDB connection failed during startup: {e}. Using mock database.")
-        # Update the database module to use mock
-        import database
-        database.USE_MOCK_DB = True
-    logger.info("Database connection configured")
+        logger.error(f"Error running data backfills: {e}")
 
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Shutting down Kush Door API server...")
+    await health_prober.stop()
+    
+    # Compact the mock database's log so the next start loads one snapshot
+    mock_database = sys.modules.get("mock_database")
+    if mock_database is not None:
+        mock_database.mock_db.close()
 
 # Run the server
 if __name__ == "__main__":
@@ -0,0 +1,49 @@
+"""
+One-time data backfills for derived collections (data_backfills collection)
+
+Derived data that the routes only keep in step with new writes has to be
+built once from the existing documents when it is first deployed. Each
+backfill in BACKFILLS runs at startup, after ensure_indexes(), the first
+time a server sees it; a marker document named after it records the run so
+later starts skip it. The backfill_*.py CLIs stay available for repairs.
+"""
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List
+import logging
+from services.order_rollups import rebuild_rollups
+from services.customer_directory import rebuild_customer_directory
+from services.public_products import rebuild_public_products
+from services.tenant_resolver import fill_subdomain_lower
+
+logger = logging.getLogger(__name__)
+
+BACKFILLS: Dict[str, Callable[[AsyncIOMotorDatabase], Awaitable[int]]] = {
+    "subdomain_lower": fill_subdomain_lower,
+    "order_rollups": rebuild_rollups,
+    "customer_directory": rebuild_customer_directory,
+    "public_products": rebuild_public_products,
+}
+
+async def run_pending_backfills(db: AsyncIOMotorDatabase) -> List[str]:
+    """Run every backfill that has not run against this database yet"""
+    failures = []
+    for name, backfill in BACKFILLS.items():
+        # Upserting the marker claims the backfill, so concurrent servers run it once
+        claim = await db.data_backfills.update_one(
+            {"_id": name},
+            {"$setOnInsert": {"started_at": datetime.utcnow()}},
+            upsert=True
+        )
+        if claim.upserted_id is None:
+            continue
+        try:
+            count = await backfill(db)
+            await db.data_backfills.update_one({"_id": name}, {"$set": {"completed_at": datetime.utcnow(), "count": count}})
+            logger.info(f"Backfilled {name}: {count} documents")
+        except Exception as e:
+            # Drop the claim so the next start retries
+            await db.data_backfills.delete_one({"_id": name})
+            logger.error(f"Error running the {name} backfill: {e}")
+            failures.append(name)
+    return failures
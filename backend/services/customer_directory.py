@@ -0,0 +1,106 @@
+"""
+Materialized customer directory (customer_directory collection)
+
+A store's customers live in two places: storefront sign-ups in customer_auth
+and admin-created records in customers. The directory holds one document per
+(user_id, email) in the Customer model's shape, tagged with the source it
+came from; when both exist, the storefront record wins. Every write to
+either source calls sync_customer_directory() (or sync_customer_directories()
+for a batch of emails), so the customer list, detail and stats read a single
+indexed collection. Admin edits and deletes still apply to customers only;
+storefront customers change through their own account.
+"""
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import DeleteOne, ReplaceOne
+from typing import Dict, Any, Iterable, List, Optional, Set
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Emails re-derived per aggregate and bulk write when rebuilding a store
+DIRECTORY_SYNC_BATCH_SIZE = 1000
+
+def directory_entry(customer: Dict[str, Any], user_id: str, source: str) -> Dict[str, Any]:
+    """Convert a customer_auth or customers document to a directory entry"""
+    total_orders = customer.get("total_orders", 0)
+    total_spent = customer.get("total_spent", 0.0)
+    return {
+        "id": customer.get("id"),
+        "name": customer.get("name"),
+        "email": customer.get("email"),
+        "phone": customer.get("phone"),
+        "address": customer.get("address", ""),
+        "total_orders": total_orders,
+        "total_spent": total_spent,
+        "average_order_value": total_spent / max(total_orders, 1),
+        "loyalty_tier": customer.get("loyalty_tier", "bronze"),
+        "status": customer.get("status", "active"),
+        "created_at": customer.get("created_at"),
+        "updated_at": customer.get("updated_at") or customer.get("created_at"),
+        "last_order_date": customer.get("last_order_date"),
+        "user_id": user_id,
+        "source": source
+    }
+
+async def sync_customer_directory(db: AsyncIOMotorDatabase, user_id: str, email: Optional[str]):
+    """Re-derive one store's directory entry for an email from both source collections"""
+    await sync_customer_directories(db, user_id, [email])
+
+async def sync_customer_directories(db: AsyncIOMotorDatabase, user_id: str, emails: Iterable[Optional[str]]):
+    """Re-derive one store's directory entries for many emails with one aggregate and one bulk write"""
+    try:
+        await _write_directory_entries(db, user_id, sorted({email for email in emails if email}))
+    except Exception as e:
+        # The directory is derived data; backfill_customer_directory.py repairs it
+        logger.error(f"Error syncing customer directory in store {user_id}: {e}")
+
+async def _write_directory_entries(db: AsyncIOMotorDatabase, user_id: str, emails: List[str]) -> int:
+    """Upsert or delete the directory entry of each email; returns how many entries exist"""
+    if not emails:
+        return 0
+    # customers first, so the storefront record overwrites it below
+    sources = await db.customers.aggregate([
+        {"$match": {"user_id": user_id, "email": {"$in": emails}}},
+        {"$project": {"_id": 0}},
+        {"$unionWith": {"coll": "customer_auth", "pipeline": [
+            {"$match": {"store_id": user_id, "email": {"$in": emails}}},
+            {"$project": {"_id": 0, "password_hash": 0}}
+        ]}}
+    ]).to_list(None)
+    entries: Dict[str, Dict[str, Any]] = {}
+    for customer in sources:
+        if "store_id" in customer:
+            entries[customer["email"]] = directory_entry(customer, user_id, "storefront")
+        elif customer["email"] not in entries:
+            entries[customer["email"]] = directory_entry(customer, user_id, customer.get("source") or "admin")
+
+    await db.customer_directory.bulk_write([
+        ReplaceOne({"user_id": user_id, "email": email}, entries[email], upsert=True)
+        if email in entries else DeleteOne({"user_id": user_id, "email": email})
+        for email in emails
+    ], ordered=False)
+    return len(entries)
+
+async def rebuild_customer_directory(db: AsyncIOMotorDatabase, user_id: Optional[str] = None) -> int:
+    """Recompute the directory from both source collections, for one store or all of them"""
+    # Every (store, email) that has a source record or a directory entry
+    emails: Dict[str, Set[str]] = {}
+    for collection, owner_field in (
+        (db.customers, "user_id"), (db.customer_auth, "store_id"), (db.customer_directory, "user_id")
+    ):
+        async for customer in collection.find(
+            {owner_field: user_id} if user_id else {}, {"_id": 0, owner_field: 1, "email": 1}
+        ):
+            if customer.get(owner_field) and customer.get("email"):
+                emails.setdefault(customer[owner_field], set()).add(customer["email"])
+
+    # Same in-place upserts and deletes as live syncs, so a rebuild never empties
+    # the directory or collides with a sync that runs meanwhile
+    entry_count = 0
+    for store_id, store_emails in emails.items():
+        store_emails = sorted(store_emails)
+        for start in range(0, len(store_emails), DIRECTORY_SYNC_BATCH_SIZE):
+            entry_count += await _write_directory_entries(
+                db, store_id, store_emails[start:start + DIRECTORY_SYNC_BATCH_SIZE]
+            )
+    return entry_count
@@ -0,0 +1,108 @@
+"""
+Atomic customer order statistics
+
+Placing an order bumps the customer's totals in both customer collections
+(admin-managed customers and storefront customer_auth). Each collection gets
+a single pipeline update, so the new totals, average order value and loyalty
+tier are all computed server-side from the stored values. Concurrent orders
+for the same customer can no longer overwrite each other's totals.
+"""
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from auth.principal_cache import invalidate_principal
+from services.query_batch import gather_queries
+
+# Minimum lifetime spend for each tier, highest first (matches /customers/loyalty/tiers)
+LOYALTY_TIERS = [("platinum", 3000), ("gold", 1500), ("silver", 500), ("bronze", 0)]
+
+def loyalty_tier_expression(total_spent: Any) -> Dict[str, Any]:
+    """Aggregation expression that maps a lifetime spend to its loyalty tier"""
+    return {
+        "$switch": {
+            "branches": [
+                {"case": {"$gte": [total_spent, min_spent]}, "then": tier}
+                for tier, min_spent in LOYALTY_TIERS[:-1]
+            ],
+            "default": LOYALTY_TIERS[-1][0]
+        }
+    }
+
+def order_stats_update(
+    order_total: float,
+    order_count: int = 1,
+    ordered_at: Optional[datetime] = None,
+    include_average: bool = True
+) -> List[Dict[str, Any]]:
+    """Build the pipeline update that adds orders to a customer's stored totals"""
+    ordered_at = ordered_at or datetime.utcnow()
+    totals = {
+        "total_orders": {"$add": [{"$ifNull": ["$total_orders", 0]}, order_count]},
+        "total_spent": {"$add": [{"$ifNull": ["$total_spent", 0]}, order_total]},
+        "last_order_date": ordered_at,
+        "updated_at": ordered_at
+    }
+    derived = {"loyalty_tier": loyalty_tier_expression("$total_spent")}
+    if include_average:
+        derived["average_order_value"] = {"$divide": ["$total_spent", {"$max": ["$total_orders", 1]}]}
+    # The second stage sees the totals written by the first
+    return [{"$set": totals}, {"$set": derived}]
+
+async def apply_order_to_customer(
+    db: AsyncIOMotorDatabase,
+    user_id: str,
+    customer_email: str,
+    order_total: float,
+    ordered_at: Optional[datetime] = None
+):
+    """Add one order to the customer's totals in both customer collections"""
+    ordered_at = ordered_at or datetime.utcnow()
+    _, storefront_customer = await gather_queries(
+        db.customers.update_one(
+            {"email": customer_email, "user_id": user_id},
+            order_stats_update(order_total, ordered_at=ordered_at)
+        ),
+        db.customer_auth.find_one_and_update(
+            {"email": customer_email, "store_id": user_id},
+            order_stats_update(order_total, ordered_at=ordered_at, include_average=False),
+            projection={"_id": 0, "id": 1}
+        )
+    )
+    if storefront_customer:
+        # Cached principals carry the old totals and tier
+        invalidate_principal("customer", storefront_customer["id"])
+
+async def apply_orders_to_customers(db: AsyncIOMotorDatabase, user_id: str, orders: List[Dict[str, Any]]):
+    """Add a batch of one store's orders to its customers' totals, one bulk write per collection"""
+    deltas: Dict[str, Dict[str, Any]] = {}
+    for order in orders:
+        delta = deltas.setdefault(order["customer_email"], {"count": 0, "total": 0, "ordered_at": order["created_at"]})
+        delta["count"] += 1
+        delta["total"] += order["total"]
+        delta["ordered_at"] = max(delta["ordered_at"], order["created_at"])
+    if not deltas:
+        return
+
+    _, _, storefront_customers = await gather_queries(
+        db.customers.bulk_write([
+            UpdateOne(
+                {"email": email, "user_id": user_id},
+                order_stats_update(delta["total"], delta["count"], delta["ordered_at"])
+            )
+            for email, delta in deltas.items()
+        ], ordered=False),
+        db.customer_auth.bulk_write([
+            UpdateOne(
+                {"email": email, "store_id": user_id},
+                order_stats_update(delta["total"], delta["count"], delta["ordered_at"], include_average=False)
+            )
+            for email, delta in deltas.items()
+        ], ordered=False),
+        db.customer_auth.find(
+            {"store_id": user_id, "email": {"$in": list(deltas)}},
+            {"_id": 0, "id": 1}
+        ).to_list(None)
+    )
+    for customer in storefront_customers:
+        invalidate_principal("customer", customer["id"])
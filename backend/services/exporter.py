@@ -0,0 +1,83 @@
+"""
+Streaming NDJSON/CSV exports backed by a database cursor
+
+Rows are encoded as the cursor yields them and flushed in batches, so an
+export holds at most one batch in memory however many rows it covers.
+"""
+from fastapi.responses import StreamingResponse
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
+import csv
+import io
+import json
+
+DEFAULT_EXPORT_BATCH_SIZE = 500
+MAX_EXPORT_BATCH_SIZE = 5000
+
+def export_query(user_id: str, start: Optional[datetime], end: Optional[datetime]) -> Dict[str, Any]:
+    """Build the query for a store's rows created in [start, end)"""
+    query: Dict[str, Any] = {"user_id": user_id}
+    created_at = {}
+    if start:
+        created_at["$gte"] = start
+    if end:
+        created_at["$lt"] = end
+    if created_at:
+        query["created_at"] = created_at
+    return query
+
+def _json_default(value: Any) -> Any:
+    """Encode values the json module does not handle natively"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+def _csv_value(value: Any) -> Any:
+    """Flatten a document value into a single CSV cell"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, default=_json_default)
+    return "" if value is None else value
+
+async def stream_ndjson(cursor, batch_size: int) -> AsyncIterator[bytes]:
+    """Encode each document as one JSON line"""
+    lines = []
+    async for doc in cursor:
+        lines.append(json.dumps(doc, default=_json_default))
+        if len(lines) >= batch_size:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+async def stream_csv(cursor, fields: List[str], batch_size: int) -> AsyncIterator[bytes]:
+    """Encode documents as CSV rows with a header row of the given fields"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    rows = 0
+    async for doc in cursor:
+        writer.writerow([_csv_value(doc.get(field)) for field in fields])
+        rows += 1
+        if rows >= batch_size:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate(0)
+            rows = 0
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+def export_response(cursor, export_format: str, fields: List[str], filename: str, batch_size: int) -> StreamingResponse:
+    """Stream a cursor to the client in the requested format"""
+    if export_format == "csv":
+        body = stream_csv(cursor, fields, batch_size)
+        media_type = "text/csv"
+    else:
+        body = stream_ndjson(cursor, batch_size)
+        media_type = "application/x-ndjson"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format}"'}
+    )
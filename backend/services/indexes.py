@@ -0,0 +1,186 @@
+"""
+Index manifest for every collection the routers query
+
+Each index mirrors the shape of a route query (equality fields first, then
+sort/range fields). ensure_indexes() is idempotent and runs at startup;
+manage_indexes.py exposes it and the missing/unused index report as a CLI.
+"""
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from pymongo.errors import OperationFailure
+from typing import Dict, Any, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+def _page_index(owner_field: str) -> IndexModel:
+    """Index for newest-first keyset pagination on (created_at, id) within one store"""
+    return IndexModel(
+        [(owner_field, ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)],
+        name=f"{owner_field}_created_at_id"
+    )
+
+INDEX_MANIFEST: Dict[str, List[IndexModel]] = {
+    "users": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+        IndexModel(
+            [("subdomain_lower", ASCENDING)],
+            name="subdomain_lower_unique",
+            unique=True,
+            partialFilterExpression={"subdomain_lower": {"$type": "string"}}
+        ),
+    ],
+    "storefronts": [
+        IndexModel([("user_id", ASCENDING)], name="user_id_unique", unique=True),
+    ],
+    "products": [
+        IndexModel([("user_id", ASCENDING), ("id", ASCENDING)], name="user_id_id", unique=True),
+        IndexModel(
+            [("user_id", ASCENDING), ("sku", ASCENDING)],
+            name="user_id_sku_unique",
+            unique=True,
+            partialFilterExpression={"sku": {"$type": "string"}}
+        ),
+        IndexModel([("user_id", ASCENDING), ("name", ASCENDING)], name="user_id_name"),
+        IndexModel([("user_id", ASCENDING), ("status", ASCENDING)], name="user_id_status"),
+        _page_index("user_id"),
+        # Storefront catalog search: equality filters first, then the price sort/range
+        IndexModel(
+            [("user_id", ASCENDING), ("status", ASCENDING), ("price", ASCENDING)],
+            name="user_id_status_price"
+        ),
+        IndexModel(
+            [("user_id", ASCENDING), ("status", ASCENDING), ("category", ASCENDING), ("price", ASCENDING)],
+            name="user_id_status_category_price"
+        ),
+        IndexModel(
+            [("user_id", ASCENDING), ("status", ASCENDING), ("strain", ASCENDING), ("price", ASCENDING)],
+            name="user_id_status_strain_price"
+        ),
+        # Potency range filters match on the far end of each range (see services/potency.py)
+        IndexModel(
+            [("user_id", ASCENDING), ("status", ASCENDING), ("thc_max", ASCENDING)],
+            name="user_id_status_thc_max"
+        ),
+        IndexModel(
+            [("user_id", ASCENDING), ("status", ASCENDING), ("cbd_max", ASCENDING)],
+            name="user_id_status_cbd_max"
+        ),
+        IndexModel(
+            [("user_id", ASCENDING), ("name", TEXT), ("description", TEXT)],
+            name="user_id_name_description_text",
+            weights={"name": 10, "description": 1}
+        ),
+    ],
+    "orders": [
+        IndexModel([("user_id", ASCENDING), ("id", ASCENDING)], name="user_id_id", unique=True),
+        IndexModel(
+            [("user_id", ASCENDING), ("status", ASCENDING), ("updated_at", DESCENDING)],
+            name="user_id_status_updated_at"
+        ),
+        IndexModel(
+            [("user_id", ASCENDING), ("customer_email", ASCENDING), ("created_at", DESCENDING)],
+            name="user_id_customer_email_created_at"
+        ),
+        _page_index("user_id"),
+    ],
+    "order_daily_rollups": [
+        IndexModel([("user_id", ASCENDING), ("day", ASCENDING)], name="user_id_day", unique=True),
+    ],
+    "customers": [
+        IndexModel([("user_id", ASCENDING), ("id", ASCENDING)], name="user_id_id", unique=True),
+        IndexModel([("user_id", ASCENDING), ("email", ASCENDING)], name="user_id_email"),
+        _page_index("user_id"),
+    ],
+    "customer_directory": [
+        IndexModel([("user_id", ASCENDING), ("email", ASCENDING)], name="user_id_email_unique", unique=True),
+        IndexModel([("user_id", ASCENDING), ("id", ASCENDING)], name="user_id_id"),
+        _page_index("user_id"),
+    ],
+    "customer_auth": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("email", ASCENDING), ("store_id", ASCENDING)], name="email_store_id", unique=True),
+        IndexModel([("store_id", ASCENDING), ("loyalty_tier", ASCENDING)], name="store_id_loyalty_tier"),
+        _page_index("store_id"),
+    ],
+    "drivers": [
+        IndexModel([("user_id", ASCENDING), ("id", ASCENDING)], name="user_id_id", unique=True),
+        IndexModel([("user_id", ASCENDING), ("email", ASCENDING)], name="user_id_email"),
+        IndexModel([("user_id", ASCENDING), ("status", ASCENDING)], name="user_id_status"),
+        _page_index("user_id"),
+    ],
+    "payments": [
+        IndexModel([("user_id", ASCENDING), ("id", ASCENDING)], name="user_id_id", unique=True),
+        IndexModel([("user_id", ASCENDING), ("status", ASCENDING)], name="user_id_status"),
+        _page_index("user_id"),
+    ],
+    "payouts": [
+        _page_index("user_id"),
+    ],
+    "support_tickets": [
+        IndexModel([("user_id", ASCENDING), ("id", ASCENDING)], name="user_id_id", unique=True),
+        IndexModel(
+            [("user_id", ASCENDING), ("status", ASCENDING), ("priority", ASCENDING)],
+            name="user_id_status_priority"
+        ),
+    ],
+    "ticket_responses": [
+        IndexModel([("ticket_id", ASCENDING), ("created_at", ASCENDING)], name="ticket_id_created_at"),
+    ],
+    "chat_sessions": [
+        IndexModel([("user_id", ASCENDING), ("id", ASCENDING)], name="user_id_id", unique=True),
+        IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING)], name="user_id_created_at"),
+    ],
+    "chat_messages": [
+        IndexModel([("session_id", ASCENDING), ("created_at", ASCENDING)], name="session_id_created_at"),
+    ],
+}
+
+async def ensure_collection_indexes(db: AsyncIOMotorDatabase, collection: str) -> List[str]:
+    """Create the manifest indexes of one collection, returning the names that failed"""
+    failed = []
+    for index in INDEX_MANIFEST[collection]:
+        name = index.document["name"]
+        try:
+            await db[collection].create_indexes([index])
+        except OperationFailure as e:
+            # Usually existing duplicates under a unique index, or an index with
+            # the same keys but different options; leave it for an operator
+            logger.error(f"Could not create index {collection}.{name}: {e}")
+            failed.append(name)
+    return failed
+
+async def ensure_indexes(db: AsyncIOMotorDatabase, collections: Optional[List[str]] = None) -> Dict[str, List[str]]:
+    """Create every manifest index that does not exist yet"""
+    failures = {}
+    for collection in collections or INDEX_MANIFEST:
+        failed = await ensure_collection_indexes(db, collection)
+        if failed:
+            failures[collection] = failed
+    return failures
+
+async def report_indexes(db: AsyncIOMotorDatabase) -> Dict[str, Dict[str, Any]]:
+    """Compare live indexes against the manifest and report missing, unknown and unused ones"""
+    report = {}
+    for collection, indexes in INDEX_MANIFEST.items():
+        expected = {index.document["name"] for index in indexes}
+        existing = {index["name"] async for index in db[collection].list_indexes()}
+        existing.discard("_id_")
+
+        unused: Optional[List[str]] = None
+        try:
+            stats = await db[collection].aggregate([{"$indexStats": {}}]).to_list(None)
+            unused = sorted(
+                stat["name"] for stat in stats
+                if stat["name"] != "_id_" and stat.get("accesses", {}).get("ops", 0) == 0
+            )
+        except OperationFailure as e:
+            logger.warning(f"Could not read index usage for {collection}: {e}")
+
+        report[collection] = {
+            "missing": sorted(expected - existing),
+            "unknown": sorted(existing - expected),
+            "unused": unused
+        }
+    return report
@@ -0,0 +1,82 @@
+"""
+Single-pass order metrics shared by the order and analytics stats endpoints
+"""
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+def build_order_metrics_pipeline(user_id: str, today_start: datetime) -> List[Dict[str, Any]]:
+    """Build a $facet pipeline that computes every order metric in one pass"""
+    return [
+        {"$match": {"user_id": user_id}},
+        {
+            "$facet": {
+                "totals": [
+                    {
+                        "$group": {
+                            "_id": None,
+                            "total_orders": {"$sum": 1},
+                            "total_revenue": {"$sum": "$total"},
+                            "avg_order_value": {"$avg": "$total"}
+                        }
+                    }
+                ],
+                "by_status": [
+                    {"$group": {"_id": "$status", "count": {"$sum": 1}}}
+                ],
+                "delivered_today": [
+                    {"$match": {"status": "delivered", "updated_at": {"$gte": today_start}}},
+                    {"$count": "count"}
+                ]
+            }
+        }
+    ]
+
+async def get_order_metrics(
+    db: AsyncIOMotorDatabase,
+    user_id: str,
+    today_start: Optional[datetime] = None
+) -> Dict[str, Any]:
+    """Get order totals, status counts and today's deliveries for a store"""
+    if today_start is None:
+        today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+
+    pipeline = build_order_metrics_pipeline(user_id, today_start)
+    result = await db.orders.aggregate(pipeline).to_list(1)
+    facets = result[0] if result else {}
+
+    totals = facets.get("totals") or [{}]
+    delivered_today = facets.get("delivered_today") or [{}]
+    status_counts = {
+        item["_id"]: item["count"]
+        for item in facets.get("by_status", [])
+        if item.get("_id") is not None
+    }
+
+    return {
+        "total_orders": totals[0].get("total_orders", 0),
+        "total_revenue": totals[0].get("total_revenue", 0) or 0,
+        "avg_order_value": totals[0].get("avg_order_value", 0) or 0,
+        "status_counts": status_counts,
+        "delivered_today": delivered_today[0].get("count", 0)
+    }
+
+def sum_buckets(
+    buckets: Dict[datetime, Dict[str, float]],
+    start: datetime,
+    end: datetime
+) -> Dict[str, float]:
+    """Sum the daily buckets that fall in [start, end)"""
+    revenue = 0
+    orders = 0
+    for day, bucket in buckets.items():
+        if start <= day < end:
+            revenue += bucket["revenue"]
+            orders += bucket["orders"]
+    return {"revenue": revenue, "orders": orders}
+
+def format_change(current: float, previous: float) -> str:
+    """Format a period-over-period change as a signed percentage"""
+    if previous == 0:
+        return "+100.0%" if current > 0 else "0%"
+    return f"{(current - previous) / previous * 100:+.1f}%"
@@ -0,0 +1,238 @@
+"""
+Per-store daily order rollups (order_daily_rollups collection)
+
+Each rollup document holds one store's orders for one UTC day:
+
+    {
+        "user_id": "...",
+        "day": datetime(2024, 1, 31),
+        "revenue": 1234.5,
+        "orders": 12,
+        "status_counts": {"pending": 2, "delivered": 10},
+        "products": {"<product_id>": {"name": "Blue Dream", "quantity": 7, "revenue": 315.0}}
+    }
+
+The order routes keep the rollups in step with every order write, so the
+analytics endpoints read O(days) rollup documents instead of every order.
+"""
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import DeleteOne, ReplaceOne, UpdateOne
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+def rollup_day(moment: datetime) -> datetime:
+    """Truncate a timestamp to the UTC day its rollup is stored under"""
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+def _field_key(value: Any) -> str:
+    """Make a value safe to use as a document field name"""
+    return str(value).replace(".", "_").lstrip("$") or "unknown"
+
+def _order_increments(order: Dict[str, Any], sign: int) -> Dict[str, Any]:
+    """Build the $inc document that adds (sign=1) or removes (sign=-1) an order"""
+    increments = {
+        "revenue": sign * (order.get("total") or 0),
+        "orders": sign,
+        f"status_counts.{_field_key(order.get('status', 'pending'))}": sign
+    }
+    for item in order.get("items") or []:
+        key = _field_key(item.get("product_id") or item.get("product_name"))
+        increments[f"products.{key}.quantity"] = (
+            increments.get(f"products.{key}.quantity", 0) + sign * (item.get("quantity") or 0)
+        )
+        increments[f"products.{key}.revenue"] = (
+            increments.get(f"products.{key}.revenue", 0) + sign * (item.get("total") or 0)
+        )
+    return increments
+
+def _product_names(order: Dict[str, Any]) -> Dict[str, str]:
+    """Build the $set document that records the name of every product in an order"""
+    return {
+        f"products.{_field_key(item.get('product_id') or item.get('product_name'))}.name": item.get("product_name")
+        for item in order.get("items") or []
+    }
+
+async def _apply(db: AsyncIOMotorDatabase, order: Dict[str, Any], update: Dict[str, Any]):
+    """Apply an update to the rollup of the day an order was created"""
+    if not order.get("created_at"):
+        return
+    try:
+        await db.order_daily_rollups.update_one(
+            {"user_id": order["user_id"], "day": rollup_day(order["created_at"])},
+            update,
+            upsert=True
+        )
+    except Exception as e:
+        # The order itself is already written; the backfill CLI repairs drift
+        logger.error(f"Error updating order rollup for order {order.get('id')}: {e}")
+
+async def apply_order_created(db: AsyncIOMotorDatabase, order: Dict[str, Any]):
+    """Add a newly created order to its daily rollup"""
+    update = {"$inc": _order_increments(order, 1)}
+    names = _product_names(order)
+    if names:
+        update["$set"] = names
+    await _apply(db, order, update)
+
+async def apply_orders_created(db: AsyncIOMotorDatabase, orders: List[Dict[str, Any]]):
+    """Add a batch of new orders to their daily rollups with one bulk write"""
+    updates: Dict[tuple, Dict[str, Any]] = {}
+    for order in orders:
+        if not order.get("created_at"):
+            continue
+        update = updates.setdefault(
+            (order["user_id"], rollup_day(order["created_at"])), {"$inc": {}, "$set": {}}
+        )
+        for field, amount in _order_increments(order, 1).items():
+            update["$inc"][field] = update["$inc"].get(field, 0) + amount
+        update["$set"].update(_product_names(order))
+    if not updates:
+        return
+    requests = [
+        UpdateOne(
+            {"user_id": user_id, "day": day},
+            {key: value for key, value in update.items() if value},
+            upsert=True
+        )
+        for (user_id, day), update in updates.items()
+    ]
+    try:
+        await db.order_daily_rollups.bulk_write(requests, ordered=False)
+    except Exception as e:
+        # The orders themselves are already written; the backfill CLI repairs drift
+        logger.error(f"Error updating order rollups for {len(orders)} orders: {e}")
+
+async def apply_order_deleted(db: AsyncIOMotorDatabase, order: Dict[str, Any]):
+    """Remove a deleted order from its daily rollup"""
+    await _apply(db, order, {"$inc": _order_increments(order, -1)})
+
+async def apply_order_status_change(
+    db: AsyncIOMotorDatabase,
+    order: Dict[str, Any],
+    old_status: str,
+    new_status: str
+):
+    """Move an order between status counts in its daily rollup"""
+    if old_status == new_status:
+        return
+    await _apply(db, order, {
+        "$inc": {
+            f"status_counts.{_field_key(old_status)}": -1,
+            f"status_counts.{_field_key(new_status)}": 1
+        }
+    })
+
+async def get_rollup_totals(db: AsyncIOMotorDatabase, user_id: str) -> Dict[str, Any]:
+    """Get lifetime order totals and status counts for a store from its rollups"""
+    pipeline = [
+        {"$match": {"user_id": user_id}},
+        {
+            "$facet": {
+                "totals": [
+                    {"$group": {"_id": None, "revenue": {"$sum": "$revenue"}, "orders": {"$sum": "$orders"}}}
+                ],
+                "by_status": [
+                    {"$project": {"statuses": {"$objectToArray": "$status_counts"}}},
+                    {"$unwind": "$statuses"},
+                    {"$group": {"_id": "$statuses.k", "count": {"$sum": "$statuses.v"}}}
+                ]
+            }
+        }
+    ]
+    result = await db.order_daily_rollups.aggregate(pipeline).to_list(1)
+    facets = result[0] if result else {}
+    totals = facets.get("totals") or [{}]
+
+    total_orders = totals[0].get("orders", 0)
+    total_revenue = totals[0].get("revenue", 0) or 0
+    return {
+        "total_orders": total_orders,
+        "total_revenue": total_revenue,
+        "avg_order_value": total_revenue / total_orders if total_orders > 0 else 0,
+        "status_counts": {item["_id"]: item["count"] for item in facets.get("by_status", [])}
+    }
+
+async def get_rollup_buckets(
+    db: AsyncIOMotorDatabase,
+    user_id: str,
+    start: datetime
+) -> Dict[datetime, Dict[str, float]]:
+    """Get revenue and order counts per UTC day since start"""
+    rollups = await db.order_daily_rollups.find(
+        {"user_id": user_id, "day": {"$gte": rollup_day(start)}},
+        {"_id": 0, "day": 1, "revenue": 1, "orders": 1}
+    ).to_list(None)
+    return {
+        rollup["day"]: {"revenue": rollup.get("revenue", 0), "orders": rollup.get("orders", 0)}
+        for rollup in rollups
+    }
+
+async def get_rollup_top_products(
+    db: AsyncIOMotorDatabase,
+    user_id: str,
+    limit: int = 5
+) -> List[Dict[str, Any]]:
+    """Get the best selling products by revenue from a store's rollups"""
+    pipeline = [
+        {"$match": {"user_id": user_id}},
+        {"$project": {"products": {"$objectToArray": "$products"}}},
+        {"$unwind": "$products"},
+        {
+            "$group": {
+                "_id": "$products.k",
+                "name": {"$last": "$products.v.name"},
+                "sales": {"$sum": "$products.v.quantity"},
+                "revenue": {"$sum": "$products.v.revenue"}
+            }
+        },
+        {"$match": {"sales": {"$gt": 0}}},
+        {"$sort": {"revenue": -1}},
+        {"$limit": limit}
+    ]
+    return await db.order_daily_rollups.aggregate(pipeline).to_list(limit)
+
+async def rebuild_rollups(db: AsyncIOMotorDatabase, user_id: Optional[str] = None) -> int:
+    """Recompute rollups from the raw orders, for one store or all of them"""
+    query = {"user_id": user_id} if user_id else {}
+    projection = {"_id": 0, "id": 1, "user_id": 1, "created_at": 1, "total": 1, "status": 1, "items": 1}
+
+    rollups: Dict[tuple, Dict[str, Any]] = {}
+    async for order in db.orders.find(query, projection):
+        if not order.get("created_at") or not order.get("user_id"):
+            continue
+        day = rollup_day(order["created_at"])
+        rollup = rollups.setdefault((order["user_id"], day), {
+            "user_id": order["user_id"],
+            "day": day,
+            "revenue": 0,
+            "orders": 0,
+            "status_counts": {},
+            "products": {}
+        })
+        rollup["revenue"] += order.get("total") or 0
+        rollup["orders"] += 1
+        status = _field_key(order.get("status", "pending"))
+        rollup["status_counts"][status] = rollup["status_counts"].get(status, 0) + 1
+        for item in order.get("items") or []:
+            key = _field_key(item.get("product_id") or item.get("product_name"))
+            product = rollup["products"].setdefault(key, {"name": item.get("product_name"), "quantity": 0, "revenue": 0})
+            product["quantity"] += item.get("quantity") or 0
+            product["revenue"] += item.get("total") or 0
+
+    # Replace rollups in place rather than delete-then-insert, so reads never see
+    # an empty store and concurrent order writes never hit a missing or duplicate key
+    stale = [
+        (rollup["user_id"], rollup["day"])
+        async for rollup in db.order_daily_rollups.find(query, {"_id": 0, "user_id": 1, "day": 1})
+        if (rollup["user_id"], rollup["day"]) not in rollups
+    ]
+    requests = [
+        ReplaceOne({"user_id": user_id, "day": day}, rollup, upsert=True)
+        for (user_id, day), rollup in rollups.items()
+    ] + [DeleteOne({"user_id": user_id, "day": day}) for user_id, day in stale]
+    if requests:
+        await db.order_daily_rollups.bulk_write(requests, ordered=False)
+    return len(rollups)
@@ -0,0 +1,92 @@
+"""
+Keyset (cursor) pagination for the dashboard list endpoints
+
+Lists are ordered newest first on (created_at, id). The `after` cursor is an
+opaque token naming the last row of the previous page, so every page is a
+bounded index range scan no matter how deep the client pages.
+"""
+from fastapi import HTTPException, Response, status
+from motor.motor_asyncio import AsyncIOMotorCollection
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+import base64
+import json
+
+# Clients that omit `limit` get a small page; larger pages must be asked for
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+PAGE_SORT = [("created_at", -1), ("id", -1)]
+
+def encode_cursor(doc: Dict[str, Any]) -> str:
+    """Encode the position of a document as an opaque cursor"""
+    created_at = doc.get("created_at")
+    position = {
+        "c": created_at.isoformat() if isinstance(created_at, datetime) else None,
+        "i": doc.get("id")
+    }
+    return base64.urlsafe_b64encode(json.dumps(position).encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """Decode a cursor produced by encode_cursor"""
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return {
+            "created_at": datetime.fromisoformat(position["c"]) if position["c"] else None,
+            "id": position["i"]
+        }
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+def keyset_query(query: Dict[str, Any], after: Optional[str]) -> Dict[str, Any]:
+    """Restrict a query to the rows that sort after the given cursor"""
+    if not after:
+        return query
+    position = decode_cursor(after)
+    return {
+        "$and": [
+            query,
+            {
+                "$or": [
+                    {"created_at": {"$lt": position["created_at"]}},
+                    {"created_at": position["created_at"], "id": {"$lt": position["id"]}}
+                ]
+            }
+        ]
+    }
+
+def sort_key(doc: Dict[str, Any]) -> tuple:
+    """Python equivalent of PAGE_SORT, for merging pages in memory"""
+    return (doc.get("created_at") or datetime.min, doc.get("id") or "")
+
+async def fetch_page(
+    collection: AsyncIOMotorCollection,
+    query: Dict[str, Any],
+    after: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    include_total: bool = False,
+    projection: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Fetch one page of a collection in PAGE_SORT order"""
+    if projection is not None:
+        # The cursor of the next page is read from the last row
+        projection = {**projection, "created_at": 1, "id": 1}
+    docs = await collection.find(
+        keyset_query(query, after), projection
+    ).sort(PAGE_SORT).limit(limit + 1).to_list(limit + 1)
+
+    return {
+        "items": docs[:limit],
+        "next_cursor": encode_cursor(docs[limit - 1]) if len(docs) > limit else None,
+        "total": await collection.count_documents(query) if include_total else None
+    }
+
+def set_page_headers(response: Response, page: Dict[str, Any]):
+    """Expose the next cursor and optional total count as response headers"""
+    if page["next_cursor"]:
+        response.headers["X-Next-Cursor"] = page["next_cursor"]
+    if page["total"] is not None:
+        response.headers["X-Total-Count"] = str(page["total"])
@@ -0,0 +1,50 @@
+"""
+Numeric THC/CBD potency ranges
+
+Products store potency as free-form strings ("18-24%", "0.2%", "<1%").
+parse_potency() turns them into numeric min/max percentages, stored next to
+the strings as thc_min/thc_max/cbd_min/cbd_max so potency can be filtered and
+sorted in the database.
+"""
+from typing import Any, Dict, Optional, Tuple
+import re
+
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+
+def parse_potency(value: Optional[str]) -> Tuple[Optional[float], Optional[float]]:
+    """Parse a potency string into a (min, max) percentage range, or (None, None)"""
+    if not value:
+        return None, None
+    text = str(value).strip().lower()
+    if "mg" in text and "%" not in text:
+        # Milligram doses (edibles) are not comparable with percentages
+        return None, None
+    numbers = [float(number) for number in _NUMBER.findall(text)]
+    if not numbers:
+        return None, None
+    if text.startswith("<"):
+        return 0.0, numbers[0]
+    return min(numbers), max(numbers)
+
+def potency_fields(product: Dict[str, Any]) -> Dict[str, Optional[float]]:
+    """Derive the numeric potency fields for whichever potency strings a product (or update) has"""
+    fields: Dict[str, Optional[float]] = {}
+    for prefix in ("thc", "cbd"):
+        if f"{prefix}_percentage" in product:
+            fields[f"{prefix}_min"], fields[f"{prefix}_max"] = parse_potency(product[f"{prefix}_percentage"])
+    return fields
+
+def potency_query(
+    thc_min: Optional[float] = None,
+    thc_max: Optional[float] = None,
+    cbd_min: Optional[float] = None,
+    cbd_max: Optional[float] = None
+) -> Dict[str, Any]:
+    """Build filters for products whose potency range overlaps the requested range"""
+    query: Dict[str, Any] = {}
+    for prefix, low, high in (("thc", thc_min, thc_max), ("cbd", cbd_min, cbd_max)):
+        if low is not None:
+            query[f"{prefix}_max"] = {"$gte": low}
+        if high is not None:
+            query[f"{prefix}_min"] = {"$lte": high}
+    return query
@@ -0,0 +1,132 @@
+"""
+Bulk product import for distributor feeds
+
+Rows (from JSON or CSV) are validated one by one, then diffed against the
+store's current catalog. A row matches an existing product by SKU when it
+has one, otherwise (or when the SKU is not known yet) by case-insensitive
+name, in which case the product picks up the row's SKU. Only fields present
+in a row are compared, so a feed that omits e.g. description leaves it
+alone. Every create and update goes out in a single unordered bulk_write;
+rows whose write fails are reported as invalid.
+"""
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pydantic import ValidationError
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import csv
+import io
+import re
+from models.product import Product, ProductCreate, ProductBulkItemResult, ProductBulkResponse, PRODUCT_PROJECTION
+from services.potency import potency_fields
+from services.public_products import public_product_update, with_public_product
+
+def parse_product_csv(content: bytes) -> List[Dict[str, Any]]:
+    """Parse a CSV catalog with a header row named after the product fields"""
+    reader = csv.DictReader(io.StringIO(content.decode("utf-8-sig")))
+    return [
+        {
+            key.strip(): value.strip()
+            for key, value in row.items()
+            # Blank cells mean "not provided"; extra unnamed columns are dropped
+            if key and value is not None and value.strip() != ""
+        }
+        for row in reader
+    ]
+
+def _sku_key(product: Dict[str, Any]) -> Optional[str]:
+    return f"sku:{product['sku']}" if product.get("sku") else None
+
+def _name_key(product: Dict[str, Any]) -> str:
+    return f"name:{product['name'].strip().lower()}"
+
+def _identity(user_id: str, product: Dict[str, Any]) -> Dict[str, Any]:
+    """Upsert filter for a new product, matching the way rows are matched"""
+    if product.get("sku"):
+        return {"user_id": user_id, "sku": product["sku"]}
+    # Same comparison as _name_key: surrounding whitespace and case are ignored
+    pattern = f"^\\s*{re.escape(product['name'].strip())}\\s*$"
+    return {"user_id": user_id, "name": {"$regex": pattern, "$options": "i"}}
+
+def _validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in error.errors()
+    )
+
+async def import_products(db: AsyncIOMotorDatabase, user_id: str, rows: List[Dict[str, Any]]) -> ProductBulkResponse:
+    """Create or update a store's products from feed rows, reporting what happened to each row"""
+    by_sku: Dict[str, Dict[str, Any]] = {}
+    by_name: Dict[str, Dict[str, Any]] = {}
+    async for product in db.products.find({"user_id": user_id}, PRODUCT_PROJECTION):
+        if _sku_key(product):
+            by_sku[_sku_key(product)] = product
+        by_name.setdefault(_name_key(product), product)
+
+    now = datetime.utcnow()
+    results: List[ProductBulkItemResult] = []
+    requests = []
+    # Position in results of the row behind each request, to report failed writes
+    request_rows: List[int] = []
+    seen: Dict[str, int] = {}
+    for index, row in enumerate(rows):
+        try:
+            product_data = ProductCreate(**row)
+        except ValidationError as e:
+            results.append(ProductBulkItemResult(index=index, status="invalid", error=_validation_error(e)))
+            continue
+
+        provided = product_data.dict(exclude_unset=True)
+        current: Optional[Dict[str, Any]] = by_sku.get(_sku_key(provided)) if _sku_key(provided) else None
+        if current is None:
+            # Products imported before SKUs were tracked only match by name;
+            # one that already has a different SKU is a different product
+            candidate = by_name.get(_name_key(provided))
+            if candidate is not None and (not provided.get("sku") or not candidate.get("sku")):
+                current = candidate
+
+        key = f"id:{current['id']}" if current is not None else (_sku_key(provided) or _name_key(provided))
+        if key in seen:
+            results.append(ProductBulkItemResult(
+                index=index, status="invalid", error=f"Duplicate of row {seen[key]}"
+            ))
+            continue
+        seen[key] = index
+
+        if current is None:
+            new_product = Product(
+                **product_data.dict(), **potency_fields(product_data.dict()), user_id=user_id, created_at=now, updated_at=now
+            )
+            requests.append(UpdateOne(
+                _identity(user_id, provided), {"$setOnInsert": with_public_product(new_product.dict())}, upsert=True
+            ))
+            request_rows.append(len(results))
+            results.append(ProductBulkItemResult(index=index, status="created", id=new_product.id))
+            continue
+
+        provided.update(potency_fields(provided))
+        changes = {field: value for field, value in provided.items() if current.get(field) != value}
+        if changes:
+            changes["updated_at"] = now
+            requests.append(UpdateOne({"user_id": user_id, "id": current["id"]}, public_product_update(changes)))
+            request_rows.append(len(results))
+            results.append(ProductBulkItemResult(index=index, status="updated", id=current["id"]))
+        else:
+            results.append(ProductBulkItemResult(index=index, status="unchanged", id=current["id"]))
+
+    if requests:
+        try:
+            await db.products.bulk_write(requests, ordered=False)
+        except BulkWriteError as e:
+            # Unordered, so the other writes still landed; e.g. a SKU taken since the catalog was read
+            for error in e.details.get("writeErrors", []):
+                result = results[request_rows[error["index"]]]
+                if result.status == "created":
+                    result.id = None
+                result.status = "invalid"
+                result.error = error.get("errmsg", "Write failed")
+
+    counts = {status: 0 for status in ("created", "updated", "unchanged", "invalid")}
+    for result in results:
+        counts[result.status] += 1
+    return ProductBulkResponse(**counts, results=results)
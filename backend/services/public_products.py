@@ -0,0 +1,62 @@
+"""
+Precomputed public view of each product
+
+Every product document carries a `public` sub-document holding exactly what
+storefront visitors see. It is written whenever the product is, so storefront
+reads project it out with $replaceRoot instead of formatting products in
+Python. Products written before it existed get it from rebuild_public_products(),
+which the server runs once at startup (services/backfills.py) and
+backfill_public_products.py runs on demand.
+"""
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from bson import ObjectId
+from typing import Any, Dict, List, Optional
+
+# Product fields copied verbatim into the public view
+PUBLIC_PRODUCT_FIELDS = (
+    "name", "category", "strain", "thc_percentage", "cbd_percentage",
+    "thc_min", "thc_max", "cbd_min", "cbd_max", "price", "description", "stock"
+)
+
+# Update stage that recomputes `public` from the stored document, so it stays
+# right however many fields an update touches
+PUBLIC_PRODUCT_STAGE = {
+    "$set": {
+        "public": {
+            "id": {"$toString": "$_id"},
+            **{field: {"$ifNull": [f"${field}", None]} for field in PUBLIC_PRODUCT_FIELDS},
+            "image_emoji": {"$ifNull": ["$image_emoji", "🌿"]},
+            "in_stock": {"$gt": ["$stock", 0]}
+        }
+    }
+}
+
+# Storefront read helpers: only products that have their public view, returned as that view
+HAS_PUBLIC_VIEW = {"public": {"$exists": True}}
+REPLACE_WITH_PUBLIC = {"$replaceRoot": {"newRoot": "$public"}}
+
+def public_product(product: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the public view of a product document that already has its _id"""
+    return {
+        "id": str(product["_id"]),
+        **{field: product.get(field) for field in PUBLIC_PRODUCT_FIELDS},
+        "image_emoji": product.get("image_emoji", "🌿"),
+        "in_stock": product["stock"] > 0
+    }
+
+def with_public_product(document: Dict[str, Any]) -> Dict[str, Any]:
+    """Give a new product document its _id up front and attach its public view"""
+    document = {"_id": ObjectId(), **document}
+    document["public"] = public_product(document)
+    return document
+
+def public_product_update(changes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Build a pipeline update that applies field changes and refreshes the public view"""
+    # $literal keeps string values such as "$5 off" from being read as field paths
+    return [{"$set": {field: {"$literal": value} for field, value in changes.items()}}, PUBLIC_PRODUCT_STAGE]
+
+async def rebuild_public_products(db: AsyncIOMotorDatabase, user_id: Optional[str] = None) -> int:
+    """Recompute the public view of every product, for one store or all of them"""
+    # One server-side pipeline update; no product leaves the database
+    result = await db.products.update_many({"user_id": user_id} if user_id else {}, [PUBLIC_PRODUCT_STAGE])
+    return result.modified_count
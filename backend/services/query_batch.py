@@ -0,0 +1,46 @@
+"""
+Helpers for stats endpoints that need several independent reads
+
+gather_queries() runs independent reads concurrently, capped per request so
+one dashboard load cannot take over the connection pool. group_totals()
+collapses several per-status (or per-tier) counts and sums into one $group.
+"""
+from motor.motor_asyncio import AsyncIOMotorCollection
+from typing import Any, Awaitable, Dict, List, Optional, Tuple
+import asyncio
+import os
+
+QUERY_BATCH_CONCURRENCY = int(os.environ.get("QUERY_BATCH_CONCURRENCY", "4"))
+
+async def gather_queries(*queries: Awaitable[Any], limit: Optional[int] = None) -> List[Any]:
+    """Await independent queries concurrently, at most `limit` at a time, in argument order"""
+    semaphore = asyncio.Semaphore(limit or QUERY_BATCH_CONCURRENCY)
+
+    async def run(query: Awaitable[Any]) -> Any:
+        async with semaphore:
+            return await query
+
+    return await asyncio.gather(*(run(query) for query in queries))
+
+async def group_totals(
+    collection: AsyncIOMotorCollection,
+    match: Dict[str, Any],
+    fields: List[str],
+    sums: Optional[Dict[str, str]] = None
+) -> Dict[Tuple[Any, ...], Dict[str, Any]]:
+    """Count (and optionally sum) matching documents per combination of `fields` in one round-trip
+
+    Returns {(value, ...): {"count": n, <sum name>: total, ...}} keyed by the
+    field values in the order given.
+    """
+    group: Dict[str, Any] = {
+        "_id": {field: f"${field}" for field in fields},
+        "count": {"$sum": 1}
+    }
+    for name, field in (sums or {}).items():
+        group[name] = {"$sum": f"${field}"}
+    rows = await collection.aggregate([{"$match": match}, {"$group": group}]).to_list(None)
+    return {
+        tuple(row["_id"].get(field) for field in fields): {key: value for key, value in row.items() if key != "_id"}
+        for row in rows
+    }
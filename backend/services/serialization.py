@@ -0,0 +1,49 @@
+"""
+Response serialization for the API
+
+DefaultResponse is ORJSONResponse when orjson is installed, and the app uses
+it for every endpoint that returns plain data. List endpoints normally build a
+model per row and FastAPI validates each row again against the
+response_model. With FAST_LIST_RESPONSES on, page_response() validates the
+page once and has pydantic write the JSON bytes directly, skipping the second
+pass. That Response bypasses the response_model, so headers are set on it here.
+"""
+from fastapi import Response
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import BaseModel, TypeAdapter
+from typing import Any, Dict, List, Type, Union
+import functools
+import os
+from services.pagination import set_page_headers
+
+try:
+    import orjson  # noqa: F401 - ORJSONResponse needs it when rendering
+    DefaultResponse = ORJSONResponse
+except ImportError:
+    DefaultResponse = JSONResponse
+
+FAST_LIST_RESPONSES = os.environ.get("FAST_LIST_RESPONSES", "false").lower() in ("1", "true", "yes")
+
+@functools.lru_cache(maxsize=None)
+def list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    """Get the (cached) validator and serializer for a list of a model"""
+    return TypeAdapter(List[model])
+
+def render_models(model: Type[BaseModel], rows: List[Dict[str, Any]]) -> bytes:
+    """Validate raw rows as a list of a model once and encode them as JSON"""
+    adapter = list_adapter(model)
+    return adapter.dump_json(adapter.validate_python(rows))
+
+def page_response(
+    model: Type[BaseModel],
+    page: Dict[str, Any],
+    response: Response
+) -> Union[Response, List[BaseModel]]:
+    """Return a fetch_page() page as a list of a model, with its pagination headers"""
+    if not FAST_LIST_RESPONSES:
+        set_page_headers(response, page)
+        return [model(**row) for row in page["items"]]
+
+    fast_response = Response(content=render_models(model, page["items"]), media_type="application/json")
+    set_page_headers(fast_response, page)
+    return fast_response
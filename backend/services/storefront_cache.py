@@ -0,0 +1,54 @@
+"""
+Cache of rendered public storefront payloads, keyed by store owner id
+
+Payloads are serialized once and served with a strong ETag so repeat visits
+can be answered with 304 Not Modified. The product and storefront write
+endpoints invalidate a store's entry; the TTL bounds staleness across workers.
+"""
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from typing import Any, Dict, Optional
+import hashlib
+import json
+import os
+from services.cache import TTLCache
+
+STOREFRONT_CACHE_TTL_SECONDS = float(os.environ.get("STOREFRONT_CACHE_TTL_SECONDS", "60"))
+STOREFRONT_CACHE_MAX_ENTRIES = int(os.environ.get("STOREFRONT_CACHE_MAX_ENTRIES", "512"))
+
+_payloads = TTLCache(STOREFRONT_CACHE_TTL_SECONDS, STOREFRONT_CACHE_MAX_ENTRIES)
+
+def get_cached_storefront(store_id: str) -> Optional[Dict[str, Any]]:
+    """Get the cached payload for a store, if any"""
+    return _payloads.get(store_id)
+
+def cache_storefront(store_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Serialize a storefront response, cache it and return the cached payload"""
+    body = json.dumps(jsonable_encoder(data), separators=(",", ":")).encode("utf-8")
+    payload = {
+        "body": body,
+        "etag": f'"{hashlib.sha256(body).hexdigest()}"'
+    }
+    _payloads.set(store_id, payload)
+    return payload
+
+def invalidate_storefront(store_id: str):
+    """Forget the cached payload for a store after its products or config change"""
+    _payloads.invalidate(store_id)
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag"""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in [candidate.removeprefix("W/") for candidate in candidates]
+
+def storefront_response(request: Request, payload: Dict[str, Any]) -> Response:
+    """Build the HTTP response for a cached payload, honouring If-None-Match"""
+    headers = {
+        "ETag": payload["etag"],
+        "Cache-Control": "public, max-age=0, must-revalidate"
+    }
+    if _etag_matches(request.headers.get("if-none-match"), payload["etag"]):
+        return Response(status_code=304, headers=headers)
+    return Response(content=payload["body"], media_type="application/json", headers=headers)
@@ -0,0 +1,47 @@
+"""
+Resolve storefront slugs (subdomains) to store owner ids
+
+Lookups go through the indexed users.subdomain_lower field (filled in for
+existing users by fill_subdomain_lower() at startup), and resolved
+slugs are remembered in a small in-process cache shared by the storefront
+and customer-auth routes. No route changes a user's subdomain (that is done
+by scripts such as update_subdomain.py), so cached entries only expire with
+TENANT_CACHE_TTL_SECONDS: a changed or released slug keeps resolving to its
+old owner for up to that long.
+"""
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from typing import Optional
+import os
+from services.cache import TTLCache
+
+TENANT_CACHE_TTL_SECONDS = float(os.environ.get("TENANT_CACHE_TTL_SECONDS", "300"))
+TENANT_CACHE_MAX_ENTRIES = int(os.environ.get("TENANT_CACHE_MAX_ENTRIES", "4096"))
+
+_store_ids = TTLCache(TENANT_CACHE_TTL_SECONDS, TENANT_CACHE_MAX_ENTRIES)
+
+# Update stage that applies normalize_subdomain() to a stored user server-side
+SUBDOMAIN_LOWER_STAGE = {"$set": {"subdomain_lower": {"$toLower": {"$trim": {"input": "$subdomain"}}}}}
+
+def normalize_subdomain(slug: str) -> str:
+    """Normalize a slug or subdomain for case-insensitive matching"""
+    return slug.strip().lower()
+
+async def fill_subdomain_lower(db: AsyncIOMotorDatabase) -> int:
+    """Store subdomain_lower on every user that has a subdomain"""
+    result = await db.users.update_many({"subdomain": {"$type": "string"}}, [SUBDOMAIN_LOWER_STAGE])
+    return result.modified_count
+
+async def resolve_store_id(db: AsyncIOMotorDatabase, slug: str) -> Optional[str]:
+    """Get the store owner id for a slug, or None if no store uses it"""
+    key = normalize_subdomain(slug)
+    store_id = _store_ids.get(key)
+    if store_id is not None:
+        return store_id
+
+    user = await db.users.find_one({"subdomain_lower": key}, {"_id": 0, "id": 1})
+    if not user:
+        # Misses are not cached so a newly registered store is visible at once
+        return None
+
+    _store_ids.set(key, user["id"])
+    return user["id"]
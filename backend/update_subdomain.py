@@ -6,7 +6,10 @@ db = client['kush_door']
 # Update the user_001 to have green-valley-dispensary subdomain
 result = db.users.update_one(
     {'id': 'user_001'},
-    {'$set': {'subdomain': 'green-valley-dispensary'}}
+    {'$set': {
+        'subdomain': 'green-valley-dispensary',
+        'subdomain_lower': 'green-valley-dispensary'
+    }}
 )
 
 print(f'Updated user_001 subdomain: {result.modified_count} documents modified')
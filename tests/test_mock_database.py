@@ -0,0 +1,159 @@
+"""
+Tests for the embedded mock database: query and update operators, the
+aggregation pipeline evaluator and on-disk persistence
+"""
+import asyncio
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+from pymongo import DeleteOne, InsertOne, ReplaceOne, UpdateOne
+from pymongo.errors import OperationFailure
+from mock_database import MockDatabase, _date_trunc
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+@pytest.fixture
+def db():
+    return MockDatabase()
+
+async def _insert_items(db):
+    await db.items.insert_many([
+        {"id": "a", "user_id": "u1", "name": "Blue Dream", "tags": ["hybrid", "sweet"], "stock": 0, "price": 10},
+        {"id": "b", "user_id": "u1", "name": "blue cheese", "tags": ["indica"], "stock": 5, "price": 20},
+        {"id": "c", "user_id": "u2", "name": "OG Kush", "tags": ["indica", "earthy"], "stock": 12, "price": 30},
+    ])
+
+async def _ids(cursor):
+    return sorted(document["id"] for document in await cursor.to_list(None))
+
+def test_in_matches_scalars_and_array_elements(db):
+    async def scenario():
+        await _insert_items(db)
+        assert await _ids(db.items.find({"id": {"$in": ["a", "c", "z"]}})) == ["a", "c"]
+        assert await _ids(db.items.find({"tags": {"$in": ["earthy", "sweet"]}})) == ["a", "c"]
+        assert await _ids(db.items.find({"tags": {"$nin": ["indica"]}})) == ["a"]
+    run(scenario())
+
+def test_regex_honours_options(db):
+    async def scenario():
+        await _insert_items(db)
+        assert await _ids(db.items.find({"name": {"$regex": "^blue"}})) == ["b"]
+        assert await _ids(db.items.find({"name": {"$regex": "^blue", "$options": "i"}})) == ["a", "b"]
+    run(scenario())
+
+def test_upsert_inserts_query_equalities_and_set_on_insert_once(db):
+    async def scenario():
+        first = await db.items.update_one(
+            {"user_id": "u1", "sku": "S1"},
+            {"$set": {"name": "New"}, "$setOnInsert": {"created": 1}},
+            upsert=True
+        )
+        assert first.upserted_id is not None
+        second = await db.items.update_one(
+            {"user_id": "u1", "sku": "S1"},
+            {"$set": {"name": "Renamed"}, "$setOnInsert": {"created": 2}},
+            upsert=True
+        )
+        assert second.upserted_id is None and second.matched_count == 1
+        document = await db.items.find_one({"sku": "S1"}, {"_id": 0})
+        assert document == {"user_id": "u1", "sku": "S1", "name": "Renamed", "created": 1}
+    run(scenario())
+
+def test_bulk_write_applies_every_request_kind(db):
+    async def scenario():
+        await _insert_items(db)
+        result = await db.items.bulk_write([
+            InsertOne({"id": "d", "user_id": "u2"}),
+            UpdateOne({"id": "a"}, {"$inc": {"stock": 3}}),
+            ReplaceOne({"id": "e"}, {"id": "e", "user_id": "u3"}, upsert=True),
+            DeleteOne({"id": "c"}),
+        ], ordered=False)
+        assert (result.inserted_count, result.modified_count, result.upserted_count, result.deleted_count) == (1, 1, 1, 1)
+        assert await _ids(db.items.find({})) == ["a", "b", "d", "e"]
+        assert (await db.items.find_one({"id": "a"}))["stock"] == 3
+    run(scenario())
+
+def test_group_with_conditional_sums(db):
+    async def scenario():
+        await _insert_items(db)
+        rows = await db.items.aggregate([
+            {"$group": {
+                "_id": "$user_id",
+                "count": {"$sum": 1},
+                "revenue": {"$sum": "$price"},
+                "in_stock": {"$sum": {"$cond": [{"$gt": ["$stock", 0]}, 1, 0]}}
+            }},
+            {"$sort": {"_id": 1}}
+        ]).to_list(None)
+        assert rows == [
+            {"_id": "u1", "count": 2, "revenue": 30, "in_stock": 1},
+            {"_id": "u2", "count": 1, "revenue": 30, "in_stock": 1},
+        ]
+    run(scenario())
+
+def test_facet_runs_each_sub_pipeline_over_the_same_input(db):
+    async def scenario():
+        await _insert_items(db)
+        result = await db.items.aggregate([
+            {"$match": {"user_id": "u1"}},
+            {"$facet": {
+                "total": [{"$count": "n"}],
+                "cheapest": [{"$sort": {"price": 1}}, {"$limit": 1}, {"$project": {"_id": 0, "id": 1}}]
+            }}
+        ]).to_list(None)
+        assert result == [{"total": [{"n": 2}], "cheapest": [{"id": "a"}]}]
+    run(scenario())
+
+def test_lookup_joins_on_local_and_foreign_fields(db):
+    async def scenario():
+        await _insert_items(db)
+        await db.owners.insert_many([{"user_id": "u1", "name": "One"}, {"user_id": "u2", "name": "Two"}])
+        rows = await db.items.aggregate([
+            {"$match": {"id": {"$in": ["a", "c"]}}},
+            {"$lookup": {"from": "owners", "localField": "user_id", "foreignField": "user_id", "as": "owner"}},
+            {"$unwind": "$owner"},
+            {"$project": {"_id": 0, "id": 1, "owner": "$owner.name"}},
+            {"$sort": {"id": 1}}
+        ]).to_list(None)
+        assert rows == [{"id": "a", "owner": "One"}, {"id": "c", "owner": "Two"}]
+    run(scenario())
+
+def test_date_trunc_bins_from_the_reference_date():
+    moment = datetime(2026, 10, 14, 7, 35, 9)
+    assert _date_trunc(moment, "day") == datetime(2026, 10, 14)
+    assert _date_trunc(moment, "week") == datetime(2026, 10, 11)
+    assert _date_trunc(moment, "month", 2) == datetime(2026, 9, 1)
+    assert _date_trunc(moment, "quarter", 2) == datetime(2026, 7, 1)
+    assert _date_trunc(moment, "hour", 6) == datetime(2026, 10, 14, 6)
+    with pytest.raises(OperationFailure):
+        _date_trunc(moment, "day", 0)
+
+def test_writes_survive_a_restart_through_the_log(tmp_path):
+    async def scenario():
+        path = str(tmp_path)
+        db = MockDatabase(path)
+        await db.items.insert_one({"id": "a", "stock": 1})
+        await db.items.update_one({"id": "a"}, {"$inc": {"stock": 2}})
+        await db.items.insert_one({"id": "b"})
+        await db.items.delete_one({"id": "b"})
+        # Release the directory without a snapshot, as a crash would
+        db._store.close()
+
+        with open(os.path.join(path, "wal.bson"), "ab") as wal:
+            wal.write(b"\x40\x00\x00\x00torn")
+        restarted = MockDatabase(path)
+        assert await _ids(restarted.items.find({})) == ["a"]
+        assert (await restarted.items.find_one({"id": "a"}))["stock"] == 3
+        restarted.close()
+
+        compacted = MockDatabase(path)
+        assert os.path.getsize(os.path.join(path, "wal.bson")) == 0
+        assert (await compacted.items.find_one({"id": "a"}))["stock"] == 3
+        compacted.close()
+    run(scenario())